@@ -0,0 +1 @@
+"""Benchmarks for the TRMNL integration (not shipped with the integration)."""
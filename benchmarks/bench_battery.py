@@ -0,0 +1,143 @@
+"""Battery drain estimation over a replayed multi-week traffic log.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_battery --weeks 4 --devices 50
+
+Writes a traffic log (the format of `custom_components/trmnl/traffic.py`) in
+which every device drains at its own known rate, with noisy readings, and is
+recharged when it gets low (one ~4.7 V check-in on the charger, then 100%).
+The log is replayed through the same path as the coordinator: parse, diff
+against the previous snapshot, observe the changed devices. For each week the
+benchmark reports the time per observation and the memory held by the
+estimators, which should both stay flat as history grows, and how far the
+fitted drain rates are from the truth. Finally the estimator state goes
+through a JSON round trip, as it does through the store.
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import UTC, datetime, timedelta
+
+from custom_components.trmnl.battery import FleetBatteryAnalytics
+from custom_components.trmnl.models import FleetSnapshot, parse_devices
+from custom_components.trmnl.traffic import read_traffic
+
+from .fleet import make_fleet
+
+CHECKIN_INTERVAL = 900
+RECHARGE_BELOW = 10
+NOISE = 0.6
+
+
+def write_trace(path: str, devices: int, weeks: float, seed: int) -> dict:
+    """Write the log; return each device's true drain rate in %/day."""
+    rng = random.Random(seed)
+    start = datetime(2026, 7, 1, tzinfo=UTC)  # after the base fleet's pings
+    fleet = make_fleet(devices, seed)
+    rates = {device["friendly_id"]: rng.uniform(2, 15) for device in fleet}
+    level = {device["friendly_id"]: rng.uniform(40, 100) for device in fleet}
+    next_checkin = [start + timedelta(seconds=rng.uniform(0, CHECKIN_INTERVAL)) for _ in fleet]
+    steps = int(weeks * 7 * 86400 // CHECKIN_INTERVAL)
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as log:
+        for step in range(steps):
+            now = start + timedelta(seconds=step * CHECKIN_INTERVAL)
+            for index, device in enumerate(fleet):
+                friendly_id = device["friendly_id"]
+                while next_checkin[index] <= now:
+                    elapsed = CHECKIN_INTERVAL / 86400
+                    level[friendly_id] -= rates[friendly_id] * elapsed
+                    if level[friendly_id] < RECHARGE_BELOW:
+                        # One check-in from the charger, then full again.
+                        level[friendly_id] = 100.0
+                        device["battery_voltage"] = 4.7
+                        device["percent_charged"] = 100.0
+                    else:
+                        reading = level[friendly_id] + rng.gauss(0, NOISE)
+                        device["percent_charged"] = round(min(max(reading, 0), 100), 2)
+                        device["battery_voltage"] = round(3.3 + 0.009 * level[friendly_id], 3)
+                    ping = next_checkin[index].isoformat().replace("+00:00", "Z")
+                    device["last_ping_at"] = device["hardware_last_ping_at"] = ping
+                    next_checkin[index] += timedelta(seconds=CHECKIN_INTERVAL * rng.uniform(0.95, 1.05))
+            entry = {"t": now.timestamp(), "elapsed": 0.1, "status": 200,
+                     "headers": {"Content-Type": "application/json"}, "body": json.dumps({"data": fleet})}
+            log.write(json.dumps(entry, separators=(",", ":")) + "\n")
+    return rates
+
+
+def retained_bytes(analytics: FleetBatteryAnalytics) -> int:
+    """Bytes held by the estimators, measured by rebuilding them under tracemalloc."""
+    state = analytics.as_dict()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    rebuilt = FleetBatteryAnalytics.from_dict(state)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del rebuilt
+    return size
+
+
+def accuracy(analytics: FleetBatteryAnalytics, rates: dict):
+    """Median and 90th percentile relative drain-rate error over the fitted devices."""
+    errors = sorted(
+        abs(estimator.drain_rate - rates[friendly_id]) / rates[friendly_id]
+        for friendly_id, estimator in analytics.estimators.items()
+        if estimator.drain_rate is not None
+    )
+    if not errors:
+        return None, None, 0
+    return errors[len(errors) // 2], errors[int(len(errors) * 0.9)], len(errors)
+
+
+def main(devices: int, weeks: float, seed: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "battery.jsonl.gz")
+        rates = write_trace(path, devices, weeks, seed)
+        entries = list(read_traffic(path))
+    print(f"{len(entries)} polls of {devices} devices over {weeks:g} weeks, one check-in per device per poll")
+
+    analytics = FleetBatteryAnalytics()
+    previous = None
+    polls_per_week = 7 * 86400 // CHECKIN_INTERVAL
+    week_seconds = week_observations = 0
+    for index, entry in enumerate(entries, 1):
+        now = datetime.fromtimestamp(entry["t"], UTC)
+        snapshot = FleetSnapshot(parse_devices(json.loads(entry["body"])["data"]), fetched_at=now)
+        changed = snapshot.changed_since(previous)
+        started = time.perf_counter()
+        for friendly_id in changed:
+            analytics.observe(snapshot.get(friendly_id))
+        week_seconds += time.perf_counter() - started
+        week_observations += len(changed)
+        previous = snapshot
+        if index % polls_per_week == 0 or index == len(entries):
+            median_error, p90_error, fitted = accuracy(analytics, rates)
+            print(
+                f"week {-(-index // polls_per_week)}: {week_seconds / max(week_observations, 1) * 1e6:.2f} us/observation, "
+                f"estimators hold {retained_bytes(analytics) / devices:.0f} B/device, "
+                f"{fitted}/{devices} fitted, drain-rate error "
+                + (f"median {median_error:.1%} p90 {p90_error:.1%}" if fitted else "n/a")
+            )
+            week_seconds = week_observations = 0
+
+    restored = FleetBatteryAnalytics.from_dict(json.loads(json.dumps(analytics.as_dict())))
+    same = all(
+        restored.get(friendly_id).drain_rate == estimator.drain_rate
+        for friendly_id, estimator in analytics.estimators.items()
+    )
+    print(f"store round trip: {len(json.dumps(analytics.as_dict())) / devices:.0f} B/device, estimates {'identical' if same else 'DIFFER'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=50)
+    parser.add_argument("--weeks", type=float, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.devices, args.weeks, args.seed)
@@ -0,0 +1,107 @@
+"""Entity registry churn caused by glitchy `/api/devices` payloads.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_churn --devices 50
+
+The integration runs against a stand-in server with ETag revalidation enabled.
+The server serves a sequence of payloads:
+- `{}` and `{"data": []}` for a few polls;
+- the fleet with one device missing for a few polls;
+- the full fleet again;
+- the fleet with one device renamed in TRMNL;
+- the fleet without that device for good;
+- finally no devices at all, for good.
+
+After each poll the benchmark counts the integration's entity registry
+entries. Glitches shorter than DEVICE_REMOVAL_POLLS must not remove anything,
+since a removal loses the user's entity names, areas and disabled flags. A
+device that is really gone, or a whole fleet, must be removed on exactly the
+poll that makes it missing for that many polls, also while the server answers
+with an unchanged body. A rename must reach every entity of the device, the problem binary sensors included,
+and the device registry, whichever coordinator listener runs first.
+"""
+import argparse
+import asyncio
+
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.trmnl.const import DEVICE_REMOVAL_POLLS, DOMAIN
+
+from .fake_api import FakeTrmnlApi
+from .fleet import make_payload
+from .harness import add_entry, running_hass
+
+API_KEY = "user_benchmark"
+
+
+async def main(device_count: int) -> None:
+    payload = make_payload(device_count)
+    without_last = {**payload, "data": payload["data"][:-1]}
+    glitch_polls = DEVICE_REMOVAL_POLLS - 1
+    async with FakeTrmnlApi(payload, cacheable=True) as server, running_hass() as hass:
+        entry = add_entry(hass, server.url, API_KEY)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        registry = er.async_get(hass)
+
+        def registered():
+            return len(er.async_entries_for_config_entry(registry, entry.entry_id))
+
+        async def poll(body, polls):
+            server.set_payload(body)
+            for _ in range(polls):
+                await coordinator.async_refresh()
+                await hass.async_block_till_done()
+            return registered()
+
+        full = registered()
+        per_device = full // device_count
+        print(f"{device_count} devices, {full} registry entries")
+        for label, body in (
+            ("{}", {}),
+            ('{"data": []}', {"data": []}),
+            ("one device missing", without_last),
+        ):
+            left = await poll(body, glitch_polls)
+            restored = await poll(payload, 1)
+            print(
+                f"{label:>19} for {glitch_polls} polls: {full - left} entries removed, "
+                f"{restored} after the fleet came back"
+            )
+            assert left == full and restored == full, f"{label} removed entities"
+
+        renamed = {**payload, "data": [{**payload["data"][0], "name": "Renamed TRMNL"}, *payload["data"][1:]]}
+        await poll(renamed, 1)
+        mac_address = payload["data"][0]["mac_address"]
+        names = [
+            hass.states.get(entity.entity_id).name
+            for entity in er.async_entries_for_config_entry(registry, entry.entry_id)
+            if entity.unique_id.startswith(mac_address)
+        ]
+        stale_names = [name for name in names if not name.startswith("Renamed TRMNL")]
+        print(f"rename: {len(names) - len(stale_names)} of {len(names)} entities show the new name")
+        assert not stale_names, f"entities kept the old name: {stale_names}"
+        device_entry = dr.async_get(hass).async_get_device(identifiers={(DOMAIN, mac_address)})
+        assert device_entry.name == "Renamed TRMNL", "the device registry kept the old name"
+
+        counts = [await poll(without_last, 1) for _ in range(DEVICE_REMOVAL_POLLS)]
+        print(f"device really removed: registry entries per poll {counts}")
+        assert counts[-1] == full - per_device, "a device gone for good was never removed"
+        assert all(count == full for count in counts[:-1]), "a device was removed too early"
+
+        counts = [await poll({"data": []}, 1) for _ in range(DEVICE_REMOVAL_POLLS)]
+        print(f"fleet really emptied: registry entries per poll {counts}")
+        # Account-level entities outlive the devices.
+        assert counts[-1] == full - device_count * per_device, "an empty fleet was never removed"
+        assert all(count == full - per_device for count in counts[:-1]), "a fleet was removed too early"
+        await hass.config_entries.async_unload(entry.entry_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.devices))
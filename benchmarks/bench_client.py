@@ -0,0 +1,66 @@
+"""Compare the old blocking `requests` client with the pooled aiohttp client.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_client --polls 200 --latency 0.005
+
+The baseline reproduces what the integration used to do: one `requests.get` per
+poll, pushed through a thread-pool executor, with no session reuse.
+"""
+import argparse
+import asyncio
+import time
+
+import aiohttp
+import requests
+
+from custom_components.trmnl.api import TrmnlApiClient
+
+from .fake_api import FakeTrmnlApi
+
+API_KEY = "user_benchmark"
+
+
+def _blocking_get_devices(base_url: str):
+    response = requests.get(
+        f"{base_url}/api/devices",
+        headers={"accept": "application/json", "Authorization": f"Bearer {API_KEY}"},
+        timeout=10,
+    )
+    response.raise_for_status()
+    return response.json().get("data", [])
+
+
+async def bench_requests(base_url: str, polls: int) -> float:
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    for _ in range(polls):
+        await loop.run_in_executor(None, _blocking_get_devices, base_url)
+    return time.perf_counter() - start
+
+
+async def bench_aiohttp(base_url: str, polls: int) -> float:
+    async with aiohttp.ClientSession() as session:
+        client = TrmnlApiClient(session, API_KEY, base_url)
+        start = time.perf_counter()
+        for _ in range(polls):
+            await client.get_devices()
+        return time.perf_counter() - start
+
+
+async def main(polls: int, latency: float) -> None:
+    for label, bench in (("requests+executor", bench_requests), ("aiohttp pooled", bench_aiohttp)):
+        async with FakeTrmnlApi(latency=latency, api_key=API_KEY) as server:
+            elapsed = await bench(server.url, polls)
+            print(
+                f"{label:>18}: {elapsed * 1000 / polls:7.3f} ms/poll, "
+                f"{server.connections} TCP connections for {server.requests} requests"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="server-side delay in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.polls, args.latency))
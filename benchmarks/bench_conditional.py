@@ -0,0 +1,88 @@
+"""Bytes and decode time saved by conditional, compressed and hash-checked fetches.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_conditional --devices 2000 --polls 50
+
+Each scenario polls an unchanged fleet; the first poll is a full fetch and the
+rest go through the coordinator's `conditional=True` path.
+
+It also checks that a 304 the client has no cached body for (e.g. from a
+caching proxy) is fetched again in full instead of failing the poll.
+"""
+import argparse
+import asyncio
+import time
+
+import aiohttp
+
+from custom_components.trmnl.api import TrmnlApiClient, TrmnlApiError
+
+from .fake_api import FakeTrmnlApi
+from .fleet import make_payload
+
+API_KEY = "user_benchmark"
+
+
+async def run(devices: int, polls: int, cacheable: bool, compress: bool, conditional: bool) -> dict:
+    payload = make_payload(devices)
+    async with (
+        FakeTrmnlApi(payload, api_key=API_KEY, cacheable=cacheable, compress=compress) as server,
+        aiohttp.ClientSession() as session,
+    ):
+        client = TrmnlApiClient(session, API_KEY, server.url)
+        start = time.perf_counter()
+        await client.get_devices()
+        for _ in range(polls - 1):
+            await client.get_devices(conditional=conditional)
+        elapsed = time.perf_counter() - start
+    return {
+        "ms_per_poll": elapsed * 1000 / polls,
+        "bytes_sent": server.bytes_sent,
+        **client.stats,
+    }
+
+
+async def unsolicited_304(devices: int) -> None:
+    """A 304 with nothing cached is a cache miss; a 304 to an unconditional request an error."""
+    payload = make_payload(devices)
+    async with FakeTrmnlApi(payload, api_key=API_KEY, faults=[304]) as server, aiohttp.ClientSession() as session:
+        client = TrmnlApiClient(session, API_KEY, server.url)
+        fetched = await client.get_devices(conditional=True)
+    assert fetched is not None and len(fetched) == devices, "304 with nothing cached did not refetch"
+    assert server.requests == 2
+    async with FakeTrmnlApi(payload, api_key=API_KEY, faults=[304]) as server, aiohttp.ClientSession() as session:
+        client = TrmnlApiClient(session, API_KEY, server.url)
+        try:
+            await client.get_devices()
+        except TrmnlApiError:
+            pass
+        else:
+            raise AssertionError("304 to an unconditional request was not an error")
+    print("304 with nothing cached: fetched in full with a second request")
+
+
+async def main(devices: int, polls: int) -> None:
+    scenarios = (
+        ("plain, unconditional", False, False, False),
+        ("gzip, unconditional", False, True, False),
+        ("non-cacheable + hash", False, True, True),
+        ("ETag/304", True, True, True),
+    )
+    print(f"{'scenario':>22} {'ms/poll':>8} {'wire KiB':>9} {'saved KiB':>10} {'304':>4} {'same':>5} {'decode ms avoided':>18}")
+    for label, cacheable, compress, conditional in scenarios:
+        result = await run(devices, polls, cacheable, compress, conditional)
+        print(
+            f"{label:>22} {result['ms_per_poll']:>8.2f} {result['bytes_sent'] / 1024:>9.0f} "
+            f"{result['bytes_saved'] / 1024:>10.0f} {result['not_modified']:>4} {result['unchanged']:>5} "
+            f"{result['decode_seconds_avoided'] * 1000:>18.1f}"
+        )
+    await unsolicited_304(devices)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=2000)
+    parser.add_argument("--polls", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.devices, args.polls))
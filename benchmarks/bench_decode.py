@@ -0,0 +1,107 @@
+"""Peak memory and time of decoding `/api/devices` bodies: whole-tree vs entry-by-entry.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_decode --sizes 1000 5000 10000 50000
+
+Each measurement runs in a fresh interpreter that reads the body from disk,
+decodes it once and reports the decode time and how far the peak RSS rose
+above the RSS with just the body loaded. The result is kept alive until the
+peak is read, as the client keeps it until the snapshot is built. Paths:
+
+- `json_loads`: the previous client path, orjson through Home Assistant,
+  building the whole payload tree before `data` is selected.
+- `stdlib entries`: the `raw_decode` walk in `decode.py`, one entry at a time,
+  trimmed to the fields the integration reads.
+- `ijson entries`: the same with ijson's C backend (skipped if not installed).
+- `auto`: `decode_devices()`, which picks by body size as the client does.
+
+`--extra-fields` pads every device with fields the integration ignores, as a
+fuller API response would carry.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from .fleet import make_fleet
+
+PATHS = ("json_loads", "stdlib entries", "ijson entries", "auto")
+
+
+def child(path: str, which: str) -> None:
+    import gc
+
+    from homeassistant.util.json import json_loads
+
+    from custom_components.trmnl import decode
+
+    if which == "ijson entries" and decode.ijson_backend() is None:
+        print(json.dumps(None))
+        return
+    functions = {
+        "json_loads": lambda body: json_loads(body).get("data", []),
+        "stdlib entries": lambda body: list(decode._iter_stdlib(body)),  # pylint: disable=protected-access
+        "ijson entries": lambda body: list(decode._iter_ijson(body)),  # pylint: disable=protected-access
+        "auto": decode.decode_devices,
+    }
+    with open(path, "rb") as payload:
+        body = payload.read()
+    gc.collect()
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    devices = functions[which](body)
+    seconds = time.perf_counter() - started
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": seconds, "peak_kib": after - before, "devices": len(devices)}))
+
+
+def measure(path: str, which: str, repeat: int):
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_decode", "--child", path, which],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output)
+        if result is None:
+            return None
+        runs.append(result)
+    return min(run["seconds"] for run in runs), min(run["peak_kib"] for run in runs)
+
+
+def main(sizes, extra_fields: int, repeat: int) -> None:
+    print(f"{'devices':>8} {'body MB':>8} " + " ".join(f"{name:>22}" for name in PATHS))
+    print(f"{'':>8} {'':>8} " + " ".join(f"{'ms / peak +MB':>22}" for _ in PATHS))
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            fleet = make_fleet(size)
+            for device in fleet:
+                for index in range(extra_fields):
+                    device[f"unused_{index}"] = f"value {index} for {device['friendly_id']}"
+            path = os.path.join(tmp, f"devices-{size}.json")
+            with open(path, "w", encoding="utf-8") as payload:
+                json.dump({"data": fleet}, payload)
+            del fleet
+            cells = []
+            for which in PATHS:
+                result = measure(path, which, repeat)
+                cells.append("n/a" if result is None else f"{result[0] * 1000:.1f} / {result[1] / 1024:.1f}")
+            print(f"{size:>8} {os.path.getsize(path) / 1e6:>8.1f} " + " ".join(f"{cell:>22}" for cell in cells))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 10000, 50000])
+    parser.add_argument("--extra-fields", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", nargs=2, metavar=("PATH", "DECODER"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+    else:
+        main(args.sizes, args.extra_fields, args.repeat)
@@ -0,0 +1,80 @@
+"""Fetch one fleet spread over several stand-in servers, serially and fanned out.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_fanout --servers 4 --devices 50 --latency 0.2
+
+Each server gets its own latency (`latency * (index + 1)`) and shares `--overlap`
+devices (same MAC) with the previous one. One extra server hangs past its
+timeout and another answers 500, to show that a slow or broken endpoint costs at
+most its own timeout and does not fail the cycle.
+"""
+import argparse
+import asyncio
+import contextlib
+import random
+import time
+
+import aiohttp
+
+from custom_components.trmnl.api import TrmnlApiClient, TrmnlApiError
+from custom_components.trmnl.fanout import TrmnlEndpointFanout
+
+from .fake_api import FakeTrmnlApi
+from .fleet import make_device
+
+TIMEOUT = 1.0
+
+
+def server_payload(index: int, devices: int, overlap: int) -> dict:
+    rng = random.Random(index)
+    start = max(index * devices - overlap, 0)
+    return {"data": [make_device(device, rng) for device in range(start, (index + 1) * devices)]}
+
+
+async def serial(clients) -> float:
+    """The one-entry-per-server baseline: every endpoint polled one after another."""
+    start = time.perf_counter()
+    for client in clients:
+        with contextlib.suppress(TrmnlApiError):
+            await client.get_devices()
+    return time.perf_counter() - start
+
+
+async def main(servers: int, devices: int, latency: float, overlap: int) -> None:
+    fakes = [
+        FakeTrmnlApi(server_payload(index, devices, overlap), latency=latency * (index + 1))
+        for index in range(servers)
+    ]
+    fakes.append(FakeTrmnlApi(server_payload(servers, devices, 0), latency=TIMEOUT * 5))
+    fakes.append(FakeTrmnlApi(server_payload(servers + 1, devices, 0), faults=[500] * 10))
+    for fake in fakes:
+        await fake.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            clients = [TrmnlApiClient(session, "user_bench", fake.url, timeout=TIMEOUT) for fake in fakes]
+            print(f"serial:  {await serial(clients):6.3f} s per cycle")
+
+            fanout = TrmnlEndpointFanout(clients)
+            start = time.perf_counter()
+            merged = await fanout.get_devices()
+            elapsed = time.perf_counter() - start
+            unique = len({entry["mac_address"] for entry in merged})
+            print(
+                f"fan-out: {elapsed:6.3f} s per cycle (slowest healthy server "
+                f"{latency * servers:.3f} s, timeout {TIMEOUT:.3f} s), {len(merged)} devices "
+                f"({unique} unique MACs), {len(fanout.failed_endpoints)} endpoints failed"
+            )
+    finally:
+        for fake in fakes:
+            await fake.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--servers", type=int, default=4, help="healthy servers")
+    parser.add_argument("--devices", type=int, default=50, help="devices per server")
+    parser.add_argument("--latency", type=float, default=0.2, help="base server latency in seconds")
+    parser.add_argument("--overlap", type=int, default=5, help="devices shared with the previous server")
+    args = parser.parse_args()
+    asyncio.run(main(args.servers, args.devices, args.latency, args.overlap))
@@ -0,0 +1,146 @@
+"""Problem flags evaluated once per refresh vs per state change, and flapping with hysteresis.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_health --devices 200 --polls 500
+
+Cost: the template-sensor setup this replaces re-renders every TRMNL-related
+template whenever any TRMNL entity changes state. That is emulated here with plain
+Python over a dict of string states: one low-battery, one weak-signal and one
+offline check per device, plus three fleet aggregates. Jinja rendering and the
+event bus are left out, so this is a lower bound on the template setup's cost.
+Each poll changes `--churn` of the devices, and each changed device writes seven
+entities. `FleetHealth.evaluate()` makes one pass per poll instead.
+
+Flapping: battery and RSSI readings that wander around the thresholds are
+evaluated with and without the hysteresis margins, and the transition events
+are counted.
+"""
+import argparse
+import random
+import time
+from datetime import UTC, datetime, timedelta
+
+from custom_components.trmnl import health as health_module
+from custom_components.trmnl.health import FleetHealth
+from custom_components.trmnl.models import FleetSnapshot, TrmnlDevice
+
+ENTITIES_PER_DEVICE = 7
+LOW_BATTERY = 20
+WEAK_SIGNAL = -80
+OFFLINE_AFTER = 7200
+
+
+def make_snapshot(devices, now):
+    return FleetSnapshot(
+        [
+            TrmnlDevice(
+                f"D{index:05d}", f"MAC{index}", f"TRMNL {index}",
+                percent_charged=device["battery"], rssi=device["rssi"], last_ping_at=device["ping"],
+            )
+            for index, device in enumerate(devices)
+        ],
+        fetched_at=now,
+    )
+
+
+def template_pass(states, now):
+    """Every template once: per-device checks and fleet aggregates over all states."""
+    low = weak = offline = 0
+    minimum = None
+    for state in states.values():
+        battery = float(state["battery"])
+        if battery <= LOW_BATTERY:
+            low += 1
+        minimum = battery if minimum is None else min(minimum, battery)
+        if int(state["rssi"]) <= WEAK_SIGNAL:
+            weak += 1
+        if now - datetime.fromisoformat(state["last_seen"]) > timedelta(seconds=OFFLINE_AFTER):
+            offline += 1
+    return low, weak, offline, minimum
+
+
+def cost(device_count: int, polls: int, churn: float, seed: int) -> None:
+    rng = random.Random(seed)
+    now = datetime(2026, 7, 1, tzinfo=UTC)
+    devices = [
+        {"battery": rng.uniform(5, 100), "rssi": rng.randint(-95, -40), "ping": now - timedelta(minutes=rng.randint(0, 300))}
+        for _ in range(device_count)
+    ]
+    health = FleetHealth(LOW_BATTERY, WEAK_SIGNAL, OFFLINE_AFTER)
+    template_seconds = integration_seconds = 0.0
+    template_renders = 0
+    for _ in range(polls):
+        now += timedelta(minutes=5)
+        changed = rng.sample(range(device_count), max(1, int(device_count * churn)))
+        for index in changed:
+            device = devices[index]
+            device["battery"] = max(device["battery"] - rng.uniform(0, 0.5), 0)
+            device["rssi"] = max(min(device["rssi"] + rng.randint(-3, 3), -30), -100)
+            device["ping"] = now
+        snapshot = make_snapshot(devices, now)
+        states = {
+            device.friendly_id: {
+                "battery": str(device.battery_percentage),
+                "rssi": str(device.rssi),
+                "last_seen": device.last_ping_iso,
+            }
+            for device in snapshot
+        }
+        started = time.perf_counter()
+        # Every entity write of a changed device re-triggers all the templates.
+        for _ in range(len(changed) * ENTITIES_PER_DEVICE):
+            template_pass(states, now)
+            template_renders += 1
+        template_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        health.evaluate(snapshot, now)
+        integration_seconds += time.perf_counter() - started
+    print(
+        f"{device_count} devices, {churn:.0%} changing per poll: templates {template_seconds / polls * 1000:.2f} ms/poll "
+        f"({template_renders // polls} fleet passes), evaluate() {integration_seconds / polls * 1000:.3f} ms/poll "
+        f"(1 pass), {template_seconds / integration_seconds:.0f}x less work"
+    )
+
+
+def flapping(device_count: int, polls: int, seed: int) -> None:
+    rng = random.Random(seed)
+    now = datetime(2026, 7, 1, tzinfo=UTC)
+    devices = [
+        {"battery": LOW_BATTERY + rng.uniform(-3, 3), "rssi": WEAK_SIGNAL + rng.randint(-3, 3), "ping": now}
+        for _ in range(device_count)
+    ]
+    counts = {}
+    for label, battery_margin, signal_margin in (("with hysteresis", None, None), ("without", 0, 0)):
+        saved = health_module.BATTERY_HYSTERESIS, health_module.SIGNAL_HYSTERESIS
+        if battery_margin is not None:
+            health_module.BATTERY_HYSTERESIS, health_module.SIGNAL_HYSTERESIS = battery_margin, signal_margin
+        try:
+            local_rng = random.Random(seed)
+            health = FleetHealth(LOW_BATTERY, WEAK_SIGNAL, OFFLINE_AFTER)
+            events = 0
+            for step in range(polls):
+                ping = now + timedelta(minutes=5 * step)
+                for device in devices:
+                    device["battery"] = LOW_BATTERY + local_rng.uniform(-3, 3)
+                    device["rssi"] = WEAK_SIGNAL + local_rng.randint(-3, 3)
+                    device["ping"] = ping
+                events += len(health.evaluate(make_snapshot(devices, ping), ping))
+        finally:
+            health_module.BATTERY_HYSTERESIS, health_module.SIGNAL_HYSTERESIS = saved
+        counts[label] = events
+    print(
+        f"readings hovering at the thresholds, {device_count} devices x {polls} polls: "
+        f"{counts['with hysteresis']} transition events with hysteresis, {counts['without']} without"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=200)
+    parser.add_argument("--polls", type=int, default=200)
+    parser.add_argument("--churn", type=float, default=0.1, help="fraction of devices changing per poll")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    cost(args.devices, args.polls, args.churn, args.seed)
+    flapping(min(args.devices, 50), args.polls, args.seed)
@@ -0,0 +1,65 @@
+"""Overhead of the per-entry instrumentation on the polling hot path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_metrics --polls 2000 --devices 100
+
+Times `RollingHistogram.add` alone, then polls a stand-in server with the
+client's metrics detached and attached (alternating rounds, to even out noise)
+and reports the difference per poll. A poll records at most five samples
+(network time, bytes, decode time, snapshot time, refresh time).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import timeit
+
+import aiohttp
+
+from custom_components.trmnl.api import TrmnlApiClient
+from custom_components.trmnl.metrics import EntryMetrics, RollingHistogram
+
+from .fake_api import FakeTrmnlApi
+from .fleet import make_payload
+
+API_KEY = "user_benchmark"
+ROUNDS = 5
+
+
+async def poll(client, polls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(polls):
+        await client.get_devices()
+    return (time.perf_counter() - start) / polls
+
+
+async def main(polls: int, devices: int) -> None:
+    histogram = RollingHistogram()
+    add_ns = min(timeit.repeat(lambda: histogram.add(0.1), number=100_000, repeat=5)) / 100_000 * 1e9
+    summary_us = min(timeit.repeat(histogram.summary, number=1_000, repeat=5)) / 1_000 * 1e6
+    print(f"RollingHistogram.add: {add_ns:.0f} ns; summary() over {len(histogram.samples)} samples: {summary_us:.1f} us")
+
+    async with FakeTrmnlApi(make_payload(devices), api_key=API_KEY) as server, aiohttp.ClientSession() as session:
+        client = TrmnlApiClient(session, API_KEY, server.url)
+        await poll(client, 50)  # warm up the connection pool
+        plain, instrumented = [], []
+        for _ in range(ROUNDS):
+            client.metrics = None
+            plain.append(await poll(client, polls // ROUNDS))
+            client.metrics = EntryMetrics()
+            instrumented.append(await poll(client, polls // ROUNDS))
+    base = statistics.median(plain)
+    overhead = statistics.median(instrumented) - base
+    print(
+        f"poll without metrics {base * 1e6:.1f} us, with metrics {(base + overhead) * 1e6:.1f} us "
+        f"(difference {overhead * 1e6:+.1f} us; five adds cost {5 * add_ns / 1000:.2f} us)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=2000)
+    parser.add_argument("--devices", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.polls, args.devices))
@@ -0,0 +1,189 @@
+"""Offline detection between polls: deadline heap vs re-checking every device each minute.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_offline --devices 1000 --hours 48
+
+A simulated clock drives `FleetHealth` the way the coordinator does. Every
+device checks in on its own cadence (5 to 60 minutes, a third of them in sleep
+mode overnight) and stops for good at a random time. A poll every `--poll`
+minutes re-evaluates the fleet; between polls the clock jumps straight to
+`next_deadline` and calls `expire()`, as the coordinator's single timer does.
+
+Correctness: each device must be flagged offline exactly at its deadline, which
+is recomputed independently from the device's last check-in, cadence and sleep
+window, not up to a poll interval later. Cost: the heap's pops and pushes are
+compared with the template-style alternative, re-checking every device's
+`last_seen` once a minute.
+"""
+import argparse
+import heapq
+import random
+import time
+from datetime import UTC, datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.trmnl.const import OFFLINE_MISSED_CHECKINS
+from custom_components.trmnl.health import OFFLINE, FleetHealth
+from custom_components.trmnl.models import FleetSnapshot, TrmnlDevice
+from custom_components.trmnl.scheduler import in_sleep_window
+
+OFFLINE_AFTER = 7200
+SLEEP_START = 23 * 60
+SLEEP_END = 6 * 60
+
+
+def make_device(index, spec, ping):
+    return TrmnlDevice(
+        f"D{index:05d}", f"MAC{index}", f"TRMNL {index}",
+        percent_charged=80, rssi=-60, last_ping_at=ping,
+        sleep_mode_enabled=spec["sleeps"], sleep_start_time=SLEEP_START, sleep_end_time=SLEEP_END,
+    )
+
+
+def expected_deadline(spec, ping):
+    """The deadline, derived from the device's script rather than the integration's code."""
+    silence = max(timedelta(seconds=OFFLINE_AFTER), OFFLINE_MISSED_CHECKINS * spec["cadence"])
+    deadline = ping + silence
+    local = dt_util.as_local(deadline)
+    if spec["sleeps"] and in_sleep_window(local.hour * 60 + local.minute, SLEEP_START, SLEEP_END):
+        wake = local.replace(hour=SLEEP_END // 60, minute=0, second=0, microsecond=0)
+        if wake <= local:
+            wake += timedelta(days=1)
+        deadline = dt_util.as_utc(wake) + silence
+    return deadline
+
+
+def simulate(device_count: int, hours: int, poll_minutes: int, seed: int) -> None:
+    rng = random.Random(seed)
+    start = datetime(2026, 7, 1, 12, tzinfo=UTC)
+    end = start + timedelta(hours=hours)
+    specs = [
+        {
+            "cadence": timedelta(minutes=rng.choice((5, 15, 30, 60))),
+            "sleeps": rng.random() < 1 / 3,
+            "dies_at": start + timedelta(minutes=rng.uniform(4 * 60, hours * 60)),
+        }
+        for _ in range(device_count)
+    ]
+    # Check-in times: the cadence, skipping sleep windows, until the device dies.
+    pings = []
+    for spec in specs:
+        times = []
+        at = start - 3 * spec["cadence"]
+        while at < spec["dies_at"]:
+            local = dt_util.as_local(at)
+            if not (spec["sleeps"] and in_sleep_window(local.hour * 60 + local.minute, SLEEP_START, SLEEP_END)):
+                times.append(at)
+            at += spec["cadence"]
+        pings.append(times)
+    cursor = [0] * device_count
+
+    def snapshot_at(now):
+        devices = []
+        for index, times in enumerate(pings):
+            while cursor[index] + 1 < len(times) and times[cursor[index] + 1] <= now:
+                cursor[index] += 1
+            devices.append(make_device(index, specs[index], times[cursor[index]]))
+        return FleetSnapshot(devices, fetched_at=now)
+
+    health = FleetHealth(20, -80, OFFLINE_AFTER)
+    # Let the cadence trackers learn two deltas from the pings before the clock starts.
+    for warmup in range(3):
+        health.evaluate(
+            FleetSnapshot([make_device(index, specs[index], pings[index][warmup]) for index in range(device_count)]),
+            start,
+        )
+    went_offline = {}
+    expire_calls = 0
+    heap_seconds = 0.0
+    now = start
+    next_poll = start
+    snapshot = None
+    while now < end:
+        if now >= next_poll:
+            snapshot = snapshot_at(now)
+            started = time.perf_counter()
+            for device, problem, active in health.evaluate(snapshot, now):
+                if problem == OFFLINE and active:
+                    went_offline.setdefault(device.friendly_id, now)
+            heap_seconds += time.perf_counter() - started
+            next_poll = now + timedelta(minutes=poll_minutes)
+        deadline = health.next_deadline
+        if deadline is not None and deadline < next_poll:
+            now = deadline
+            started = time.perf_counter()
+            for device, _problem, _active in health.expire(now):
+                went_offline.setdefault(device.friendly_id, now)
+            heap_seconds += time.perf_counter() - started
+            expire_calls += 1
+        else:
+            now = next_poll
+
+    off = exact = missing = 0
+    worst = timedelta()
+    for index, spec in enumerate(specs):
+        friendly_id = f"D{index:05d}"
+        deadline = expected_deadline(spec, pings[index][-1])
+        if deadline >= end:
+            continue
+        flagged = went_offline.get(friendly_id)
+        if flagged is None:
+            missing += 1
+        elif flagged == deadline:
+            exact += 1
+        else:
+            # Early flags count too: a device flagged before its deadline was alive.
+            off += 1
+            worst = max(worst, abs(flagged - deadline))
+    print(
+        f"{device_count} devices over {hours} h, polling every {poll_minutes} min: "
+        f"{exact} flagged offline exactly at their deadline, {off} off it (worst by {worst}), {missing} missed"
+    )
+
+    # The per-minute alternative: check every device's last_seen against the threshold.
+    states = {device.friendly_id: device.last_ping_iso for device in snapshot}
+    started = time.perf_counter()
+    minutes = hours * 60
+    threshold = timedelta(seconds=OFFLINE_AFTER)
+    for minute in range(minutes):
+        at = start + timedelta(minutes=minute)
+        sum(1 for last_seen in states.values() if at - datetime.fromisoformat(last_seen) > threshold)
+    scan_seconds = time.perf_counter() - started
+    print(
+        f"per-minute re-check: {minutes * device_count} device checks, {scan_seconds * 1000:.0f} ms; "
+        f"deadline heap: {expire_calls} timer wake-ups, {heap_seconds * 1000:.0f} ms including the polls"
+    )
+    assert not off and not missing, "devices were not flagged offline at their deadline"
+
+
+def heap_operations(device_count: int, seed: int) -> None:
+    """Count heap comparisons per expiry to show the O(log N) cost."""
+    rng = random.Random(seed)
+    comparisons = 0
+
+    class Counted(tuple):
+        def __lt__(self, other):
+            nonlocal comparisons
+            comparisons += 1
+            return tuple.__lt__(self, other)
+
+    heap = [Counted((rng.random(), index)) for index in range(device_count)]
+    heapq.heapify(heap)
+    comparisons = 0
+    for _ in range(device_count):
+        heapq.heappop(heap)
+    print(f"{device_count} deadlines: {comparisons / device_count:.1f} comparisons per expiry")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--hours", type=int, default=48)
+    parser.add_argument("--poll", type=int, default=30, help="minutes between polls")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    simulate(args.devices, args.hours, args.poll, args.seed)
+    for size in (1000, 10000, 100000):
+        heap_operations(size, args.seed)
@@ -0,0 +1,95 @@
+"""Entity churn and API calls caused by each kind of option change.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_options
+
+Interval and base-URL changes go through the real options flow; an API-key
+change is applied to the entry data directly, as a re-authentication would.
+"""
+import asyncio
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import EVENT_STATE_CHANGED, STATE_UNAVAILABLE
+
+from custom_components.trmnl.const import (
+    CONF_API_BASE_URL,
+    CONF_API_KEY,
+    CONF_SCAN_INTERVAL,
+    DOMAIN,
+)
+
+from .fake_api import FakeTrmnlApi
+from .fleet import make_payload
+from .harness import add_entry, running_hass
+
+API_KEY = "user_benchmark"
+DEVICES = 200
+
+
+async def _options_flow(hass, entry, user_input):
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    await hass.config_entries.options.async_configure(result["flow_id"], user_input)
+
+
+async def measure(label, change) -> None:
+    payload = make_payload(DEVICES)
+    async with FakeTrmnlApi(payload) as server_a, FakeTrmnlApi(payload) as server_b, running_hass() as hass:
+        entry = add_entry(hass, server_a.url, API_KEY)
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        churn = 0
+
+        def _count(event):
+            nonlocal churn
+            new_state = event.data["new_state"]
+            if new_state is None or new_state.state == STATE_UNAVAILABLE:
+                churn += 1
+
+        old_coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, _count)
+        requests_before = server_a.requests + server_b.requests
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await change(hass, entry, server_b.url)
+        await hass.async_block_till_done()
+        elapsed = loop.time() - start
+        unsub()
+        calls = server_a.requests + server_b.requests - requests_before
+        # The entry, rebuilt or not, must keep polling.
+        assert entry.state is ConfigEntryState.LOADED, entry.state
+        assert len(entry.update_listeners) == 1, "the old setup's unload callbacks never ran"
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        if coordinator is not old_coordinator:
+            # A rebuild must stop the old coordinator's polling.
+            assert old_coordinator._shutdown_requested, f"{label}: the old coordinator still polls"  # pylint: disable=protected-access
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success, f"{label}: polling failed after the change"
+        await hass.config_entries.async_unload(entry.entry_id)
+    print(
+        f"{label:>18}: {elapsed * 1000:8.1f} ms, {calls} API calls, "
+        f"{churn} entity removals/unavailable states ({DEVICES * 5} entities)"
+    )
+
+
+async def change_interval(hass, entry, _):
+    await _options_flow(hass, entry, {CONF_SCAN_INTERVAL: 600})
+
+
+async def change_base_url(hass, entry, other_url):
+    await _options_flow(hass, entry, {CONF_API_BASE_URL: other_url})
+
+
+async def change_api_key(hass, entry, _):
+    hass.config_entries.async_update_entry(entry, data={**entry.data, CONF_API_KEY: "user_other"})
+
+
+async def main() -> None:
+    await measure("scan interval", change_interval)
+    await measure("base URL", change_base_url)
+    await measure("API key", change_api_key)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""Freshness and API load of pushed device updates versus polling.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_push --devices 100 --pushes 200
+
+Sets up an entry with push enabled inside a throwaway Home Assistant with its
+HTTP server on a local port, posts single-device updates to the webhook and
+measures the time until the entity state reflects each one. Polling freshness is
+reported for comparison as the average age of data at a given interval.
+"""
+import argparse
+import asyncio
+import copy
+import socket
+import statistics
+import time
+
+import aiohttp
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import callback
+from homeassistant.setup import async_setup_component
+
+from custom_components.trmnl.const import (
+    CONF_PUSH_ENABLED,
+    CONF_PUSH_TOKEN,
+    CONF_WEBHOOK_ID,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+)
+
+from .fake_api import FakeTrmnlApi
+from .fleet import make_payload
+from .harness import add_entry, running_hass
+
+API_KEY = "user_benchmark"
+WEBHOOK_ID = "benchmark_push"
+TOKEN = "benchmark-token"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def main(devices: int, pushes: int) -> None:
+    payload = make_payload(devices)
+    async with FakeTrmnlApi(payload, api_key=API_KEY) as server, running_hass() as hass:
+        port = _free_port()
+        assert await async_setup_component(
+            hass, "http", {"http": {"server_host": "127.0.0.1", "server_port": port}}
+        )
+        await hass.async_start()
+        entry = add_entry(
+            hass,
+            server.url,
+            API_KEY,
+            options={CONF_PUSH_ENABLED: True, CONF_WEBHOOK_ID: WEBHOOK_ID, CONF_PUSH_TOKEN: TOKEN},
+        )
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        polls_before = server.requests
+
+        url = f"http://127.0.0.1:{port}/api/webhook/{WEBHOOK_ID}"
+        headers = {"Authorization": f"Bearer {TOKEN}"}
+        latencies = []
+        expected = None
+        arrived = asyncio.Event()
+
+        @callback
+        def _state_changed(event) -> None:
+            new_state = event.data["new_state"]
+            if new_state is not None and (new_state.entity_id, new_state.state) == expected:
+                arrived.set()
+
+        unsubscribe = hass.bus.async_listen(EVENT_STATE_CHANGED, _state_changed)
+        async with aiohttp.ClientSession() as session:
+            for index in range(pushes):
+                device = copy.deepcopy(payload["data"][index % devices])
+                device["rssi"] = -100 + index % 60
+                entity_id = f"sensor.{device['name'].lower().replace(' ', '_')}_signal_strength"
+                expected = (entity_id, str(device["rssi"]))
+                arrived.clear()
+                start = time.perf_counter()
+                async with session.post(url, json=device, headers=headers) as response:
+                    response.raise_for_status()
+                # The state may already have been written (or hold this value) by now.
+                if (state := hass.states.get(entity_id)) is None or state.state != expected[1]:
+                    await arrived.wait()
+                latencies.append(time.perf_counter() - start)
+        unsubscribe()
+
+        latencies.sort()
+        print(
+            f"push: median {statistics.median(latencies) * 1000:.2f} ms, "
+            f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f} ms from POST to entity state "
+            f"({coordinator.pushed_changes} changes, {server.requests - polls_before} API requests meanwhile)"
+        )
+        print(
+            f"poll: data is on average {DEFAULT_SCAN_INTERVAL / 2:.0f} s old at the default "
+            f"{DEFAULT_SCAN_INTERVAL} s interval ({3600 // DEFAULT_SCAN_INTERVAL} requests/hour); "
+            f"with push the fallback poll runs {3600 // DEFAULT_MAX_POLL_INTERVAL}x/hour"
+        )
+        await hass.config_entries.async_unload(entry.entry_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--pushes", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.devices, args.pushes))
@@ -0,0 +1,77 @@
+"""Per-refresh state-read cost and memory: raw payload dicts vs parse-once `TrmnlDevice`.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_records
+"""
+import timeit
+import tracemalloc
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.trmnl.models import calculate_battery_percentage, parse_devices
+
+from .fleet import make_fleet
+
+
+def read_raw(devices):
+    """What the sensors used to do on every state write."""
+    reads = []
+    for device in devices:
+        percent = device.get("percent_charged")
+        reads.append((
+            float(device["battery_voltage"]),
+            round(float(percent)) if percent is not None
+            else calculate_battery_percentage(float(device["battery_voltage"])),
+            device["rssi"],
+            device.get("wifi_strength"),
+            dt_util.as_utc(dt_util.parse_datetime(device["last_ping_at"])).isoformat(),
+            device.get("hardware_last_ping_at"),
+        ))
+    return reads
+
+
+def read_records(records):
+    return [
+        (
+            device.battery_voltage,
+            device.battery_percentage,
+            device.rssi,
+            device.wifi_strength,
+            device.last_ping_iso,
+            device.hardware_last_ping_at,
+        )
+        for device in records
+    ]
+
+
+def _retained_bytes(factory):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = factory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del kept
+    return size
+
+
+def main() -> None:
+    print(f"{'devices':>8} {'raw ms':>9} {'parse ms':>9} {'read ms':>9} {'raw B/dev':>10} {'rec B/dev':>10}")
+    for count in (100, 1000, 10000):
+        devices = make_fleet(count)
+        records = parse_devices(devices)
+        number = max(1, 20000 // count)
+        raw = min(timeit.repeat(lambda devices=devices: read_raw(devices), number=number, repeat=3)) / number
+        parse = min(timeit.repeat(lambda devices=devices: parse_devices(devices), number=number, repeat=3)) / number
+        read = min(timeit.repeat(lambda records=records: read_records(records), number=number, repeat=3)) / number
+        raw_mem = _retained_bytes(lambda count=count: make_fleet(count)) / count
+        rec_mem = _retained_bytes(lambda devices=devices: parse_devices(devices)) / count
+        print(
+            f"{count:>8} {raw * 1000:>9.3f} {parse * 1000:>9.3f} {read * 1000:>9.3f} "
+            f"{raw_mem:>10.0f} {rec_mem:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Drive the integration through a recorded (or synthetic) traffic log.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_replay --trace trace.jsonl.gz
+    python -m benchmarks.bench_replay --synthesize --devices 50 --hours 24
+
+Sets up an entry against a replay server and polls through the whole trace
+every `--scan-interval` seconds of recorded time. By default replay time jumps
+straight to each poll, so a day runs in seconds; with `--speed N` the server
+replays N times faster than real time and the polls are spaced accordingly.
+Reports API requests, 304s, entity state writes and event-loop CPU, scaled to
+one simulated day.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from homeassistant.const import EVENT_STATE_CHANGED
+
+from custom_components.trmnl.const import DEFAULT_SCAN_INTERVAL, DOMAIN
+
+from .harness import add_entry, running_hass
+from .replay import TrafficReplayServer, synthesize_traffic
+
+API_KEY = "user_benchmark"
+DAY = 86400
+
+
+async def main(trace: str, scan_interval: int, speed: float | None) -> None:
+    server = TrafficReplayServer.from_file(trace, speed=speed or 1.0)
+    duration = server.end_time - server.start_time
+    async with server, running_hass() as hass:
+        if speed is None:
+            server.seek(server.start_time)
+        writes = []
+        hass.bus.async_listen(EVENT_STATE_CHANGED, lambda event: writes.append(1))
+        entry = add_entry(hass, server.url, API_KEY, scan_interval=scan_interval)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        # Compressed time would exhaust the per-server rate budget meant for real time.
+        coordinator.client.limiter = None
+
+        polls = 0
+        cpu = 0.0
+        wall = time.perf_counter()
+        replay_time = server.start_time
+        while replay_time + scan_interval <= server.end_time:
+            replay_time += scan_interval
+            if speed is None:
+                server.seek(replay_time)
+            else:
+                await asyncio.sleep(scan_interval / speed)
+            start = time.process_time()
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+            cpu += time.process_time() - start
+            polls += 1
+        wall = time.perf_counter() - wall
+        await hass.config_entries.async_unload(entry.entry_id)
+
+    scale = DAY / max(duration, scan_interval)
+    print(
+        f"replayed {duration / 3600:.1f} h of traffic ({len(server.entries)} recorded responses) "
+        f"in {wall:.2f} s with {polls} polls every {scan_interval} s"
+    )
+    print(
+        f"per simulated day: {server.requests * scale:.0f} API requests "
+        f"({server.not_modified * scale:.0f} answered 304), "
+        f"{len(writes) * scale:.0f} state writes, {cpu * scale:.3f} s event-loop CPU"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trace", help="traffic log recorded with benchmarks.record_traffic")
+    parser.add_argument("--synthesize", action="store_true", help="replay a generated trace instead")
+    parser.add_argument("--devices", type=int, default=20, help="devices in a synthesized trace")
+    parser.add_argument("--hours", type=float, default=24, help="length of a synthesized trace")
+    parser.add_argument("--scan-interval", type=int, default=DEFAULT_SCAN_INTERVAL)
+    parser.add_argument("--speed", type=float, help="replay in real time scaled by this factor")
+    args = parser.parse_args()
+    if args.synthesize:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.jsonl.gz")
+            synthesize_traffic(path, devices=args.devices, hours=args.hours)
+            asyncio.run(main(path, args.scan_interval, args.speed))
+    elif args.trace:
+        asyncio.run(main(args.trace, args.scan_interval, args.speed))
+    else:
+        parser.error("pass --trace or --synthesize")
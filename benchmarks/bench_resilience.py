@@ -0,0 +1,80 @@
+"""Retry, Retry-After and circuit-breaker behaviour against injected faults.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_resilience
+
+Backoff sleeps and the breaker clock are simulated, so the run takes well under
+a second; the reported times are the simulated waits. As in the coordinator,
+only transport and server errors count towards the breaker, and each scenario
+checks the outcome of every poll.
+"""
+import asyncio
+
+import aiohttp
+
+from custom_components.trmnl.api import (
+    TrmnlApiClient,
+    TrmnlApiConnectionError,
+    TrmnlApiError,
+)
+from custom_components.trmnl.resilience import CircuitBreaker, fetch_with_retry
+
+from .fake_api import FakeTrmnlApi
+
+API_KEY = "user_benchmark"
+
+
+class SimulatedTime:
+    def __init__(self):
+        self.now = 0.0
+
+    def clock(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.now += delay
+
+
+async def run(label: str, faults, expected: str, poll_interval: float = 300.0) -> None:
+    sim = SimulatedTime()
+    breaker = CircuitBreaker(clock=sim.clock)
+    outcomes = []
+    async with FakeTrmnlApi(api_key=API_KEY, faults=faults) as server, aiohttp.ClientSession() as session:
+        client = TrmnlApiClient(session, API_KEY, server.url, timeout=0.5)
+        for _ in expected.split():
+            if not breaker.allow_request():
+                outcomes.append("skip")
+            else:
+                attempts = 1 if breaker.probing else 3
+                try:
+                    await fetch_with_retry(client.get_devices, attempts=attempts, sleep=sim.sleep)
+                except TrmnlApiConnectionError as err:
+                    closed = breaker.state == CircuitBreaker.CLOSED
+                    breaker.record_failure(getattr(err, "retry_after", None))
+                    # "trip": the failure that opened the breaker.
+                    outcomes.append("trip" if closed and breaker.state == CircuitBreaker.OPEN else "fail")
+                except TrmnlApiError:
+                    breaker.record_success()
+                    outcomes.append("error")
+                else:
+                    breaker.record_success()
+                    outcomes.append("ok")
+            sim.now += poll_interval
+    print(f"{label:>26}: {server.requests:3} requests, polls: {' '.join(outcomes)}")
+    assert " ".join(outcomes) == expected, f"{label}: expected {expected}"
+
+
+async def main() -> None:
+    await run("transient 500", [500], "ok ok ok")
+    await run("latency spike (timeout)", [2.0], "ok ok ok")
+    await run("429 Retry-After 5", [(429, {"Retry-After": "5"})], "ok ok ok")
+    # Waited out for 900 s, without opening the breaker and its longer cool-down.
+    await run("429 Retry-After 900", [(429, {"Retry-After": "900"})], "fail skip skip ok ok ok")
+    await run("outage then recovery", [503] * 11, "fail fail trip fail skip fail skip skip skip ok ok ok")
+    # A rejected key is reported on every poll instead of being paused.
+    await run("auth failures", [401] * 4, "error error error error ok")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
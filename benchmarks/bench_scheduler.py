@@ -0,0 +1,126 @@
+"""Polls issued and data staleness over a simulated day: fixed vs adaptive polling.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_scheduler --scan-interval 300
+
+Each simulated device checks in on its own cadence (one of a fleet's cadences,
+random phase) and, for a fraction of the fleet, stays silent inside its sleep
+window, checking in again when it wakes. Staleness is the time between a
+device's check-in and the first poll that sees it.
+
+By default a few fleet shapes are compared. Adaptive polling pays off when
+check-ins are sparser than the scan interval: few or slow panels, or a night
+in which every panel sleeps. A larger fleet with mixed cadences and some panels
+that never sleep has a check-in due within every scan interval, so there it
+polls as often as fixed polling. Pass `--devices` (with `--cadences` and
+`--sleep-fraction`) to simulate one fleet of your own.
+"""
+import argparse
+import random
+from datetime import UTC, datetime, timedelta
+
+from custom_components.trmnl.models import TrmnlDevice
+from custom_components.trmnl.scheduler import AdaptivePollScheduler, in_sleep_window
+
+START = datetime(2026, 6, 23, 0, 0, tzinfo=UTC)
+DAY = timedelta(days=1)
+
+# (label, panels, cadences in minutes, fraction with a 22:00-08:00 sleep window)
+SHAPES = (
+    ("one panel refreshing every 30 min", 1, (30,), 0.0),
+    ("5 panels refreshing hourly", 5, (60,), 0.0),
+    ("20 panels, all asleep overnight", 20, (15, 30, 60), 1.0),
+    ("20 panels, 30% never asleep", 20, (15, 30, 60), 0.7),
+)
+
+
+class SimulatedPanel:
+    def __init__(self, index: int, rng: random.Random, cadences, sleep_fraction: float):
+        self.friendly_id = f"SIM{index}"
+        self.cadence = timedelta(minutes=rng.choice(cadences))
+        self.sleep = rng.random() < sleep_fraction
+        self.sleep_start, self.sleep_end = 1320, 480
+        self.pings = []
+        t = START - rng.random() * self.cadence
+        while t < START + DAY:
+            minute = t.hour * 60 + t.minute
+            if self.sleep and in_sleep_window(minute, self.sleep_start, self.sleep_end):
+                t = t.replace(hour=self.sleep_end // 60, minute=self.sleep_end % 60, second=0)
+                if t.hour * 60 + t.minute <= minute:
+                    t += timedelta(days=1)
+            self.pings.append(t)
+            t += self.cadence
+
+    def last_ping(self, now: datetime):
+        latest = None
+        for ping in self.pings:
+            if ping > now:
+                break
+            latest = ping
+        return latest
+
+    def record(self, now: datetime) -> TrmnlDevice:
+        return TrmnlDevice(
+            friendly_id=self.friendly_id,
+            mac_address=self.friendly_id,
+            name=self.friendly_id,
+            last_ping_at=self.last_ping(now),
+            sleep_mode_enabled=self.sleep,
+            sleep_start_time=self.sleep_start,
+            sleep_end_time=self.sleep_end,
+        )
+
+
+def simulate(panels, scan_interval: timedelta, scheduler: AdaptivePollScheduler | None):
+    now = START
+    polls = 0
+    seen = {panel.friendly_id: None for panel in panels}
+    staleness = []
+    while now < START + DAY:
+        polls += 1
+        devices = [panel.record(now) for panel in panels]
+        for panel, device in zip(panels, devices, strict=True):
+            previous = seen[panel.friendly_id]
+            if device.last_ping_at != previous:
+                # Every check-in since the previous poll is only seen now.
+                if previous is not None:
+                    staleness.extend(
+                        (now - ping).total_seconds() for ping in panel.pings if previous < ping <= now
+                    )
+                seen[panel.friendly_id] = device.last_ping_at
+        now += scheduler.next_interval(devices, now) if scheduler else scan_interval
+    return polls, max(staleness, default=0), sum(staleness) / max(len(staleness), 1)
+
+
+def compare(panels, scan_interval: int, max_interval: int) -> None:
+    interval = timedelta(seconds=scan_interval)
+    scheduler = AdaptivePollScheduler(interval, timedelta(seconds=max_interval))
+    for label, sched in (("fixed", None), ("adaptive", scheduler)):
+        polls, worst, mean = simulate(panels, interval, sched)
+        print(f"{label:>11}: {polls:5} polls/day, staleness mean {mean:6.0f} s, max {worst:6.0f} s")
+    print(f"{'':>11}  polls avoided (scheduler counter): {scheduler.polls_avoided:.0f}")
+
+
+def main(shapes, scan_interval: int, max_interval: int) -> None:
+    for label, devices, cadences, sleep_fraction in shapes:
+        rng = random.Random(0)
+        panels = [SimulatedPanel(index, rng, cadences, sleep_fraction) for index in range(devices)]
+        print(label)
+        compare(panels, scan_interval, max_interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, help="simulate only this fleet instead of the preset shapes")
+    parser.add_argument("--scan-interval", type=int, default=300)
+    parser.add_argument("--max-interval", type=int, default=3600)
+    parser.add_argument("--cadences", default="15,30,60", help="comma-separated minutes (with --devices)")
+    parser.add_argument("--sleep-fraction", type=float, default=0.7, help="with --devices")
+    args = parser.parse_args()
+    if args.devices is None:
+        shapes = SHAPES
+    else:
+        cadences = [int(minutes) for minutes in args.cadences.split(",")]
+        shapes = [(f"{args.devices} panels", args.devices, cadences, args.sleep_fraction)]
+    main(shapes, args.scan_interval, args.max_interval)
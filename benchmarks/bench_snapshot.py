@@ -0,0 +1,53 @@
+"""Per-refresh entity lookup cost: linear scan of the device list vs `FleetSnapshot`.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_snapshot
+
+One refresh is modelled as every entity (5 per device, the Last Seen sensor
+reading twice) resolving its device once.
+"""
+import timeit
+
+from custom_components.trmnl.models import FleetSnapshot, parse_devices
+
+from .fleet import make_fleet
+
+LOOKUPS_PER_DEVICE = 6
+
+
+def refresh_scan(devices, friendly_ids):
+    for friendly_id in friendly_ids:
+        for _ in range(LOOKUPS_PER_DEVICE):
+            for device in devices:
+                if device["friendly_id"] == friendly_id:
+                    break
+
+
+def refresh_snapshot(records, friendly_ids):
+    snapshot = FleetSnapshot(records)
+    for friendly_id in friendly_ids:
+        for _ in range(LOOKUPS_PER_DEVICE):
+            snapshot.get(friendly_id)
+
+
+def main() -> None:
+    print(f"{'devices':>8} {'scan ms':>10} {'snapshot ms':>12} {'speedup':>8}")
+    for count in (10, 50, 100, 300, 1000):
+        devices = make_fleet(count)
+        records = parse_devices(devices)
+        friendly_ids = [device["friendly_id"] for device in devices]
+        number = max(1, 2000 // count)
+        scan = min(timeit.repeat(
+            lambda devices=devices, friendly_ids=friendly_ids: refresh_scan(devices, friendly_ids),
+            number=number, repeat=3,
+        )) / number
+        snap = min(timeit.repeat(
+            lambda records=records, friendly_ids=friendly_ids: refresh_snapshot(records, friendly_ids),
+            number=number, repeat=3,
+        )) / number
+        print(f"{count:>8} {scan * 1000:>10.3f} {snap * 1000:>12.3f} {scan / snap:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
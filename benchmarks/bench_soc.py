@@ -0,0 +1,139 @@
+"""Voltage -> percentage lookup throughput and calibrated-curve accuracy.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_soc --devices 40 --days 14
+
+Throughput compares the old linear scan of the LiPo table with the bisect
+lookup of `SocCurve`, per voltage and through the batch API.
+
+Accuracy simulates a fleet whose batteries do not follow the built-in curve:
+cell voltages sit `--offset` volts lower at the same charge (an aged or
+different cell), plus a small per-device offset and reading noise. Half the
+fleet reports `percent_charged`, the other half only a voltage. After `--days`
+of check-ins through `FleetSocCalibration`, the benchmark reports how far the
+voltage-only devices' percentages are from the truth with the built-in curve
+and with the calibrated one, then checks the state survives a JSON round trip
+as it does through the store.
+"""
+import argparse
+import json
+import random
+import timeit
+from bisect import bisect_right
+from datetime import UTC, datetime, timedelta
+from itertools import pairwise
+
+from custom_components.trmnl.const import LIPO_SOC_CURVE, MAX_VOLTAGE, MIN_VOLTAGE
+from custom_components.trmnl.models import TrmnlDevice
+from custom_components.trmnl.soc import DEFAULT_SOC_CURVE, FleetSocCalibration
+
+CHECKIN_INTERVAL = 900
+
+
+def linear_scan(voltage):
+    """The lookup `calculate_battery_percentage` used before the bisect table."""
+    if voltage <= MIN_VOLTAGE:
+        return 0
+    if voltage >= MAX_VOLTAGE:
+        return 100
+    for (low_v, low_pct), (high_v, high_pct) in pairwise(LIPO_SOC_CURVE):
+        if low_v <= voltage <= high_v:
+            ratio = (voltage - low_v) / (high_v - low_v)
+            return round(low_pct + ratio * (high_pct - low_pct))
+    return 0 if voltage < LIPO_SOC_CURVE[0][0] else 100
+
+
+def throughput() -> None:
+    rng = random.Random(0)
+    voltages = [round(rng.uniform(3.2, 4.25), 3) for _ in range(10_000)]
+    assert [linear_scan(v) for v in voltages] == DEFAULT_SOC_CURVE.percentages(voltages)
+    for label, func in (
+        ("linear scan", lambda: [linear_scan(v) for v in voltages]),
+        ("bisect", lambda: [DEFAULT_SOC_CURVE.percentage(v) for v in voltages]),
+        ("bisect batch", lambda: DEFAULT_SOC_CURVE.percentages(voltages)),
+    ):
+        seconds = min(timeit.repeat(func, number=20, repeat=5)) / 20 / len(voltages)
+        print(f"{label:>13}: {seconds * 1e9:6.0f} ns/lookup")
+
+
+def accuracy(devices: int, days: float, offset: float, noise: float, seed: int) -> None:
+    rng = random.Random(seed)
+
+    def voltage_at(percent, device_offset):
+        return round(true_voltage(percent) - offset + device_offset + rng.gauss(0, noise), 3)
+
+    fleet = [
+        {
+            "friendly_id": f"D{index:04d}",
+            "offset": rng.gauss(0, 0.01),
+            "level": rng.uniform(20, 100),
+            "rate": rng.uniform(3, 12),
+            "gauge": index % 2 == 0,
+        }
+        for index in range(devices)
+    ]
+    calibration = FleetSocCalibration()
+    start = datetime(2026, 7, 1, tzinfo=UTC)
+    for step in range(int(days * 86400 // CHECKIN_INTERVAL)):
+        ping = start + timedelta(seconds=step * CHECKIN_INTERVAL)
+        records = []
+        for device in fleet:
+            device["level"] -= device["rate"] * CHECKIN_INTERVAL / 86400
+            if device["level"] < 5:
+                device["level"] = 100.0
+            records.append(TrmnlDevice(
+                device["friendly_id"], device["friendly_id"], device["friendly_id"],
+                battery_voltage=voltage_at(device["level"], device["offset"]),
+                percent_charged=round(device["level"], 2) if device["gauge"] else None,
+                last_ping_at=ping,
+            ))
+        calibration.apply(records)
+
+    builtin_errors, calibrated_errors = [], []
+    for device in fleet:
+        if device["gauge"]:
+            continue
+        for percent in range(5, 100, 5):
+            record = TrmnlDevice(
+                device["friendly_id"], device["friendly_id"], device["friendly_id"],
+                battery_voltage=voltage_at(percent, device["offset"]),
+            )
+            builtin_errors.append(abs(record.battery_percentage - percent))
+            calibration.apply([record])
+            calibrated_errors.append(abs(record.battery_percentage - percent))
+    summary = calibration.summary()
+    print(
+        f"after {days:g} days: fleet curve from {summary['fleet_bins']} voltage bins; "
+        f"voltage-only devices' mean absolute error: built-in curve "
+        f"{sum(builtin_errors) / len(builtin_errors):.1f} points, calibrated "
+        f"{sum(calibrated_errors) / len(calibrated_errors):.1f} points"
+    )
+
+    restored = FleetSocCalibration.from_dict(json.loads(json.dumps(calibration.as_dict())))
+    voltages = [round(3.3 + step * 0.005, 3) for step in range(180)]
+    same = restored.fleet.curve.percentages(voltages) == calibration.fleet.curve.percentages(voltages)
+    print(
+        f"store round trip: {len(json.dumps(calibration.as_dict()))} bytes, "
+        f"curve {'identical' if same else 'DIFFERS'}"
+    )
+
+
+def true_voltage(percent: float) -> float:
+    """Invert the built-in curve (unrounded); the simulated cells sit an offset below it."""
+    percents = [point for _, point in LIPO_SOC_CURVE]
+    index = min(max(bisect_right(percents, percent), 1), len(percents) - 1)
+    (low_v, low_pct), (high_v, high_pct) = LIPO_SOC_CURVE[index - 1], LIPO_SOC_CURVE[index]
+    return low_v + (percent - low_pct) * (high_v - low_v) / (high_pct - low_pct)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=40)
+    parser.add_argument("--days", type=float, default=14)
+    parser.add_argument("--offset", type=float, default=0.05, help="volts the simulated cells sit below the built-in curve")
+    parser.add_argument("--noise", type=float, default=0.005, help="standard deviation of voltage readings (V)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    throughput()
+    accuracy(args.devices, args.days, args.offset, args.noise, args.seed)
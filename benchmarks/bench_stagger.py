@@ -0,0 +1,112 @@
+"""Measure how the domain-wide request scheduler spreads several entries' polls.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_stagger --entries 8 --scan-interval 300
+
+Two parts. The first replays an hour of fixed-interval polling for every entry and
+reports the largest number of polls that start within the same second, with and
+without slot alignment (without it, entries set up together keep polling
+together). The second fires every entry at the same moment against one stand-in
+server, once with a client per entry on its own session and once through the
+scheduler's shared session and limiter, and reports the server's peak concurrency
+and TCP connection count. The third sets up two entries on the same server in
+Home Assistant, reloads one, and checks the other still polls through the
+shared session.
+"""
+import argparse
+import asyncio
+import logging
+from collections import Counter
+from datetime import timedelta
+
+import aiohttp
+
+from custom_components.trmnl.api import TrmnlApiClient
+from custom_components.trmnl.request_scheduler import HostLimiter, TrmnlRequestScheduler
+
+from .fake_api import FakeTrmnlApi
+from .harness import add_entry, running_hass
+
+HOUR = 3600
+
+
+def simulate_starts(entries: int, interval: timedelta, staggered: bool, start: float = 1_700_000_000.0):
+    """Count poll starts per whole second over the hour after a simultaneous setup."""
+    scheduler = TrmnlRequestScheduler(hass=None)
+    ids = [f"entry{index}" for index in range(entries)]
+    if staggered:
+        for entry_id in ids:
+            scheduler.async_register(entry_id)
+    starts = Counter()
+    for entry_id in ids:
+        # Every entry was set up (and polled) at the same moment; count what follows.
+        now = start + scheduler.next_poll_delay(entry_id, interval, start).total_seconds()
+        while now < start + HOUR:
+            starts[int(now)] += 1
+            now += scheduler.next_poll_delay(entry_id, interval, now).total_seconds()
+    return starts
+
+
+async def burst(server_url: str, entries: int, shared: bool) -> None:
+    limiter = HostLimiter() if shared else None
+    sessions = [aiohttp.ClientSession() for _ in range(1 if shared else entries)]
+    try:
+        clients = [
+            TrmnlApiClient(sessions[index % len(sessions)], f"user_{index}", server_url, limiter=limiter)
+            for index in range(entries)
+        ]
+        await asyncio.gather(*(client.get_devices() for client in clients))
+    finally:
+        for session in sessions:
+            await session.close()
+
+
+async def reload_one_of_two(server_url: str) -> None:
+    """Reload one of two entries sharing a server's session; the other must keep polling."""
+    # Both accounts see the same stand-in devices; the duplicate unique IDs are expected.
+    for platform in ("sensor", "binary_sensor"):
+        logging.getLogger(f"homeassistant.components.{platform}").setLevel(logging.CRITICAL)
+    async with running_hass() as hass:
+        entry_a = add_entry(hass, server_url, "user_a")
+        entry_b = add_entry(hass, server_url, "user_b")
+        # Setting up the integration sets up both entries.
+        assert await hass.config_entries.async_setup(entry_a.entry_id)
+        await hass.async_block_till_done()
+        assert await hass.config_entries.async_reload(entry_a.entry_id)
+        await hass.async_block_till_done()
+        for entry in (entry_a, entry_b):
+            coordinator = hass.data["trmnl"][entry.entry_id]["coordinator"]
+            await coordinator.async_refresh()
+            assert coordinator.last_update_success, f"{entry.unique_id} stopped polling after the reload"
+        for entry in (entry_a, entry_b):
+            await hass.config_entries.async_unload(entry.entry_id)
+    print("reload: the other entry on the same server kept polling")
+
+
+async def main(entries: int, scan_interval: int, latency: float) -> None:
+    interval = timedelta(seconds=scan_interval)
+    for label, staggered in (("unaligned", False), ("staggered", True)):
+        starts = simulate_starts(entries, interval, staggered)
+        print(
+            f"{label:>10}: {sum(starts.values())} polls/hour, "
+            f"at most {max(starts.values())} starting in the same second"
+        )
+    for label, shared in (("own session", False), ("scheduler", True)):
+        async with FakeTrmnlApi(latency=latency) as server:
+            await burst(server.url, entries, shared)
+            print(
+                f"{label:>11}: peak {server.peak_in_flight} concurrent requests, "
+                f"{server.connections} TCP connections for {server.requests} requests"
+            )
+    async with FakeTrmnlApi() as server:
+        await reload_one_of_two(server.url)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=8)
+    parser.add_argument("--scan-interval", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05, help="server latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.entries, args.scan_interval, args.latency))
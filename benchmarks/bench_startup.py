@@ -0,0 +1,219 @@
+"""Startup profile: import time, setup time and first entity availability, with a budget.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup --latency 3 --check
+
+Import time is measured in fresh interpreters that already loaded the parts of
+Home Assistant every boot loads, so only the integration's own cost counts; the
+median of `--repeat` runs is reported. The config flow module is timed on its own:
+Home Assistant imports it to set up every entry (it checks for migrations), so it
+is on the startup path even when no flow runs. Modules meant to load on first use
+only (the traffic log reader, ijson) must not show up.
+
+Setup scenarios: cold start (no snapshot) against a slow server, warm start from
+the persisted snapshot against the same slow server, and warm start with the
+server unreachable. For each, `async_setup` wall time and the time until the
+first device sensor has a state other than unavailable/unknown.
+
+`--check` compares the results with BUDGET and exits non-zero listing every
+number over its budget, so a regression on the startup path fails loudly.
+"""
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from homeassistant.const import EVENT_STATE_CHANGED, STATE_UNAVAILABLE, STATE_UNKNOWN
+
+from custom_components.trmnl.const import DOMAIN, STORAGE_VERSION
+
+from .fake_api import FakeTrmnlApi
+from .harness import add_entry, running_hass
+
+API_KEY = "user_benchmark"
+ENTRY_ID = "benchmark_entry"
+
+# Loaded by Home Assistant before it imports a custom integration.
+HA_PRELOADED = (
+    "homeassistant.config_entries",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.event",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.components.webhook",
+)
+# Needed only once a backfill reads a traffic log or a fleet-sized body arrives.
+DEFERRED_MODULES = (
+    "custom_components.trmnl.traffic",
+    "ijson",
+)
+# Milliseconds, with headroom over a typical run so timing noise does not trip it
+# (the import takes 42-47 ms with the locked Home Assistant on Python 3.13).
+BUDGET = {
+    "import_ms": 60,
+    "flow_import_ms": 15,
+    "warm_setup_ms": 150,
+    "warm_first_available_ms": 150,
+    "down_setup_ms": 150,
+    "down_first_available_ms": 150,
+}
+
+_IMPORT_PROBE = """
+import importlib, json, sys, time
+for name in {preloaded!r}:
+    importlib.import_module(name)
+start = time.perf_counter()
+import custom_components.trmnl
+imported = time.perf_counter()
+import custom_components.trmnl.config_flow
+flow_imported = time.perf_counter()
+print(json.dumps({{
+    "import_s": imported - start,
+    "flow_import_s": flow_imported - imported,
+    "deferred": [name for name in {deferred!r} if name in sys.modules],
+}}))
+"""
+
+
+def measure_import(repeat: int) -> dict:
+    """Median import times of the package and its config flow over `repeat` fresh interpreters."""
+    probe = _IMPORT_PROBE.format(preloaded=HA_PRELOADED, deferred=DEFERRED_MODULES)
+    runs = []
+    # One extra, discarded run so byte-compiling changed sources is not counted.
+    for _ in range(repeat + 1):
+        output = subprocess.run(
+            [sys.executable, "-c", probe], check=True, capture_output=True, text=True
+        ).stdout
+        runs.append(json.loads(output.splitlines()[-1]))
+    runs = runs[1:]
+    return {
+        "import_s": statistics.median(run["import_s"] for run in runs),
+        "flow_import_s": statistics.median(run["flow_import_s"] for run in runs),
+        "deferred": sorted({name for run in runs for name in run["deferred"]}),
+    }
+
+
+def _unused_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def _seed_snapshot(config_dir: str, payload: dict) -> None:
+    path = Path(config_dir, ".storage", f"{DOMAIN}.{ENTRY_ID}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "version": STORAGE_VERSION,
+        "key": f"{DOMAIN}.{ENTRY_ID}",
+        "data": {"fetched_at": "2026-06-23T18:00:00+00:00", "devices": payload["data"]},
+    }))
+
+
+async def measure(base_url: str, payload: dict, seeded: bool) -> dict:
+    with tempfile.TemporaryDirectory() as config_dir:
+        if seeded:
+            _seed_snapshot(config_dir, payload)
+        async with running_hass(config_dir) as hass:
+            entry = add_entry(hass, base_url, API_KEY, entry_id=ENTRY_ID)
+            first_available = None
+
+            def _state_changed(event):
+                nonlocal first_available
+                state = event.data["new_state"]
+                if (
+                    first_available is None
+                    and state is not None
+                    and state.domain == "sensor"
+                    and state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN)
+                ):
+                    first_available = time.perf_counter() - start
+
+            unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, _state_changed)
+            loaded_before = set(sys.modules)
+            start = time.perf_counter()
+            ok = await hass.config_entries.async_setup(entry.entry_id)
+            setup = time.perf_counter() - start
+            deferred = [
+                name for name in DEFERRED_MODULES if name in sys.modules and name not in loaded_before
+            ]
+            unsub()
+            available = sum(
+                1 for state in hass.states.async_all("sensor") if state.state != STATE_UNAVAILABLE
+            )
+            await hass.config_entries.async_unload(entry.entry_id)
+    return {
+        "setup_s": setup,
+        "first_available_s": first_available,
+        "loaded": ok,
+        "available_entities": available,
+        "deferred": deferred,
+    }
+
+
+def over_budget(results: dict) -> list:
+    """Return a line per number in `results` that exceeds its BUDGET entry."""
+    failures = []
+    for key, limit in BUDGET.items():
+        if results.get(key) is None:
+            failures.append(f"{key}: never reached (budget {limit} ms)")
+        elif results[key] > limit:
+            failures.append(f"{key}: {results[key]:.1f} ms > {limit} ms")
+    return failures
+
+
+async def main(latency: float, repeat: int, check: bool) -> None:
+    results = {}
+    imported = measure_import(repeat)
+    results["import_ms"] = imported["import_s"] * 1000
+    results["flow_import_ms"] = imported["flow_import_s"] * 1000
+    print(
+        f"import custom_components.trmnl: {results['import_ms']:.1f} ms, then config_flow: "
+        f"{results['flow_import_ms']:.1f} ms (median of {repeat}); "
+        f"deferred modules loaded: {', '.join(imported['deferred']) or 'none'}"
+    )
+    deferred = set(imported["deferred"])
+
+    async with FakeTrmnlApi(latency=latency, api_key=API_KEY) as server:
+        scenarios = (
+            ("cold", "cold, slow server", server.url, False),
+            ("warm", "warm, slow server", server.url, True),
+            ("down", "warm, server down", _unused_url(), True),
+        )
+        for key, label, url, seeded in scenarios:
+            result = await measure(url, server.payload, seeded)
+            results[f"{key}_setup_ms"] = result["setup_s"] * 1000
+            if result["first_available_s"] is not None:
+                results[f"{key}_first_available_ms"] = result["first_available_s"] * 1000
+            deferred.update(result["deferred"])
+            first = result["first_available_s"]
+            print(
+                f"{label:>18}: setup {result['setup_s'] * 1000:8.1f} ms, first entity available "
+                + (f"{first * 1000:8.1f} ms" if first is not None else "   never")
+                + f", loaded={result['loaded']}, {result['available_entities']} entities available"
+            )
+
+    if check:
+        failures = over_budget(results)
+        if deferred:
+            failures.append(f"loaded at startup instead of on first use: {', '.join(sorted(deferred))}")
+        if failures:
+            raise SystemExit("startup budget exceeded:\n  " + "\n  ".join(failures))
+        print("startup budget met")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=3.0, help="server-side delay in seconds")
+    parser.add_argument("--repeat", type=int, default=5, help="interpreters to time the import in")
+    parser.add_argument("--check", action="store_true", help="exit non-zero if over BUDGET")
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.repeat, args.check))
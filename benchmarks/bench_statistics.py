@@ -0,0 +1,284 @@
+"""Recorder write volume and database size: per-poll state history vs statistics mode.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_statistics --devices 1000 --hours 24
+
+A simulated fleet checks in on its own cadence (5 to 60 minutes) with a slowly
+draining battery and a noisy RSSI. For every check-in the benchmark counts the
+rows the recorder would write in three setups:
+
+- history: every device entity of the full profile is written on each check-in,
+  and the entities with a state class get 5-minute and hourly statistics
+  compiled by the recorder;
+- statistics mode: battery and signal sensors are only written once they move by
+  their deadband and have no state class, so the recorder compiles no statistics
+  for them; the battery percentage and RSSI statistics come from the
+  integration's hourly import (`HourlyStatistics`, run on the simulated check-ins);
+- statistics mode with the device entities excluded from the recorder: only the
+  imported hourly statistics are written.
+
+Bytes per row are measured by inserting sample rows into an SQLite database with
+the recorder's own schema (`db_schema`), indexes included.
+
+It also checks that a check-in at :59, first seen by the poll at :01, still counts
+for its hour: the coordinator keeps an hour open for one polling interval after it
+ends.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+from homeassistant.components.recorder.db_schema import (
+    Base,
+    StateAttributes,
+    States,
+    Statistics,
+    StatisticsShortTerm,
+)
+from sqlalchemy import create_engine, insert, text
+
+from custom_components.trmnl.binary_sensor import PROBLEM_SENSORS
+from custom_components.trmnl.models import TrmnlDevice
+from custom_components.trmnl.sensor import DEVICE_SENSORS
+from custom_components.trmnl.statistics import BATTERY, HourlyStatistics, statistic_id
+
+SAMPLE_ROWS = 20000
+SHORT_TERM_PER_HOUR = 12
+
+
+def sensor_traits(statistics_mode: bool):
+    """(deadband, value of the device record, has a state class) of each device sensor."""
+    coordinator = SimpleNamespace(statistics=HourlyStatistics() if statistics_mode else None)
+    values = {
+        "battery": lambda device: device.battery_voltage,
+        "battery_percentage": lambda device: device.battery_percentage,
+        "rssi": lambda device: device.rssi,
+        "wifi_strength": lambda device: device.wifi_strength,
+    }
+    traits = []
+    for key, cls in DEVICE_SENSORS:
+        sensor = cls.__new__(cls)
+        sensor.coordinator = coordinator
+        deadband = cls._deadband if statistics_mode else None
+        traits.append((deadband, values.get(key), getattr(sensor, "state_class", None) is not None))
+    # The problem binary sensors are written on every check-in either way.
+    traits.extend((None, None, False) for _ in PROBLEM_SENSORS)
+    return traits
+
+
+def make_fleet(device_count: int, hours: int, seed: int):
+    """Each device's check-ins as TrmnlDevice records, in time order."""
+    rng = random.Random(seed)
+    start = datetime(2026, 7, 1, tzinfo=UTC)
+    end = start + timedelta(hours=hours)
+    fleet = []
+    for index in range(device_count):
+        cadence = timedelta(minutes=rng.choice((5, 15, 30, 60)))
+        charge = rng.uniform(30, 100)
+        drain_per_hour = rng.uniform(0.5, 3) / 24
+        base_rssi = rng.uniform(-85, -45)
+        at = start + timedelta(seconds=rng.uniform(0, cadence.total_seconds()))
+        records = []
+        while at < end:
+            charge = max(charge - drain_per_hour * cadence.total_seconds() / 3600, 0)
+            percent = charge + rng.gauss(0, 1)
+            records.append(
+                TrmnlDevice(
+                    f"D{index:05d}", f"AA:BB:CC:{index >> 16:02X}:{index >> 8 & 255:02X}:{index & 255:02X}",
+                    f"TRMNL {index}",
+                    battery_voltage=round(3.0 + 1.2 * percent / 100 + rng.gauss(0, 0.02), 2),
+                    percent_charged=max(min(percent, 100), 0),
+                    rssi=round(base_rssi + rng.gauss(0, 3)),
+                    last_ping_at=at,
+                )
+            )
+            at += cadence
+        fleet.append(records)
+    return start, end, fleet
+
+
+def state_writes(fleet, traits) -> int:
+    """State rows written for the device entities, each skipping writes inside its deadband."""
+    writes = 0
+    for records in fleet:
+        written = [None] * len(traits)
+        for record in records:
+            for index, (deadband, value_of, _) in enumerate(traits):
+                value = value_of(record) if value_of else None
+                if (
+                    deadband is not None
+                    and value is not None
+                    and written[index] is not None
+                    and abs(value - written[index]) < deadband
+                ):
+                    continue
+                written[index] = value
+                writes += 1
+    return writes
+
+
+def imported_rows(fleet, end) -> int:
+    """Hourly rows the integration imports, from the real aggregator."""
+    statistics = HourlyStatistics()
+    for records in fleet:
+        for record in records:
+            statistics.observe(record)
+    return sum(len(data) for _, _, data in statistics.pop_completed(end).values())
+
+
+def late_checkin_counted(poll_interval: timedelta = timedelta(minutes=5)) -> bool:
+    """Whether a check-in at :59 seen by the poll at :01 is counted for its hour."""
+    hour = datetime(2026, 7, 1, tzinfo=UTC)
+    statistics = HourlyStatistics()
+    mac_address = "AA:BB:CC:00:00:01"
+
+    def poll(at, last_ping_minutes, percent):
+        statistics.observe(
+            TrmnlDevice(
+                "D00001", mac_address, "TRMNL 1", percent_charged=percent,
+                last_ping_at=hour + timedelta(minutes=last_ping_minutes),
+            )
+        )
+        return statistics.pop_completed(at, poll_interval)
+
+    imported = {}
+    imported.update(poll(hour + timedelta(minutes=56), 45, 80))
+    # The hour has ended, but the API does not show the :59 check-in yet.
+    imported.update(poll(hour + timedelta(minutes=60, seconds=30), 45, 80))
+    imported.update(poll(hour + timedelta(minutes=61), 59, 70))
+    imported.update(poll(hour + timedelta(minutes=66), 59, 70))
+    _, _, data = imported.get(statistic_id(mac_address, BATTERY), (None, None, []))
+    return [(row["min"], row["max"]) for row in data] == [(70, 80)]
+
+
+def bytes_per_row() -> dict:
+    """On-disk bytes per row of each recorder table, measured in SQLite."""
+    attributes = {
+        "state_class": "measurement",
+        "unit_of_measurement": "%",
+        "device_class": "battery",
+        "icon": "mdi:battery",
+        "friendly_name": "TRMNL 123 Battery Percentage",
+    }
+    now = datetime(2026, 7, 1, tzinfo=UTC).timestamp()
+    tables = {
+        "states": (
+            States,
+            lambda index: {
+                "state": str(50 + index % 50),
+                "last_updated_ts": now + index,
+                "old_state_id": index or None,
+                "attributes_id": index + 1,
+                "origin_idx": 0,
+                "context_id_bin": os.urandom(16),
+                "metadata_id": index % 1000 + 1,
+            },
+        ),
+        "state_attributes": (
+            StateAttributes,
+            lambda index: {
+                "hash": random.getrandbits(32),
+                "shared_attrs": json.dumps(
+                    {**attributes, "last_updated": datetime.fromtimestamp(now + index, UTC).isoformat()}
+                ),
+            },
+        ),
+        "statistics_short_term": (
+            StatisticsShortTerm,
+            lambda index: {
+                "created_ts": now + index,
+                "metadata_id": index % 1000 + 1,
+                "start_ts": now + 300 * (index // 1000),
+                "mean": 55.5,
+                "min": 50.0,
+                "max": 61.0,
+            },
+        ),
+        "statistics": (
+            Statistics,
+            lambda index: {
+                "created_ts": now + index,
+                "metadata_id": index % 1000 + 1,
+                "start_ts": now + 3600 * (index // 1000),
+                "mean": 55.5,
+                "min": 50.0,
+                "max": 61.0,
+            },
+        ),
+    }
+    sizes = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (table, row) in tables.items():
+            path = os.path.join(directory, f"{name}.db")
+            engine = create_engine(f"sqlite:///{path}")
+            Base.metadata.create_all(engine)
+            with engine.begin() as connection:
+                connection.execute(text("VACUUM"))
+            empty = os.path.getsize(path)
+            with engine.begin() as connection:
+                connection.execute(insert(table.__table__), [row(index) for index in range(SAMPLE_ROWS)])
+            with engine.begin() as connection:
+                connection.execute(text("VACUUM"))
+            sizes[name] = (os.path.getsize(path) - empty) / SAMPLE_ROWS
+            engine.dispose()
+    return sizes
+
+
+def main(device_count: int, hours: int, seed: int) -> None:
+    _, end, fleet = make_fleet(device_count, hours, seed)
+    checkins = sum(len(records) for records in fleet)
+    sizes = bytes_per_row()
+    print(
+        f"{device_count} devices over {hours} h, {checkins} check-ins; bytes per row: "
+        + ", ".join(f"{name} {size:.0f}" for name, size in sizes.items())
+    )
+
+    imported = imported_rows(fleet, end)
+    setups = []
+    for label, statistics_mode, recorded in (
+        ("history", False, True),
+        ("statistics mode", True, True),
+        ("statistics mode, excluded", True, False),
+    ):
+        traits = sensor_traits(statistics_mode)
+        writes = state_writes(fleet, traits) if recorded else 0
+        compiled = sum(has_state_class for _, _, has_state_class in traits) * device_count * hours if recorded else 0
+        rows = {
+            "states": writes,
+            # `last_updated` changes with every write, so every write stores new attributes.
+            "state_attributes": writes,
+            "statistics_short_term": compiled * SHORT_TERM_PER_HOUR,
+            "statistics": compiled + (imported if statistics_mode else 0),
+        }
+        setups.append((label, rows))
+
+    baseline_rows = sum(setups[0][1].values())
+    baseline_bytes = sum(count * sizes[name] for name, count in setups[0][1].items())
+    for label, rows in setups:
+        total_rows = sum(rows.values())
+        total_bytes = sum(count * sizes[name] for name, count in rows.items())
+        print(
+            f"{label:>26}: {rows['states']:>9} states, {rows['statistics_short_term']:>9} short-term and "
+            f"{rows['statistics']:>7} hourly statistics rows; {total_rows:>9} rows, {total_bytes / 1e6:8.1f} MB"
+            + (
+                f" ({baseline_rows / max(total_rows, 1):.0f}x fewer rows, "
+                f"{baseline_bytes / max(total_bytes, 1):.0f}x fewer bytes)"
+                if rows is not setups[0][1] else ""
+            )
+        )
+    assert imported == 2 * device_count * hours, "expected one battery and one RSSI row per device and hour"
+    assert late_checkin_counted(), "a check-in at :59 seen at :01 was dropped from its hour"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.devices, args.hours, args.seed)
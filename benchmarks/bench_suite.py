@@ -0,0 +1,212 @@
+"""End-to-end benchmark suite over synthetic fleets, with machine-readable output.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_suite --sizes 10,100,1000,10000 --output results.json
+
+For every fleet size and entity profile (`--profiles`) a throwaway Home
+Assistant sets up one entry against a local stand-in server and measures:
+
+- `setup_s`: `async_setup_entry` including the first refresh and entity creation
+- `first_refresh_s`: the first refresh alone
+- `refresh_changed_cpu_s` / `refresh_unchanged_cpu_s`: event-loop CPU time of one
+  refresh (fetch, decode, diff and every sensor's state handling) when every
+  device changed / when nothing changed, averaged over `--cycles`
+- `rows_changed` / `rows_unchanged`: state_changed events per refresh, i.e. rows
+  the recorder would write to its `states` table
+- `entities`: entities the entry created
+- `bytes_per_device`: Python heap retained by the entry, per device (tracemalloc,
+  in a separate run so it does not skew the timings)
+- `state_machine_bytes_per_device`: the part of that allocated by the state
+  machine (`homeassistant/core.py`: states, their attributes and contexts)
+- `failed_cycles`: refreshes that failed under `--error-rate`
+
+The stand-in server runs on the same event loop, so CPU times include serving
+(pre-serialized) responses. For the smaller profiles the savings against `full`
+at the same size are printed too. Compare two commits with the same arguments:
+`python -m benchmarks.bench_suite --output before.json` on one and `after.json`
+on the other.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.const import __version__ as HA_VERSION
+
+from custom_components.trmnl.const import CONF_ENTITY_PROFILE, DOMAIN, PROFILE_FULL
+from custom_components.trmnl.coordinator import TrmnlDataUpdateCoordinator
+from custom_components.trmnl.profiles import PROFILES
+
+from .fake_api import FakeTrmnlApi
+from .fleet import make_payload
+from .harness import add_entry, running_hass
+
+API_KEY = "user_benchmark"
+STATE_MACHINE_FILE = os.path.join("homeassistant", "core.py")
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _timed_first_refresh(coordinator, timings):
+    start = time.perf_counter()
+    try:
+        return await _ORIGINAL_FIRST_REFRESH(coordinator)
+    finally:
+        timings.append(time.perf_counter() - start)
+
+
+_ORIGINAL_FIRST_REFRESH = TrmnlDataUpdateCoordinator.async_config_entry_first_refresh
+
+
+async def _refresh(hass, coordinator) -> tuple[float, bool]:
+    start = time.process_time()
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    return time.process_time() - start, coordinator.last_update_success
+
+
+async def measure_timings(size: int, profile: str, cycles: int, latency: float, error_rate: float) -> dict:
+    server = FakeTrmnlApi(make_payload(size), latency=latency, api_key=API_KEY, cacheable=True)
+    first_refresh = []
+    TrmnlDataUpdateCoordinator.async_config_entry_first_refresh = (
+        lambda coordinator: _timed_first_refresh(coordinator, first_refresh)
+    )
+    try:
+        async with server, running_hass() as hass:
+            rows = []
+            hass.bus.async_listen(EVENT_STATE_CHANGED, lambda event: rows.append(1))
+            entry = add_entry(hass, server.url, API_KEY, options={CONF_ENTITY_PROFILE: profile})
+            start = time.perf_counter()
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            setup = time.perf_counter() - start
+            await hass.async_block_till_done()
+            coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+            entities = len(hass.states.async_all())
+            server.error_rate = error_rate
+
+            changed_cpu, changed_rows, unchanged_cpu, unchanged_rows, failed = [], [], [], [], 0
+            for cycle in range(1, cycles + 1):
+                server.set_payload(make_payload(size, seed=cycle))
+                rows.clear()
+                cpu, ok = await _refresh(hass, coordinator)
+                failed += not ok
+                changed_cpu.append(cpu)
+                changed_rows.append(len(rows))
+
+                rows.clear()
+                cpu, ok = await _refresh(hass, coordinator)
+                failed += not ok
+                unchanged_cpu.append(cpu)
+                unchanged_rows.append(len(rows))
+            await hass.config_entries.async_unload(entry.entry_id)
+    finally:
+        TrmnlDataUpdateCoordinator.async_config_entry_first_refresh = _ORIGINAL_FIRST_REFRESH
+    return {
+        "entities": entities,
+        "setup_s": setup,
+        "first_refresh_s": first_refresh[0] if first_refresh else None,
+        "refresh_changed_cpu_s": sum(changed_cpu) / cycles,
+        "refresh_unchanged_cpu_s": sum(unchanged_cpu) / cycles,
+        "rows_changed": sum(changed_rows) / cycles,
+        "rows_unchanged": sum(unchanged_rows) / cycles,
+        "failed_cycles": failed,
+        "api_requests": server.requests,
+    }
+
+
+async def measure_memory(size: int, profile: str) -> tuple[float, float]:
+    async with FakeTrmnlApi(make_payload(size), api_key=API_KEY) as server, running_hass() as hass:
+        entry = add_entry(hass, server.url, API_KEY, options={CONF_ENTITY_PROFILE: profile})
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        stats = after.compare_to(before, "filename")
+        retained = sum(stat.size_diff for stat in stats)
+        state_machine = sum(
+            stat.size_diff for stat in stats if stat.traceback[0].filename.endswith(STATE_MACHINE_FILE)
+        )
+        await hass.config_entries.async_unload(entry.entry_id)
+    return retained / size, state_machine / size
+
+
+def _savings(profile: str, result: dict, full: dict) -> str:
+    """Describe `result`'s savings against the full profile at the same size."""
+    def saved(key):
+        return 1 - result[key] / full[key] if full[key] else 0.0
+    return (
+        f"{'':>16}{profile:>8} vs {PROFILE_FULL}: {saved('entities'):.0%} fewer entities, "
+        f"{saved('rows_changed'):.0%} fewer writes per changed refresh, "
+        f"{saved('state_machine_bytes_per_device'):.0%} less state machine memory, "
+        f"{saved('bytes_per_device'):.0%} less heap"
+    )
+
+
+async def main(sizes, profiles, cycles: int, latency: float, error_rate: float) -> dict:
+    """Measure every size and profile, print the results and return the report."""
+    results = []
+    for size in sizes:
+        by_profile = {}
+        for profile in profiles:
+            result = {"devices": size, "profile": profile, **await measure_timings(size, profile, cycles, latency, error_rate)}
+            result["bytes_per_device"], result["state_machine_bytes_per_device"] = await measure_memory(size, profile)
+            results.append(result)
+            by_profile[profile] = result
+            print(
+                f"{size:>6} devices, {profile:>8}: {result['entities']} entities, setup {result['setup_s'] * 1000:9.1f} ms, "
+                f"first refresh {result['first_refresh_s'] * 1000:9.1f} ms, "
+                f"refresh cpu {result['refresh_changed_cpu_s'] * 1000:8.2f} / "
+                f"{result['refresh_unchanged_cpu_s'] * 1000:6.2f} ms (changed/unchanged), "
+                f"rows {result['rows_changed']:.0f} / {result['rows_unchanged']:.0f}, "
+                f"{result['bytes_per_device'] / 1024:.1f} KiB/device "
+                f"({result['state_machine_bytes_per_device'] / 1024:.1f} KiB in the state machine)"
+            )
+        full = by_profile.get(PROFILE_FULL)
+        for profile, result in by_profile.items():
+            if full is not None and profile != PROFILE_FULL:
+                print(_savings(profile, result, full))
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "homeassistant": HA_VERSION,
+        "parameters": {"cycles": cycles, "latency": latency, "error_rate": error_rate, "profiles": profiles},
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="comma-separated fleet sizes")
+    parser.add_argument(
+        "--profiles", default=",".join(PROFILES), help="comma-separated entity profiles (minimal, standard, full)"
+    )
+    parser.add_argument("--cycles", type=int, default=5, help="changed+unchanged refresh pairs per size")
+    parser.add_argument("--latency", type=float, default=0.0, help="server latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 500")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+    report = asyncio.run(
+        main([int(size) for size in args.sizes.split(",")], args.profiles.split(","), args.cycles, args.latency, args.error_rate)
+    )
+    if args.output:
+        # Written once the event loop is gone, so the file I/O cannot block it.
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"wrote {args.output}")
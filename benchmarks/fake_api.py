@@ -0,0 +1,133 @@
+"""Local stand-in for the TRMNL `/api/devices` endpoint.
+
+Serves `example_data/api_devices_response.json` (or any payload handed in) on
+127.0.0.1 so the API client can be exercised without touching the real cloud.
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import random
+from email.utils import formatdate
+from pathlib import Path
+
+from aiohttp import web
+
+EXAMPLE_PAYLOAD = Path(__file__).resolve().parent.parent / "example_data" / "api_devices_response.json"
+
+
+class FakeTrmnlApi:
+    """Minimal aiohttp server answering GET /api/devices.
+
+    `cacheable` adds ETag/Last-Modified validators and answers revalidation with
+    304; `compress` gzips the body for clients that accept it. `faults` is consumed
+    one entry per request: an int answers with that status, `(status, headers)`
+    adds headers (e.g. Retry-After), a float delays the normal response by that
+    many seconds, and None serves normally. `error_rate` additionally answers that
+    fraction of the remaining requests with 500 (seeded, so runs are reproducible).
+    """
+
+    def __init__(
+        self,
+        payload=None,
+        latency: float = 0.0,
+        api_key: str | None = None,
+        cacheable: bool = False,
+        compress: bool = False,
+        faults=None,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.api_key = api_key
+        self.cacheable = cacheable
+        self.compress = compress
+        self.faults = list(faults or ())
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.set_payload(payload if payload is not None else json.loads(EXAMPLE_PAYLOAD.read_text()))
+        self._peers = set()
+        self._runner = None
+        self.url = None
+
+    async def _handle_devices(self, request: web.Request) -> web.Response:
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return await self._respond(request)
+        finally:
+            self.in_flight -= 1
+
+    async def _respond(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        # Each client TCP connection has its own source port, so distinct peers
+        # show how many handshakes the client paid for.
+        self._peers.add(request.transport.get_extra_info("peername"))
+        if self.api_key and request.headers.get("Authorization") != f"Bearer {self.api_key}":
+            return web.json_response({"error": "unauthorized"}, status=401)
+        latency = self.latency
+        fault = self.faults.pop(0) if self.faults else None
+        if fault is None and self.error_rate and self._rng.random() < self.error_rate:
+            fault = 500
+        if isinstance(fault, float):
+            latency += fault
+        elif isinstance(fault, int):
+            return web.json_response({"error": "injected"}, status=fault)
+        elif isinstance(fault, tuple):
+            status, fault_headers = fault
+            return web.json_response({"error": "injected"}, status=status, headers=fault_headers)
+        if latency:
+            await asyncio.sleep(latency)
+        headers = {"Content-Type": "application/json"}
+        if self.cacheable:
+            headers["ETag"] = self._etag
+            headers["Last-Modified"] = self._last_modified
+            if request.headers.get("If-None-Match") == self._etag:
+                self.not_modified += 1
+                return web.Response(status=304, headers=headers)
+        body = self._body
+        if self.compress and "gzip" in request.headers.get("Accept-Encoding", ""):
+            body = self._gzipped
+            headers["Content-Encoding"] = "gzip"
+        self.bytes_sent += len(body)
+        return web.Response(body=body, headers=headers)
+
+    def set_payload(self, payload) -> None:
+        """Replace the served payload (and its validators)."""
+        self.payload = payload
+        self._body = json.dumps(payload).encode()
+        self._gzipped = gzip.compress(self._body)
+        self._etag = '"' + hashlib.sha1(self._body).hexdigest() + '"'
+        self._last_modified = formatdate(usegmt=True)
+
+    @property
+    def connections(self) -> int:
+        return len(self._peers)
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/api/devices", self._handle_devices)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # pylint: disable=protected-access
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
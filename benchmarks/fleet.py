@@ -0,0 +1,37 @@
+"""Synthetic `/api/devices` payloads for benchmarks."""
+import random
+from datetime import UTC, datetime, timedelta
+
+
+def make_device(index: int, rng: random.Random, now: datetime | None = None) -> dict:
+    """Return one device dict shaped like an `/api/devices` `data` entry."""
+    now = now or datetime.now(UTC)
+    last_ping = (now - timedelta(seconds=rng.randint(0, 3600))).isoformat().replace("+00:00", "Z")
+    return {
+        "id": 10000 + index,
+        "name": f"TRMNL {index}",
+        "friendly_id": f"D{index:06X}",
+        "mac_address": ":".join(f"{(index >> shift) & 0xFF:02X}" for shift in (40, 32, 24, 16, 8, 0)),
+        "battery_voltage": round(rng.uniform(3.3, 4.2), 2),
+        "rssi": rng.randint(-90, -40),
+        "wifi_band": "2.4",
+        "sleep_mode_enabled": rng.random() < 0.5,
+        "sleep_start_time": 1320,
+        "sleep_end_time": 480,
+        "last_ping_at": last_ping,
+        "percent_charged": None if rng.random() < 0.3 else round(rng.uniform(0, 100), 2),
+        "wifi_strength": rng.randint(0, 100),
+        "hardware_last_ping_at": last_ping,
+    }
+
+
+def make_fleet(count: int, seed: int = 0) -> list[dict]:
+    """Return `count` synthetic devices; the same seed yields the same fleet."""
+    rng = random.Random(seed)
+    now = datetime(2026, 6, 23, 18, 0, tzinfo=UTC)
+    return [make_device(index, rng, now) for index in range(count)]
+
+
+def make_payload(count: int, seed: int = 0) -> dict:
+    """Return a full `/api/devices` response body."""
+    return {"data": make_fleet(count, seed)}
@@ -0,0 +1,61 @@
+"""Run the integration inside a throwaway Home Assistant instance.
+
+Uses the test harness from `pytest-homeassistant-custom-component`, so the
+integration is set up through the real config-entry machinery against a local
+stand-in server instead of the TRMNL cloud. It is not part of the locked dev
+environment because it pins an exact Home Assistant release; install the one
+matching your `homeassistant` version alongside it.
+"""
+import logging
+import tempfile
+from contextlib import asynccontextmanager
+
+from homeassistant import loader
+from homeassistant.helpers import frame
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.trmnl.const import (
+    CONF_API_BASE_URL,
+    CONF_API_KEY,
+    CONF_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+)
+
+
+@asynccontextmanager
+async def running_hass(config_dir: str | None = None):
+    """Yield a started Home Assistant with custom integrations enabled.
+
+    `.storage` lives in `config_dir`, or in a throwaway directory if not given.
+    """
+    # Silence the "custom integration has not been tested" banner on every run.
+    logging.getLogger("homeassistant.loader").setLevel(logging.ERROR)
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        async with async_test_home_assistant(config_dir=config_dir or scratch_dir) as hass:
+            # Normally done during bootstrap; helpers such as DataUpdateCoordinator need it.
+            frame.async_setup(hass)
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+            try:
+                yield hass
+            finally:
+                await hass.async_stop(force=True)
+
+
+def add_entry(hass, base_url: str, api_key: str, scan_interval: int = DEFAULT_SCAN_INTERVAL, **kwargs):
+    """Register (but do not set up) a TRMNL config entry pointing at `base_url`."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_API_KEY: api_key,
+            CONF_API_BASE_URL: base_url,
+            CONF_SCAN_INTERVAL: scan_interval,
+        },
+        unique_id=api_key,
+        **kwargs,
+    )
+    entry.add_to_hass(hass)
+    return entry
@@ -0,0 +1,51 @@
+"""Capture real `/api/devices` traffic into a traffic log for later replay.
+
+Run from the repository root:
+
+    python -m benchmarks.record_traffic --api-key user_xxx --hours 24 --output trace.jsonl.gz
+
+Polls like the integration does (conditional requests at a fixed interval) with
+the client's recorder attached. Stop early with Ctrl+C; everything recorded so
+far is kept.
+"""
+import argparse
+import asyncio
+import contextlib
+import time
+
+import aiohttp
+
+from custom_components.trmnl.api import TrmnlApiClient, TrmnlApiError
+from custom_components.trmnl.const import DEFAULT_API_BASE_URL, DEFAULT_SCAN_INTERVAL
+from custom_components.trmnl.traffic import TrafficRecorder
+
+
+async def main(api_key: str, base_url: str, interval: int, hours: float, output: str) -> None:
+    recorder = TrafficRecorder(output)
+    deadline = time.monotonic() + hours * 3600
+    try:
+        async with aiohttp.ClientSession() as session:
+            client = TrmnlApiClient(session, api_key, base_url, recorder=recorder)
+            polls = 0
+            while time.monotonic() < deadline:
+                try:
+                    await client.get_devices(conditional=polls > 0)
+                except TrmnlApiError as err:
+                    print(f"poll {polls}: {err}")
+                polls += 1
+                await asyncio.sleep(interval)
+    finally:
+        recorder.close()
+        print(f"recorded {recorder.records} responses to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--api-key", required=True)
+    parser.add_argument("--base-url", default=DEFAULT_API_BASE_URL)
+    parser.add_argument("--interval", type=int, default=DEFAULT_SCAN_INTERVAL, help="seconds between polls")
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--output", default="trace.jsonl.gz")
+    args = parser.parse_args()
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(main(args.api_key, args.base_url, args.interval, args.hours, args.output))
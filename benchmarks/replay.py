@@ -0,0 +1,156 @@
+"""Serve a recorded traffic log (see `custom_components/trmnl/traffic.py`) as a stand-in API.
+
+The server answers every request with whatever the recorded API returned at the
+current replay time: the last recorded response at or before it. Replay time
+either runs `speed` times faster than real time from the first recorded
+response, or is moved explicitly with `seek()` (to drive polls step by step).
+Recorded 304s serve the body in effect at the time, so clients revalidating
+with ETags see the same 200/304 pattern as the real server gave.
+"""
+import bisect
+import gzip
+import json
+import random
+import time
+from datetime import UTC, datetime, timedelta
+
+from aiohttp import web
+
+from custom_components.trmnl.traffic import read_traffic
+
+from .fleet import make_fleet
+
+
+class TrafficReplayServer:
+    """aiohttp server replaying a traffic log on GET /api/devices."""
+
+    def __init__(self, entries, speed: float = 1.0):
+        self.entries = self._resolve(list(entries))
+        if not self.entries:
+            raise ValueError("Empty traffic log")
+        self.times = [entry["t"] for entry in self.entries]
+        self.speed = speed
+        self.requests = 0
+        self.not_modified = 0
+        self._seek = None
+        self._started = None
+        self._runner = None
+        self.url = None
+
+    @classmethod
+    def from_file(cls, path: str, speed: float = 1.0):
+        return cls(read_traffic(path), speed)
+
+    @staticmethod
+    def _resolve(entries):
+        """Give every 304 the body and validators of the response in effect."""
+        current = None
+        for entry in entries:
+            if entry.get("status") == 200 and entry.get("body") is not None:
+                current = entry
+            elif entry.get("status") == 304 and current is not None:
+                entry["body"] = current["body"]
+                entry["headers"] = {**current["headers"], **entry.get("headers", {})}
+                entry["status"] = 200
+        return entries
+
+    @property
+    def start_time(self) -> float:
+        return self.times[0]
+
+    @property
+    def end_time(self) -> float:
+        return self.times[-1]
+
+    def now(self) -> float:
+        """Current replay time (recorded wall-clock seconds)."""
+        if self._seek is not None:
+            return self._seek
+        return self.start_time + (time.monotonic() - self._started) * self.speed
+
+    def seek(self, replay_time: float) -> None:
+        """Freeze replay time at `replay_time`."""
+        self._seek = replay_time
+
+    async def _handle_devices(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        index = max(bisect.bisect_right(self.times, self.now()) - 1, 0)
+        entry = self.entries[index]
+        if "error" in entry:
+            return web.Response(status=502, text=entry["error"])
+        headers = dict(entry.get("headers", {}))
+        if entry["status"] != 200 or entry.get("body") is None:
+            return web.Response(status=entry["status"], headers=headers)
+        etag = headers.get("ETag")
+        if etag and request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers=headers)
+        headers.setdefault("Content-Type", "application/json")
+        return web.Response(body=entry["body"].encode(), headers=headers)
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/api/devices", self._handle_devices)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # pylint: disable=protected-access
+        self.url = f"http://127.0.0.1:{port}"
+        self._started = time.monotonic()
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+
+def synthesize_traffic(
+    path: str,
+    devices: int = 20,
+    hours: float = 24,
+    poll_interval: int = 300,
+    checkin_interval: int = 900,
+    seed: int = 0,
+) -> None:
+    """Write a synthetic traffic log for when no real capture is at hand.
+
+    Each device checks in every `checkin_interval` seconds (with jitter and its
+    own phase), draining its battery slightly, and the log has one 200 (or 304
+    when nothing changed since the last poll) every `poll_interval` seconds.
+    """
+    rng = random.Random(seed)
+    start = datetime(2026, 6, 23, tzinfo=UTC)
+    fleet = make_fleet(devices, seed)
+    next_checkin = [start + timedelta(seconds=rng.uniform(0, checkin_interval)) for _ in fleet]
+    previous_body = step_etag = None
+    lines = []
+    for step in range(int(hours * 3600 // poll_interval)):
+        now = start + timedelta(seconds=step * poll_interval)
+        for index, device in enumerate(fleet):
+            while next_checkin[index] <= now:
+                ping = next_checkin[index].isoformat().replace("+00:00", "Z")
+                device["last_ping_at"] = device["hardware_last_ping_at"] = ping
+                device["battery_voltage"] = round(max(device["battery_voltage"] - rng.uniform(0, 0.002), 3.3), 3)
+                device["rssi"] = max(min(device["rssi"] + rng.randint(-2, 2), -30), -95)
+                next_checkin[index] += timedelta(seconds=checkin_interval * rng.uniform(0.95, 1.05))
+        body = json.dumps({"data": fleet})
+        entry = {"t": now.timestamp(), "elapsed": round(rng.uniform(0.05, 0.3), 4)}
+        if body == previous_body:
+            entry.update(status=304, headers={"ETag": f'"{step_etag}"'})
+        else:
+            step_etag = f"v{step}"
+            entry.update(status=200, headers={"Content-Type": "application/json", "ETag": f'"{step_etag}"'}, body=body)
+            previous_body = body
+        lines.append(json.dumps(entry, separators=(",", ":")))
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as log:
+        log.write("\n".join(lines) + "\n")
@@ -1,21 +1,49 @@
 """TRMNL e-ink display integration."""
+import asyncio
 import logging
-from datetime import timedelta
 
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.helpers.storage import Store
 
 from .const import (
     DOMAIN,
     CONF_API_KEY,
     CONF_SCAN_INTERVAL,
     CONF_API_BASE_URL,
+    CONF_ADAPTIVE_POLLING,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_ADDITIONAL_ENDPOINTS,
+    CONF_TIMEOUT,
+    CONF_PUSH_ENABLED,
+    CONF_WEBHOOK_ID,
+    CONF_PUSH_TOKEN,
+    CONF_DIAGNOSTIC_SENSORS,
+    CONF_LOW_BATTERY_THRESHOLD,
+    CONF_WEAK_SIGNAL_THRESHOLD,
+    CONF_OFFLINE_AFTER,
+    CONF_ENTITY_PROFILE,
+    CONF_DEVICE_PROFILES,
+    CONF_STATISTICS_MODE,
     DEFAULT_SCAN_INTERVAL,
     DEFAULT_API_BASE_URL,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_PUSH_ENABLED,
+    DEFAULT_DIAGNOSTIC_SENSORS,
+    DEFAULT_LOW_BATTERY_THRESHOLD,
+    DEFAULT_WEAK_SIGNAL_THRESHOLD,
+    DEFAULT_OFFLINE_AFTER,
+    DEFAULT_ENTITY_PROFILE,
+    DEFAULT_STATISTICS_MODE,
+    REQUEST_TIMEOUT,
+    STORAGE_VERSION,
 )
-from .api import TrmnlApiClient
+from .coordinator import TrmnlDataUpdateCoordinator
+from .push import async_register_push, async_unregister_push
+from .request_scheduler import async_create_client, async_get_request_scheduler
+from .services import async_register_services
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,65 +51,184 @@ CONFIG_SCHEMA = vol.Schema(
     {DOMAIN: vol.Schema({})}, extra=vol.ALLOW_EXTRA
 )
 
-PLATFORMS = ["sensor"]
+PLATFORMS = ["binary_sensor", "sensor"]
 
 async def async_setup(hass: HomeAssistant, config: dict):
     """Set up the TRMNL component."""
     hass.data.setdefault(DOMAIN, {})
+    async_register_services(hass)
     return True
 
+def entry_config(entry: ConfigEntry) -> dict:
+    """Return the effective configuration: entry data overridden by saved options."""
+    return {**entry.data, **entry.options}
+
+def _extra_clients(hass: HomeAssistant, config: dict) -> list:
+    """Create clients for the additional endpoints in the configuration."""
+    return [
+        async_create_client(
+            hass,
+            endpoint[CONF_API_KEY],
+            endpoint[CONF_API_BASE_URL],
+            endpoint.get(CONF_TIMEOUT, REQUEST_TIMEOUT),
+        )
+        for endpoint in config.get(CONF_ADDITIONAL_ENDPOINTS, [])
+    ]
+
+def _health_thresholds(config: dict) -> tuple:
+    """Return the (low battery, weak signal, offline after) thresholds."""
+    return (
+        config.get(CONF_LOW_BATTERY_THRESHOLD, DEFAULT_LOW_BATTERY_THRESHOLD),
+        config.get(CONF_WEAK_SIGNAL_THRESHOLD, DEFAULT_WEAK_SIGNAL_THRESHOLD),
+        config.get(CONF_OFFLINE_AFTER, DEFAULT_OFFLINE_AFTER),
+    )
+
+def _entity_set(config: dict) -> tuple:
+    """Return the options that decide which entities exist."""
+    return (
+        config.get(CONF_DIAGNOSTIC_SENSORS, DEFAULT_DIAGNOSTIC_SENSORS),
+        config.get(CONF_ENTITY_PROFILE, DEFAULT_ENTITY_PROFILE),
+        config.get(CONF_DEVICE_PROFILES, {}),
+        # Changes the sensors' state classes.
+        config.get(CONF_STATISTICS_MODE, DEFAULT_STATISTICS_MODE),
+    )
+
+def _push_settings(config: dict):
+    """Return (webhook_id, token) if push is enabled, else None."""
+    if not config.get(CONF_PUSH_ENABLED, DEFAULT_PUSH_ENABLED):
+        return None
+    return config[CONF_WEBHOOK_ID], config[CONF_PUSH_TOKEN]
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Set up TRMNL from a config entry."""
-    api_key = entry.data[CONF_API_KEY]
-    api_base_url = entry.data.get(CONF_API_BASE_URL, DEFAULT_API_BASE_URL)
-    scan_interval = entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+    config = entry_config(entry)
+    api_key = config[CONF_API_KEY]
+    api_base_url = config.get(CONF_API_BASE_URL, DEFAULT_API_BASE_URL)
+    scan_interval = config.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
 
-    client = TrmnlApiClient(api_key, api_base_url)
+    client = async_create_client(hass, api_key, api_base_url)
+    request_scheduler = async_get_request_scheduler(hass)
+    request_scheduler.async_register(entry.entry_id)
+    entry.async_on_unload(lambda: request_scheduler.async_unregister(entry.entry_id))
 
-    coordinator = DataUpdateCoordinator(
+    coordinator = TrmnlDataUpdateCoordinator(
         hass,
-        _LOGGER,
-        name=DOMAIN,
-        # update_method will be set after coordinator initialization
-        update_interval=timedelta(seconds=scan_interval),
+        entry,
+        client,
+        scan_interval,
+        adaptive_polling=config.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING),
+        max_poll_interval=config.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL),
+        request_scheduler=request_scheduler,
+        extra_clients=_extra_clients(hass, config),
+        push_enabled=_push_settings(config) is not None,
+        low_battery_threshold=config.get(CONF_LOW_BATTERY_THRESHOLD, DEFAULT_LOW_BATTERY_THRESHOLD),
+        weak_signal_threshold=config.get(CONF_WEAK_SIGNAL_THRESHOLD, DEFAULT_WEAK_SIGNAL_THRESHOLD),
+        offline_after=config.get(CONF_OFFLINE_AFTER, DEFAULT_OFFLINE_AFTER),
+        statistics_mode=config.get(CONF_STATISTICS_MODE, DEFAULT_STATISTICS_MODE),
     )
+    # Start from the last persisted snapshot when there is one, so setup does not
+    # wait for (or fail on) the cloud; the live refresh then runs in the background.
+    restored = await coordinator.async_restore()
+    if not restored:
+        await coordinator.async_config_entry_first_refresh()
 
-    async def async_update_data():
-        """Fetch device data from the API."""
-        try:
-            return await hass.async_add_executor_job(client.get_devices)
-        except Exception as err:
-            raise UpdateFailed(f"Error communicating with API for devices: {err}")
-
-    coordinator.update_method = async_update_data
-    await coordinator.async_config_entry_first_refresh()
-
-    if not coordinator.last_update_success:
-        # No need to log error here, async_config_entry_first_refresh does it
-        return False
+        if not coordinator.last_update_success:
+            # No need to log error here, async_config_entry_first_refresh does it
+            return False
 
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
         "client": client,
+        # The configuration the running coordinator/client were built from.
+        "config": config,
     }
+    push = _push_settings(config)
+    if push is not None:
+        async_register_push(hass, entry.entry_id, *push)
 
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
     # Use async_forward_entry_setups instead of async_forward_entry_setup
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    if restored:
+        # Entries restored together at boot would otherwise all hit the API at once.
+        entry.async_create_background_task(
+            hass,
+            _async_delayed_refresh(coordinator, request_scheduler.startup_delay(entry.entry_id)),
+            f"{DOMAIN} first refresh {entry.entry_id}",
+        )
+
     return True
 
+async def _async_delayed_refresh(coordinator: TrmnlDataUpdateCoordinator, delay: float):
+    """Refresh the coordinator after `delay` seconds."""
+    if delay:
+        await asyncio.sleep(delay)
+    await coordinator.async_refresh()
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Delete the persisted snapshot when the entry is removed."""
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}").async_remove()
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        push = _push_settings(entry_data["config"])
+        if push is not None:
+            async_unregister_push(hass, push[0])
 
     return unload_ok
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry):
-    """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry):
+    """Apply changed options in place; only a different API key or entity set needs a rebuild."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    old = entry_data["config"]
+    new = entry_config(entry)
+    if new == old:
+        return
+    if new[CONF_API_KEY] != old[CONF_API_KEY] or _entity_set(new) != _entity_set(old):
+        # Through Home Assistant, so the entry's unload callbacks run.
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+        return
+
+    coordinator = entry_data["coordinator"]
+    new_base_url = new.get(CONF_API_BASE_URL, DEFAULT_API_BASE_URL)
+    if new_base_url != old.get(CONF_API_BASE_URL, DEFAULT_API_BASE_URL) or new.get(
+        CONF_ADDITIONAL_ENDPOINTS, []
+    ) != old.get(CONF_ADDITIONAL_ENDPOINTS, []):
+        # Same account on other servers: swap the clients under the running
+        # coordinator and fetch through the cache the options flow just filled.
+        client = async_create_client(hass, new[CONF_API_KEY], new_base_url)
+        coordinator.async_set_client(client, _extra_clients(hass, new))
+        entry_data["client"] = client
+        await coordinator.async_request_refresh()
+
+    new_scan_interval = new.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+    if new_scan_interval != old.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL):
+        coordinator.async_set_scan_interval(new_scan_interval)
+
+    adaptive = new.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING)
+    max_poll_interval = new.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL)
+    if (adaptive, max_poll_interval) != (
+        old.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING),
+        old.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL),
+    ):
+        coordinator.async_set_adaptive_polling(adaptive, max_poll_interval)
+
+    old_push = _push_settings(old)
+    new_push = _push_settings(new)
+    if new_push != old_push:
+        if old_push is not None:
+            async_unregister_push(hass, old_push[0])
+        if new_push is not None:
+            async_register_push(hass, entry.entry_id, *new_push)
+        coordinator.async_set_push(new_push is not None)
+
+    if _health_thresholds(new) != _health_thresholds(old):
+        coordinator.async_set_health_thresholds(*_health_thresholds(new))
+
+    entry_data["config"] = new
@@ -1,18 +1,86 @@
 """TRMNL API client."""
+import asyncio
+import email.utils
+import hashlib
 import logging
-import requests
+import contextlib
+import time
 
-from .const import DEFAULT_API_BASE_URL
+import aiohttp
+from homeassistant.util import dt as dt_util
+
+from .const import DEFAULT_API_BASE_URL, REQUEST_TIMEOUT, ENTRY_DECODE_MIN_BYTES
+from .decode import decode_devices
+from .metrics import BYTES_RECEIVED, DECODE_SECONDS, NETWORK_SECONDS
 
 _LOGGER = logging.getLogger(__name__)
 
+
+class TrmnlApiError(Exception):
+    """Base error raised by the TRMNL API client."""
+
+
+class TrmnlApiAuthError(TrmnlApiError):
+    """The API rejected the API key (HTTP 401/403)."""
+
+
+class TrmnlApiConnectionError(TrmnlApiError):
+    """The API could not be reached, timed out, or returned an error status."""
+
+
+class TrmnlApiRateLimitError(TrmnlApiConnectionError):
+    """The API answered 429/503; `retry_after` is the requested wait in seconds, if given."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        """Initialize the error."""
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - dt_util.utcnow()).total_seconds(), 0.0)
+
+
 class TrmnlApiClient:
-    """TRMNL API client."""
+    """TRMNL API client.
+
+    The client does not own its `aiohttp.ClientSession`. Inside Home Assistant it is
+    handed its server's session from the request scheduler, so every poll reuses the
+    same keep-alive connection pool instead of paying a new TCP+TLS handshake.
+    An optional `limiter` (an async context manager) is entered around every request
+    so clients sharing a server can share its concurrency and rate budget, and an
+    optional `recorder` (a `TrafficRecorder`) logs every raw response. Timings and
+    sizes go to `metrics` (an `EntryMetrics`) when the owning coordinator sets it.
+    """
 
-    def __init__(self, api_key: str, api_base_url: str = DEFAULT_API_BASE_URL):
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        api_key: str,
+        api_base_url: str = DEFAULT_API_BASE_URL,
+        timeout: float = REQUEST_TIMEOUT,
+        limiter=None,
+        recorder=None,
+    ):
         """Initialize the API client."""
+        self.session = session
+        self.limiter = limiter
+        self.recorder = recorder
+        self.metrics = None
         self.api_key = api_key
         self.api_base_url = api_base_url.rstrip('/')
+        self.timeout = timeout
 
         # Headers for /api/devices (main API key)
         self.main_headers = {
@@ -20,16 +88,129 @@ class TrmnlApiClient:
             "Authorization": f"Bearer {self.api_key}"
         }
 
-    def get_devices(self):
-        """Get TRMNL devices information."""
+        # Validators and content hash of the last full response, for conditional
+        # requests and the unchanged-payload short-circuit.
+        self._etag = None
+        self._last_modified = None
+        self._body_hash = None
+        self._body_size = 0
+        self._decode_time = 0.0
+        self.stats = {
+            "requests": 0,
+            "not_modified": 0,
+            "unchanged": 0,
+            "bytes_received": 0,
+            "bytes_saved": 0,
+            "decode_seconds_avoided": 0.0,
+        }
+
+    async def get_devices(self, conditional: bool = False):
+        """Get TRMNL devices information.
+
+        With `conditional=True` the request is revalidated against the previous
+        response (If-None-Match / If-Modified-Since), and None is returned when the
+        server answers 304 or the body hashes to the same content as last time, so
+        the caller can keep its previous result without decoding anything.
+        """
         devices_endpoint = f"{self.api_base_url}/api/devices"
+        headers = self.main_headers
+        if conditional:
+            headers = dict(headers)
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+        # A 304 with no decoded body of ours to stand for (e.g. from a caching proxy).
+        unusable_304 = False
         try:
-            response = requests.get(devices_endpoint, headers=self.main_headers, timeout=10)
-            response.raise_for_status()
-            return response.json().get("data", [])
-        except requests.exceptions.RequestException as err:
+            # asyncio.timeout bounds the whole request (connect, headers and body) but
+            # not the wait for the limiter; cancelling the calling task aborts the
+            # request and frees the connection. aiohttp advertises gzip/deflate (and
+            # br when Brotli is installed) and decompresses transparently.
+            async with self.limiter or contextlib.nullcontext(), asyncio.timeout(self.timeout):
+                started = time.monotonic()
+                async with self.session.get(devices_endpoint, headers=headers) as response:
+                    self.stats["requests"] += 1
+                    body = await response.read() if response.status < 300 else None
+                    network_time = time.monotonic() - started
+                    if self.recorder is not None:
+                        self.recorder.record(started, response.status, response.headers, body)
+                    if response.status in (401, 403):
+                        raise TrmnlApiAuthError(
+                            f"Authentication failed ({response.status}) for {devices_endpoint}"
+                        )
+                    if response.status in (429, 503):
+                        raise TrmnlApiRateLimitError(
+                            f"Server busy ({response.status}) for {devices_endpoint}",
+                            _parse_retry_after(response.headers.get("Retry-After")),
+                        )
+                    if conditional and response.status == 304 and self._body_hash is not None:
+                        self.stats["not_modified"] += 1
+                        self.stats["bytes_saved"] += self._body_size
+                        self.stats["decode_seconds_avoided"] += self._decode_time
+                        if self.metrics is not None:
+                            self.metrics.add(NETWORK_SECONDS, network_time)
+                            self.metrics.add(BYTES_RECEIVED, 0)
+                        return None
+                    if response.status == 304:
+                        unusable_304 = True
+                    else:
+                        response.raise_for_status()
+                        etag = response.headers.get("ETag")
+                        last_modified = response.headers.get("Last-Modified")
+                        # Content-Length is the compressed size when the body was encoded.
+                        wire_size = int(response.headers.get("Content-Length") or len(body))
+        except TrmnlApiAuthError as err:
             _LOGGER.error("Error fetching TRMNL devices from %s: %s", devices_endpoint, err)
             raise
-        except ValueError as err: # Catch JSON decoding errors
-            _LOGGER.error("Error decoding JSON from TRMNL devices from %s: %s", devices_endpoint, err)
+        except TrmnlApiRateLimitError as err:
+            # Transient; the coordinator retries and logs outages once.
+            _LOGGER.debug("Error fetching TRMNL devices from %s: %s", devices_endpoint, err)
             raise
+        except (aiohttp.ClientError, TimeoutError) as err:
+            _LOGGER.debug("Error fetching TRMNL devices from %s: %s", devices_endpoint, err)
+            if self.recorder is not None and not isinstance(err, aiohttp.ClientResponseError):
+                self.recorder.record(started, None, error=str(err) or "timeout")
+            raise TrmnlApiConnectionError(str(err) or "Request timed out") from err
+
+        if unusable_304:
+            if not conditional:
+                raise TrmnlApiConnectionError(f"Unexpected 304 without validators from {devices_endpoint}")
+            # Treat it as a cache miss: ask again, once, without validators.
+            _LOGGER.debug("Got 304 from %s with nothing cached; fetching in full", devices_endpoint)
+            self._etag = None
+            self._last_modified = None
+            return await self.get_devices()
+
+        self.stats["bytes_received"] += wire_size
+        if self.metrics is not None:
+            self.metrics.add(NETWORK_SECONDS, network_time)
+            self.metrics.add(BYTES_RECEIVED, wire_size)
+        body_hash = hashlib.blake2b(body, digest_size=16).digest()
+        if conditional and body_hash == self._body_hash:
+            self._etag = etag
+            self._last_modified = last_modified
+            self.stats["unchanged"] += 1
+            self.stats["decode_seconds_avoided"] += self._decode_time
+            return None
+
+        start = time.perf_counter()
+        try:
+            if len(body) < ENTRY_DECODE_MIN_BYTES:
+                devices = decode_devices(body)
+            else:
+                # A fleet-sized payload would block the event loop for a while.
+                devices = await asyncio.get_running_loop().run_in_executor(None, decode_devices, body)
+        except ValueError as err: # Malformed JSON, or not an object with a `data` list
+            _LOGGER.error("Error decoding JSON from TRMNL devices from %s: %s", devices_endpoint, err)
+            raise TrmnlApiError(f"Invalid response from {devices_endpoint}: {err}") from err
+        self._decode_time = time.perf_counter() - start
+        if self.metrics is not None:
+            self.metrics.add(DECODE_SECONDS, self._decode_time)
+
+        # Only remember validators for a payload we actually decoded.
+        self._etag = etag
+        self._last_modified = last_modified
+        self._body_hash = body_hash
+        self._body_size = wire_size
+        return devices
@@ -0,0 +1,174 @@
+"""Streaming battery drain-rate and time-to-empty estimation per device."""
+from collections import deque
+from datetime import datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    BATTERY_CHARGE_JUMP,
+    BATTERY_CHARGING_VOLTAGE,
+    BATTERY_HISTORY_SIZE,
+    BATTERY_MIN_SAMPLES,
+    BATTERY_MIN_SPAN_DAYS,
+)
+
+SECONDS_PER_DAY = 86400
+
+
+class BatteryDrainEstimator:
+    """Least-squares fit of battery percentage over time for one discharge segment.
+
+    Samples live in a fixed-size ring buffer and the regression sums are updated
+    as samples enter and leave it, so each observation is O(1) in time and the
+    state is O(1) in memory. A charge (voltage above the LiPo range, or the
+    percentage jumping up) ends the segment: the buffer is cleared and fitting
+    starts again once the device discharges.
+    """
+
+    __slots__ = ("_n", "_sp", "_st", "_stp", "_stt", "charging", "last_ping", "origin", "samples")
+
+    def __init__(self):
+        # Time of the segment's first sample; sample times are days since then.
+        self.origin = None
+        self.samples = deque(maxlen=BATTERY_HISTORY_SIZE)
+        self.charging = False
+        self.last_ping = None
+        self._reset_sums()
+
+    def _reset_sums(self):
+        self._n = 0
+        self._st = self._sp = self._stt = self._stp = 0.0
+
+    def _start_segment(self):
+        self.origin = None
+        self.samples.clear()
+        self._reset_sums()
+
+    def observe(self, device) -> bool:
+        """Take the device's latest reading; return True if the estimate may have changed."""
+        ping = device.last_ping_at
+        percentage = device.battery_percentage
+        if ping is None or percentage is None or (self.last_ping is not None and ping <= self.last_ping):
+            # No new check-in since the last observation.
+            return False
+        self.last_ping = ping
+        voltage = device.battery_voltage
+        if voltage is not None and voltage >= BATTERY_CHARGING_VOLTAGE:
+            # Plugged in: readings are meaningless for discharge.
+            changed = not self.charging or bool(self.samples)
+            self.charging = True
+            self._start_segment()
+            return changed
+        if self.samples and percentage > self.samples[-1][1] + BATTERY_CHARGE_JUMP:
+            # Recharged between two check-ins: start a new segment from here.
+            self._start_segment()
+        self.charging = False
+        self._add(ping, float(percentage))
+        return True
+
+    def _add(self, ping: datetime, percentage: float) -> None:
+        if self.origin is None:
+            self.origin = ping
+        t = (ping - self.origin).total_seconds() / SECONDS_PER_DAY
+        if len(self.samples) == self.samples.maxlen:
+            old_t, old_p = self.samples[0]
+            self._n -= 1
+            self._st -= old_t
+            self._sp -= old_p
+            self._stt -= old_t * old_t
+            self._stp -= old_t * old_p
+        self.samples.append((t, percentage))
+        self._n += 1
+        self._st += t
+        self._sp += percentage
+        self._stt += t * t
+        self._stp += t * percentage
+
+    def _fit(self):
+        """Return (slope %/day, intercept) or None while there is too little data."""
+        n = self._n
+        if n < BATTERY_MIN_SAMPLES or self.samples[-1][0] - self.samples[0][0] < BATTERY_MIN_SPAN_DAYS:
+            return None
+        denominator = n * self._stt - self._st * self._st
+        if denominator <= 0:
+            return None
+        slope = (n * self._stp - self._st * self._sp) / denominator
+        return slope, (self._sp - slope * self._st) / n
+
+    @property
+    def drain_rate(self):
+        """Percent per day being lost (positive while discharging), or None."""
+        fit = self._fit()
+        if fit is None:
+            return None
+        return round(-fit[0], 2)
+
+    @property
+    def empty_at(self):
+        """When the fitted line reaches 0%, or None if unknown or not discharging."""
+        fit = self._fit()
+        # Judged at the precision drain_rate reports: a slope that is negative only by
+        # rounding noise would put 0% beyond what a datetime can hold.
+        if fit is None or round(fit[0], 2) >= 0:
+            return None
+        slope, intercept = fit
+        return self.origin + timedelta(days=-intercept / slope)
+
+    def as_dict(self) -> dict:
+        """Serialize for the store."""
+        return {
+            "origin": self.origin.isoformat() if self.origin else None,
+            "last_ping": self.last_ping.isoformat() if self.last_ping else None,
+            "charging": self.charging,
+            "samples": [[round(t, 6), p] for t, p in self.samples],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Restore from `as_dict()` output."""
+        estimator = cls()
+        estimator.charging = bool(data.get("charging"))
+        estimator.last_ping = dt_util.parse_datetime(data.get("last_ping") or "")
+        estimator.origin = dt_util.parse_datetime(data.get("origin") or "")
+        if estimator.origin is not None:
+            for t, percentage in data.get("samples", ())[-BATTERY_HISTORY_SIZE:]:
+                estimator._add(estimator.origin + timedelta(days=t), float(percentage))
+        return estimator
+
+
+class FleetBatteryAnalytics:
+    """One `BatteryDrainEstimator` per device friendly_id."""
+
+    def __init__(self):
+        """Initialize with no history."""
+        self.estimators = {}
+
+    def observe(self, device) -> bool:
+        """Feed one device's latest record."""
+        estimator = self.estimators.get(device.friendly_id)
+        if estimator is None:
+            estimator = self.estimators[device.friendly_id] = BatteryDrainEstimator()
+        return estimator.observe(device)
+
+    def forget(self, friendly_id: str) -> None:
+        """Drop the history of a device that left the account."""
+        self.estimators.pop(friendly_id, None)
+
+    def get(self, friendly_id: str):
+        """Return the device's estimator, or None if it has no history."""
+        return self.estimators.get(friendly_id)
+
+    def as_dict(self) -> dict:
+        """Serialize for the store."""
+        return {friendly_id: estimator.as_dict() for friendly_id, estimator in self.estimators.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Restore from `as_dict()` output, skipping unreadable entries."""
+        analytics = cls()
+        for friendly_id, estimator in (data or {}).items():
+            try:
+                analytics.estimators[friendly_id] = BatteryDrainEstimator.from_dict(estimator)
+            except (TypeError, ValueError, KeyError):
+                continue
+        return analytics
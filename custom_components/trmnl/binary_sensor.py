@@ -0,0 +1,74 @@
+"""Binary sensor platform for TRMNL integration: per-device problem flags."""
+from functools import partial
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .entity import TrmnlDeviceEntity, async_setup_device_entities
+from .health import LOW_BATTERY, OFFLINE, WEAK_SIGNAL
+
+# (problem, name, device class, icon) of each device's problem sensors
+PROBLEM_SENSORS = (
+    (LOW_BATTERY, "Low Battery", BinarySensorDeviceClass.BATTERY, None),
+    (WEAK_SIGNAL, "Weak Signal", BinarySensorDeviceClass.PROBLEM, "mdi:wifi-alert"),
+    (OFFLINE, "Offline", BinarySensorDeviceClass.PROBLEM, "mdi:lan-disconnect"),
+)
+
+
+async def async_setup_entry(
+        hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+):
+    """Set up TRMNL binary sensors based on a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    async_setup_device_entities(
+        hass,
+        entry,
+        coordinator,
+        async_add_entities,
+        "binary_sensor",
+        [(description[0], partial(TrmnlProblemBinarySensor, description=description)) for description in PROBLEM_SENSORS],
+    )
+
+
+class TrmnlProblemBinarySensor(TrmnlDeviceEntity, BinarySensorEntity):
+    """On while the coordinator's fleet health evaluation flags the problem for the device."""
+
+    def __init__(self, coordinator, device, description):
+        """Initialize the binary sensor."""
+        super().__init__(coordinator, device)
+        self._problem, self._label, self._device_class, self._icon = description
+
+    def _changed_devices(self):
+        """Devices whose flags changed in the latest evaluation."""
+        return self.coordinator.health.changed
+
+    @property
+    def unique_id(self):
+        """Return a unique ID to use for this entity."""
+        return f"{self._mac_address}_{self._problem}"
+
+    @property
+    def name(self):
+        """Return the name of the binary sensor."""
+        return f"{self._name} {self._label}"
+
+    @property
+    def is_on(self):
+        """Return True if the problem is flagged."""
+        return self.coordinator.health.is_active(self._friendly_id, self._problem)
+
+    @property
+    def device_class(self):
+        """Return the device class of the binary sensor."""
+        return self._device_class
+
+    @property
+    def icon(self):
+        """Return the icon of the binary sensor."""
+        return self._icon
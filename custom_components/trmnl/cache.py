@@ -0,0 +1,59 @@
+"""Short-lived shared cache for `/api/devices` responses."""
+import asyncio
+import time
+
+from homeassistant.core import HomeAssistant, callback
+
+from .api import TrmnlApiClient
+from .const import DATA_FETCH_CACHE, FETCH_CACHE_TTL
+
+
+class DevicesFetchCache:
+    """Share `/api/devices` results per (API key, base URL) for a few seconds.
+
+    The config flow, the options flow and a freshly set up coordinator all fetch the
+    same device list within moments of each other. Whoever fetches first leaves the
+    result here for the others, and concurrent identical fetches share one request.
+    """
+
+    def __init__(self, ttl: float = FETCH_CACHE_TTL):
+        """Initialize the cache."""
+        self.ttl = ttl
+        self._results = {}
+        self._inflight = {}
+
+    async def async_get_devices(self, client: TrmnlApiClient):
+        """Return a recent device list for the client's account, fetching if needed."""
+        key = (client.api_key, client.api_base_url)
+        now = time.monotonic()
+        self._results = {
+            cached_key: cached
+            for cached_key, cached in self._results.items()
+            if now - cached[0] < self.ttl
+        }
+        if key in self._results:
+            return self._results[key][1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(client.get_devices())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._request_done(key, done))
+        # Shield the shared request so one cancelled caller does not fail the others.
+        devices = await asyncio.shield(task)
+        self._results[key] = (time.monotonic(), devices)
+        return devices
+
+    def _request_done(self, key, task: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark the error as retrieved even if every waiter was cancelled.
+            task.exception()
+
+
+@callback
+def async_get_fetch_cache(hass: HomeAssistant) -> DevicesFetchCache:
+    """Return the integration-wide fetch cache, creating it on first use."""
+    if DATA_FETCH_CACHE not in hass.data:
+        hass.data[DATA_FETCH_CACHE] = DevicesFetchCache()
+    return hass.data[DATA_FETCH_CACHE]
@@ -1,22 +1,53 @@
 """Config flow for TRMNL integration."""
+import asyncio
 import logging
+import secrets
 import voluptuous as vol
-import requests
 
 from homeassistant import config_entries
+from homeassistant.components import webhook
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import selector
 
-from .api import TrmnlApiClient
+from .api import TrmnlApiAuthError, TrmnlApiError
+from .cache import async_get_fetch_cache
 from .const import (
     DOMAIN,
     CONF_API_KEY,
     CONF_SCAN_INTERVAL,
     CONF_API_BASE_URL,
+    CONF_ADAPTIVE_POLLING,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_ADDITIONAL_ENDPOINTS,
+    CONF_TIMEOUT,
+    CONF_PUSH_ENABLED,
+    CONF_WEBHOOK_ID,
+    CONF_PUSH_TOKEN,
+    CONF_DIAGNOSTIC_SENSORS,
+    CONF_LOW_BATTERY_THRESHOLD,
+    CONF_WEAK_SIGNAL_THRESHOLD,
+    CONF_OFFLINE_AFTER,
+    CONF_ENTITY_PROFILE,
+    CONF_DEVICE_PROFILES,
+    CONF_STATISTICS_MODE,
     DEFAULT_SCAN_INTERVAL,
     DEFAULT_API_BASE_URL,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_PUSH_ENABLED,
+    DEFAULT_DIAGNOSTIC_SENSORS,
+    DEFAULT_LOW_BATTERY_THRESHOLD,
+    DEFAULT_WEAK_SIGNAL_THRESHOLD,
+    DEFAULT_OFFLINE_AFTER,
+    DEFAULT_ENTITY_PROFILE,
+    DEFAULT_STATISTICS_MODE,
     MIN_SCAN_INTERVAL,
+    REQUEST_TIMEOUT,
 )
+from .fanout import format_endpoints, parse_endpoints
+from .profiles import PROFILES, format_device_profiles, parse_device_profiles
+from .request_scheduler import async_create_client
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,28 +66,26 @@ class TrmnlFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 "TRMNL API key does not start with 'user_'; you may be using the wrong "
                 "key. Use the account API Key from https://trmnl.com/account."
             )
-        client = TrmnlApiClient(
-            api_key,
-            data.get(CONF_API_BASE_URL, DEFAULT_API_BASE_URL),
+        client = async_create_client(
+            hass, api_key, data.get(CONF_API_BASE_URL, DEFAULT_API_BASE_URL)
         )
         try:
-            devices = await hass.async_add_executor_job(client.get_devices)
-            if not isinstance(devices, list):
-                _LOGGER.error("API response for devices is not a list: %s", devices)
-                raise InvalidAuth("Received malformed data from TRMNL API")
-        except requests.exceptions.HTTPError as http_err:
-            if http_err.response.status_code == 401:
-                _LOGGER.error("Authentication failed with TRMNL API (main key): %s", http_err)
-                raise InvalidAuth("Invalid API key or base URL") from http_err
-            _LOGGER.error("HTTP error connecting to TRMNL API: %s", http_err)
-            raise ConnectionError("Failed to connect to TRMNL API (HTTP error)") from http_err
-        except requests.exceptions.RequestException as req_err:
-            _LOGGER.error("Request error connecting to TRMNL API: %s", req_err)
-            raise ConnectionError("Failed to connect to TRMNL API (request error)") from req_err
+            # Cached briefly so the entry's first refresh reuses this fetch.
+            devices = await async_get_fetch_cache(hass).async_get_devices(client)
+        except TrmnlApiAuthError as auth_err:
+            _LOGGER.error("Authentication failed with TRMNL API (main key): %s", auth_err)
+            raise InvalidAuth("Invalid API key or base URL") from auth_err
+        except TrmnlApiError as api_err:
+            _LOGGER.error("Error connecting to TRMNL API: %s", api_err)
+            raise ConnectionError("Failed to connect to TRMNL API") from api_err
         except Exception as exc:
             _LOGGER.error("Unexpected error validating TRMNL API connection: %s", exc)
             raise ConnectionError(f"An unexpected error occurred: {exc}") from exc
 
+        if not isinstance(devices, list):
+            _LOGGER.error("API response for devices is not a list: %s", devices)
+            raise InvalidAuth("Received malformed data from TRMNL API")
+
         return {"title": "TRMNL"} # Default title, can be customized if needed
 
     async def async_step_user(self, user_input=None):
@@ -124,11 +153,25 @@ class TrmnlOptionsFlowHandler(config_entries.OptionsFlow):
     async def async_step_init(self, user_input=None):
         errors = {}
         # `self.config_entry` is provided by Home Assistant (read-only property).
-        current_api_base_url = self.config_entry.data.get(CONF_API_BASE_URL, DEFAULT_API_BASE_URL)
-        current_scan_interval = self.config_entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        # Saved options override the values from the initial setup.
+        current_config = {**self.config_entry.data, **self.config_entry.options}
+        current_api_base_url = current_config.get(CONF_API_BASE_URL, DEFAULT_API_BASE_URL)
+        current_scan_interval = current_config.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        current_adaptive_polling = current_config.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING)
+        current_max_poll_interval = current_config.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL)
+        current_endpoints = current_config.get(CONF_ADDITIONAL_ENDPOINTS, [])
+        current_endpoints_text = format_endpoints(current_endpoints)
+        current_push_enabled = current_config.get(CONF_PUSH_ENABLED, DEFAULT_PUSH_ENABLED)
+        current_diagnostic_sensors = current_config.get(CONF_DIAGNOSTIC_SENSORS, DEFAULT_DIAGNOSTIC_SENSORS)
+        current_low_battery = current_config.get(CONF_LOW_BATTERY_THRESHOLD, DEFAULT_LOW_BATTERY_THRESHOLD)
+        current_weak_signal = current_config.get(CONF_WEAK_SIGNAL_THRESHOLD, DEFAULT_WEAK_SIGNAL_THRESHOLD)
+        current_offline_after = current_config.get(CONF_OFFLINE_AFTER, DEFAULT_OFFLINE_AFTER)
+        current_entity_profile = current_config.get(CONF_ENTITY_PROFILE, DEFAULT_ENTITY_PROFILE)
+        current_device_profiles_text = format_device_profiles(current_config.get(CONF_DEVICE_PROFILES, {}))
+        current_statistics_mode = current_config.get(CONF_STATISTICS_MODE, DEFAULT_STATISTICS_MODE)
 
         if user_input is not None:
-            updated_data = self.config_entry.data.copy()
+            updated_data = current_config
             needs_main_api_validation = False
 
             # Process API Base URL
@@ -144,28 +187,77 @@ class TrmnlOptionsFlowHandler(config_entries.OptionsFlow):
             else:
                 updated_data[CONF_SCAN_INTERVAL] = new_scan_interval
 
+            # Process adaptive polling; the freshness bound may not undercut the interval
+            updated_data[CONF_ADAPTIVE_POLLING] = user_input.get(
+                CONF_ADAPTIVE_POLLING, current_adaptive_polling
+            )
+            new_max_poll_interval = user_input.get(CONF_MAX_POLL_INTERVAL, current_max_poll_interval)
+            if new_max_poll_interval < new_scan_interval:
+                errors["base"] = "invalid_max_poll_interval"
+            else:
+                updated_data[CONF_MAX_POLL_INTERVAL] = new_max_poll_interval
+
+            # Process additional endpoints (one "<base URL> <API key> [timeout]" per line)
+            current_endpoints_text = user_input.get(CONF_ADDITIONAL_ENDPOINTS, current_endpoints_text)
+            try:
+                new_endpoints = parse_endpoints(current_endpoints_text)
+            except ValueError:
+                errors["base"] = "invalid_endpoints"
+            else:
+                updated_data[CONF_ADDITIONAL_ENDPOINTS] = new_endpoints
+
+            # Process push; the webhook ID and token are generated once and kept
+            updated_data[CONF_PUSH_ENABLED] = user_input.get(CONF_PUSH_ENABLED, current_push_enabled)
+            if updated_data[CONF_PUSH_ENABLED] and CONF_WEBHOOK_ID not in updated_data:
+                updated_data[CONF_WEBHOOK_ID] = webhook.async_generate_id()
+                updated_data[CONF_PUSH_TOKEN] = secrets.token_urlsafe(32)
+
+            updated_data[CONF_DIAGNOSTIC_SENSORS] = user_input.get(
+                CONF_DIAGNOSTIC_SENSORS, current_diagnostic_sensors
+            )
+
+            # Problem thresholds (ranges are enforced by the schema)
+            updated_data[CONF_LOW_BATTERY_THRESHOLD] = user_input.get(
+                CONF_LOW_BATTERY_THRESHOLD, current_low_battery
+            )
+            updated_data[CONF_WEAK_SIGNAL_THRESHOLD] = user_input.get(
+                CONF_WEAK_SIGNAL_THRESHOLD, current_weak_signal
+            )
+            updated_data[CONF_OFFLINE_AFTER] = user_input.get(CONF_OFFLINE_AFTER, current_offline_after)
+
+            # Entity profile and per-device overrides (one "<friendly ID> <profile>" per line)
+            updated_data[CONF_ENTITY_PROFILE] = user_input.get(CONF_ENTITY_PROFILE, current_entity_profile)
+            current_device_profiles_text = user_input.get(CONF_DEVICE_PROFILES, current_device_profiles_text)
+            try:
+                updated_data[CONF_DEVICE_PROFILES] = parse_device_profiles(current_device_profiles_text)
+            except ValueError:
+                errors["base"] = "invalid_device_profiles"
+
+            updated_data[CONF_STATISTICS_MODE] = user_input.get(CONF_STATISTICS_MODE, current_statistics_mode)
+
+            if not errors and needs_main_api_validation:
+                try:
+                    # Validate with potentially new API base URL, using existing main API key
+                    validation_data = {
+                        CONF_API_KEY: current_config[CONF_API_KEY], # Main key
+                        CONF_API_BASE_URL: new_api_base_url
+                    }
+                    flow_handler = TrmnlFlowHandler()
+                    flow_handler.hass = self.hass
+                    await flow_handler._validate_input(self.hass, validation_data)
+                except InvalidAuth:
+                    errors["base"] = "invalid_base_url_auth"
+                except ConnectionError:
+                    errors["base"] = "cannot_connect_options"
+                except Exception:
+                    _LOGGER.exception("Unexpected exception during options validation")
+                    errors["base"] = "unknown_options"
+
+            if not errors and new_endpoints != current_endpoints:
+                errors.update(await self._validate_endpoints(new_endpoints))
+
             if not errors:
-                if needs_main_api_validation:
-                    try:
-                        # Validate with potentially new API base URL, using existing main API key
-                        validation_data = {
-                            CONF_API_KEY: self.config_entry.data[CONF_API_KEY], # Main key
-                            CONF_API_BASE_URL: new_api_base_url
-                        }
-                        flow_handler = TrmnlFlowHandler()
-                        flow_handler.hass = self.hass
-                        await flow_handler._validate_input(self.hass, validation_data)
-                        # If validation passes, create/update the entry
-                        return self.async_create_entry(title="", data=updated_data)
-                    except InvalidAuth:
-                        errors["base"] = "invalid_base_url_auth"
-                    except ConnectionError:
-                        errors["base"] = "cannot_connect_options"
-                    except Exception:
-                        _LOGGER.exception("Unexpected exception during options validation")
-                        errors["base"] = "unknown_options"
-                else: # No main API validation needed, just update data
-                    return self.async_create_entry(title="", data=updated_data)
+                return self.async_create_entry(title="", data=updated_data)
 
         return self.async_show_form(
             step_id="init",
@@ -175,10 +267,67 @@ class TrmnlOptionsFlowHandler(config_entries.OptionsFlow):
                     vol.Optional(CONF_SCAN_INTERVAL, default=current_scan_interval): vol.All(
                         vol.Coerce(int), vol.Range(min=MIN_SCAN_INTERVAL)
                     ),
+                    vol.Optional(CONF_ADAPTIVE_POLLING, default=current_adaptive_polling): bool,
+                    vol.Optional(CONF_MAX_POLL_INTERVAL, default=current_max_poll_interval): vol.All(
+                        vol.Coerce(int), vol.Range(min=MIN_SCAN_INTERVAL)
+                    ),
+                    vol.Optional(
+                        CONF_ADDITIONAL_ENDPOINTS, default=current_endpoints_text
+                    ): selector.TextSelector(selector.TextSelectorConfig(multiline=True)),
+                    vol.Optional(CONF_PUSH_ENABLED, default=current_push_enabled): bool,
+                    vol.Optional(CONF_DIAGNOSTIC_SENSORS, default=current_diagnostic_sensors): bool,
+                    vol.Optional(CONF_LOW_BATTERY_THRESHOLD, default=current_low_battery): vol.All(
+                        vol.Coerce(int), vol.Range(min=0, max=95)
+                    ),
+                    vol.Optional(CONF_WEAK_SIGNAL_THRESHOLD, default=current_weak_signal): vol.All(
+                        vol.Coerce(int), vol.Range(min=-120, max=-30)
+                    ),
+                    vol.Optional(CONF_OFFLINE_AFTER, default=current_offline_after): vol.All(
+                        vol.Coerce(int), vol.Range(min=MIN_SCAN_INTERVAL)
+                    ),
+                    vol.Optional(CONF_ENTITY_PROFILE, default=current_entity_profile): vol.In(list(PROFILES)),
+                    vol.Optional(
+                        CONF_DEVICE_PROFILES, default=current_device_profiles_text
+                    ): selector.TextSelector(selector.TextSelectorConfig(multiline=True)),
+                    vol.Optional(CONF_STATISTICS_MODE, default=current_statistics_mode): bool,
                 }
             ),
             errors=errors,
+            description_placeholders={
+                "push_path": webhook.async_generate_path(current_config[CONF_WEBHOOK_ID])
+                if CONF_WEBHOOK_ID in current_config else "(generated when push is enabled)",
+                "push_token": current_config.get(CONF_PUSH_TOKEN, "-"),
+            },
+        )
+
+    async def _validate_endpoints(self, endpoints: list[dict]) -> dict:
+        """Fetch every additional endpoint concurrently; return form errors, if any."""
+        cache = async_get_fetch_cache(self.hass)
+        results = await asyncio.gather(
+            *(
+                cache.async_get_devices(
+                    async_create_client(
+                        self.hass,
+                        endpoint[CONF_API_KEY],
+                        endpoint[CONF_API_BASE_URL],
+                        endpoint.get(CONF_TIMEOUT, REQUEST_TIMEOUT),
+                    )
+                )
+                for endpoint in endpoints
+            ),
+            return_exceptions=True,
         )
+        for endpoint, result in zip(endpoints, results, strict=True):
+            if isinstance(result, TrmnlApiAuthError):
+                _LOGGER.error("Authentication failed for TRMNL endpoint %s: %s", endpoint[CONF_API_BASE_URL], result)
+                return {"base": "invalid_endpoint_auth"}
+            if isinstance(result, TrmnlApiError):
+                _LOGGER.error("Error connecting to TRMNL endpoint %s: %s", endpoint[CONF_API_BASE_URL], result)
+                return {"base": "cannot_connect_endpoint"}
+            if isinstance(result, Exception):
+                _LOGGER.error("Unexpected error validating TRMNL endpoint %s: %s", endpoint[CONF_API_BASE_URL], result)
+                return {"base": "unknown_options"}
+        return {}
 
 class InvalidAuth(HomeAssistantError):
     """Error to indicate there is invalid auth."""
@@ -6,17 +6,93 @@ DOMAIN = "trmnl"
 CONF_API_KEY = "api_key"
 CONF_API_BASE_URL = "api_base_url" # Renamed from CONF_API_ENDPOINT
 CONF_SCAN_INTERVAL = "scan_interval"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_MAX_POLL_INTERVAL = "max_poll_interval"
+CONF_ADDITIONAL_ENDPOINTS = "additional_endpoints" # Extra servers fetched alongside the base URL
+CONF_TIMEOUT = "timeout" # Per-endpoint request timeout
+CONF_PUSH_ENABLED = "push_enabled"
+CONF_WEBHOOK_ID = "webhook_id" # Generated when push is first enabled
+CONF_PUSH_TOKEN = "push_token" # Bearer token the pushing server must send
+CONF_DIAGNOSTIC_SENSORS = "diagnostic_sensors" # Pipeline metrics on an account hub device
+CONF_LOW_BATTERY_THRESHOLD = "low_battery_threshold"
+CONF_WEAK_SIGNAL_THRESHOLD = "weak_signal_threshold"
+CONF_OFFLINE_AFTER = "offline_after"
+CONF_ENTITY_PROFILE = "entity_profile" # Which entities every device gets
+CONF_DEVICE_PROFILES = "device_profiles" # friendly_id -> profile, overriding CONF_ENTITY_PROFILE
+CONF_STATISTICS_MODE = "statistics_mode" # Hourly external statistics instead of per-poll history
 
 # Defaults
 DEFAULT_SCAN_INTERVAL = 300  # 5 minutes
 DEFAULT_API_BASE_URL = "https://usetrmnl.com" # Renamed and updated from DEFAULT_API_ENDPOINT
 MIN_SCAN_INTERVAL = 60 # Minimum scan interval in seconds (1 minute)
+DEFAULT_ADAPTIVE_POLLING = False
+DEFAULT_MAX_POLL_INTERVAL = 3600 # Freshness bound for adaptive polling (1 hour)
+DEFAULT_PUSH_ENABLED = False
+DEFAULT_DIAGNOSTIC_SENSORS = False
+DEFAULT_LOW_BATTERY_THRESHOLD = 20 # percent
+DEFAULT_WEAK_SIGNAL_THRESHOLD = -80 # dBm
+DEFAULT_OFFLINE_AFTER = 7200 # Seconds without a check-in (outside sleep windows)
+PROFILE_MINIMAL = "minimal"
+PROFILE_STANDARD = "standard"
+PROFILE_FULL = "full"
+DEFAULT_ENTITY_PROFILE = PROFILE_FULL
+DEFAULT_STATISTICS_MODE = False
+REQUEST_TIMEOUT = 10 # Per-request timeout in seconds for /api/devices
+ENTRY_DECODE_MIN_BYTES = 2 * 1024 * 1024 # Larger bodies are decoded entry by entry, off the event loop
+
+# Retries within one poll, with decorrelated-jitter backoff between attempts
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1 # seconds
+RETRY_MAX_DELAY = 30 # seconds; a longer Retry-After is left to the circuit breaker
+
+# Circuit breaker: stop polling after this many failed polls in a row, then probe
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_TIMEOUT = 300 # seconds until the first probe
+BREAKER_MAX_RESET_TIMEOUT = 3600 # cool-down doubles per failed probe up to this
+
+# /api/devices results shared between the config/options flow and setup
+DATA_FETCH_CACHE = f"{DOMAIN}_fetch_cache"
+FETCH_CACHE_TTL = 30 # Seconds a fetched device list may be reused
+
+# Requests shared by every entry on the same server
+DATA_REQUEST_SCHEDULER = f"{DOMAIN}_request_scheduler"
+HOST_MAX_CONCURRENT_REQUESTS = 2 # In-flight /api/devices requests per server
+HOST_RATE_LIMIT = 30 # Requests per HOST_RATE_PERIOD per server (token bucket)
+HOST_RATE_PERIOD = 60 # seconds
+STARTUP_STAGGER = 5 # Seconds between restored entries' first refreshes at boot
+
+# A device missing from this many successful polls in a row is removed; until then it
+# keeps its last record. An empty list from a fleet that had devices counts the same way.
+DEVICE_REMOVAL_POLLS = 3
+
+# Last good fleet snapshot, persisted so setup does not wait for the cloud
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 60 # Coalesce snapshot writes to at most one per minute
 
 
 # Battery voltage limits
 MIN_VOLTAGE = 3.0  # Battery disconnects at this voltage
 MAX_VOLTAGE = 4.2   # Typical fully charged LiPo voltage
 
+# Drain-rate estimation (per device, over the current discharge segment)
+BATTERY_HISTORY_SIZE = 48 # Check-ins kept in the regression window
+BATTERY_MIN_SAMPLES = 4 # Check-ins needed before estimating
+BATTERY_MIN_SPAN_DAYS = 0.25 # ... spanning at least this long (6 hours)
+BATTERY_CHARGING_VOLTAGE = 4.3 # Readings at or above this mean "on the charger" (~4.7 V)
+BATTERY_CHARGE_JUMP = 5 # A rise of more than this many percent between check-ins is a recharge
+
+# Problem flags: a flag set at its threshold clears only past threshold + hysteresis
+BATTERY_HYSTERESIS = 5 # percent
+SIGNAL_HYSTERESIS = 5 # dB
+EVENT_PROBLEM = f"{DOMAIN}_problem" # Fired when a device's problem flag turns on or off
+OFFLINE_MISSED_CHECKINS = 2 # A device with a known cadence may miss this many check-ins before it is offline
+
+# Voltage -> percentage calibration from devices that report both (see soc.py)
+SOC_BIN_WIDTH = 0.01 # Volts per calibration bin
+SOC_BIN_WEIGHT = 50 # Samples per bin after which older readings fade out
+SOC_MIN_BIN_SAMPLES = 2 # Samples a bin needs before it is used
+SOC_MIN_BINS = 10 # Usable bins needed before a calibrated curve replaces the built-in one
+
 # Approximate (voltage, percent) LiPo discharge curve, interpolated as a fallback when the
 # API omits `percent_charged` (mainly OG; Model X has a gas gauge and reports percent_charged).
 # See https://help.trmnl.com/en/articles/10556850-device-battery-faq
@@ -0,0 +1,511 @@
+"""Data update coordinator for the TRMNL integration."""
+import logging
+import time
+from datetime import timedelta
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .api import (
+    TrmnlApiAuthError,
+    TrmnlApiClient,
+    TrmnlApiConnectionError,
+    TrmnlApiError,
+)
+from .battery import FleetBatteryAnalytics
+from .cache import async_get_fetch_cache
+from .const import (
+    DEFAULT_LOW_BATTERY_THRESHOLD,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_OFFLINE_AFTER,
+    DEFAULT_WEAK_SIGNAL_THRESHOLD,
+    DEVICE_REMOVAL_POLLS,
+    DOMAIN,
+    EVENT_PROBLEM,
+    RETRY_ATTEMPTS,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .fanout import TrmnlEndpointFanout
+from .health import FleetHealth
+from .metrics import REFRESH_SECONDS, SNAPSHOT_SECONDS, EntryMetrics
+from .models import FleetDiff, FleetSnapshot, parse_devices
+from .resilience import CircuitBreaker, fetch_with_retry
+from .scheduler import AdaptivePollScheduler
+from .soc import FleetSocCalibration
+from .statistics import HourlyStatistics
+from .statistics import async_import as async_import_statistics
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TrmnlDataUpdateCoordinator(DataUpdateCoordinator[FleetSnapshot]):
+    """Poll `/api/devices` and publish an indexed `FleetSnapshot`."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        client: TrmnlApiClient,
+        scan_interval: int,
+        adaptive_polling: bool = False,
+        max_poll_interval: int = DEFAULT_MAX_POLL_INTERVAL,
+        request_scheduler=None,
+        extra_clients=(),
+        push_enabled: bool = False,
+        low_battery_threshold: int = DEFAULT_LOW_BATTERY_THRESHOLD,
+        weak_signal_threshold: int = DEFAULT_WEAK_SIGNAL_THRESHOLD,
+        offline_after: int = DEFAULT_OFFLINE_AFTER,
+        statistics_mode: bool = False,
+    ):
+        """Initialize the coordinator.
+
+        `request_scheduler` (a `TrmnlRequestScheduler`) places fixed-interval polls in
+        this entry's slot so entries do not poll together. `extra_clients` are
+        further servers whose fleets are merged with the primary `client`'s. With
+        `push_enabled`, devices are expected to arrive through `async_ingest` and
+        polling slows to `max_poll_interval` as a reconciliation fallback. The
+        thresholds (percent, dBm, seconds since the last check-in) drive the
+        problem flags evaluated after every refresh. With `statistics_mode`, each
+        device's battery and RSSI are aggregated per hour and imported as external
+        statistics by the first poll one polling interval after the hour ends.
+        """
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=entry,
+            name=DOMAIN,
+            update_interval=timedelta(seconds=scan_interval),
+        )
+        self.client = client
+        self.extra_clients = list(extra_clients)
+        self.metrics = EntryMetrics()
+        self.fanout = self._build_fanout()
+        self.entry_id = entry.entry_id
+        self.request_scheduler = request_scheduler
+        self.scan_interval = timedelta(seconds=scan_interval)
+        self.push_enabled = push_enabled
+        self.scheduler = None
+        self.async_set_adaptive_polling(adaptive_polling, max_poll_interval)
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+        # True while the published data came from storage rather than a live fetch.
+        self.stale = False
+        self._first_fetch = True
+        self.breaker = CircuitBreaker()
+        # friendly_ids whose record changed in the latest refresh; entities of other
+        # devices skip their state write.
+        self.changed_devices = frozenset()
+        # Devices added, removed or renamed in the latest refresh; the sensor platform
+        # reconciles its entities from this instead of rescanning the fleet.
+        self.fleet_diff = FleetDiff()
+        # friendly_id -> successful polls in a row the device was missing from.
+        self._missing_polls = {}
+        # Successful polls in a row that returned no devices at all.
+        self._empty_polls = 0
+        # The records of the latest decoded body, replayed while devices count down.
+        self._last_records = ()
+        # When Home Assistant first received each device's current data.
+        self.device_updated_at = {}
+        # Per-device drain-rate estimators, fed with every changed record.
+        self.battery = FleetBatteryAnalytics()
+        # Voltage -> percentage curves learnt from devices reporting percent_charged.
+        self.soc = FleetSocCalibration()
+        # Problem flags and fleet aggregates, re-evaluated once per refresh.
+        self.health = FleetHealth(low_battery_threshold, weak_signal_threshold, offline_after)
+        # Timer for the earliest offline deadline, so devices go offline between polls.
+        self._unsub_deadline = None
+        self._deadline_at = None
+        # Hourly battery/RSSI aggregates in statistics mode, else None.
+        self.statistics = HourlyStatistics() if statistics_mode else None
+        # Hourly statistics rows handed to the recorder.
+        self.statistics_rows = 0
+        # Entity state writes performed / suppressed because nothing changed.
+        self.entity_writes = 0
+        self.entity_writes_skipped = 0
+        # Pushed device records received / that changed something.
+        self.pushed_devices = 0
+        self.pushed_changes = 0
+
+    def _build_fanout(self) -> TrmnlEndpointFanout:
+        """Fan out over the current clients, which report into this entry's metrics."""
+        clients = [self.client, *self.extra_clients]
+        for client in clients:
+            client.metrics = self.metrics
+        return TrmnlEndpointFanout(clients)
+
+    async def _async_update_data(self) -> FleetSnapshot:
+        """Fetch device data from the API."""
+        started = time.perf_counter()
+        self.changed_devices = frozenset()
+        self.fleet_diff = FleetDiff()
+        self.health.changed = frozenset()
+        if not self.breaker.allow_request():
+            # Circuit open, or the server asked us to wait: do not touch the API until then.
+            return self._serve_stale(
+                "server asked to retry later" if self.breaker.holding_off else "circuit breaker open"
+            )
+        probing = self.breaker.probing
+        try:
+            devices = await fetch_with_retry(
+                self._async_fetch, attempts=1 if probing else RETRY_ATTEMPTS
+            )
+        except TrmnlApiError as err:
+            # Retry at the configured rate, not after a long adaptive delay.
+            self.update_interval = self._fixed_interval()
+            if isinstance(err, TrmnlApiConnectionError):
+                was_open = self.breaker.state != CircuitBreaker.CLOSED
+                self.breaker.record_failure(getattr(err, "retry_after", None))
+                if not was_open and self.breaker.state == CircuitBreaker.OPEN:
+                    _LOGGER.warning(
+                        "TRMNL API failed %s polls in a row (%s); pausing requests",
+                        self.breaker.consecutive_failures, err,
+                    )
+            else:
+                # The server answered (rejected key, malformed payload), so it is up;
+                # pausing requests would only hide the error.
+                self.breaker.record_success()
+            if self.data is None or isinstance(err, TrmnlApiAuthError):
+                raise UpdateFailed(f"Error communicating with API for devices: {err}") from err
+            return self._serve_stale(err)
+        except BaseException:
+            # Cancelled, or an error that escaped the client: end the probe as a failure,
+            # or the breaker stays half-open and allow_request() never lets another through.
+            if probing:
+                self.breaker.record_failure()
+            raise
+        if probing:
+            _LOGGER.info("TRMNL API reachable again; resuming normal polling")
+        self.breaker.record_success()
+        self.stale = False
+        if devices is None and not self._missing_polls:
+            # 304 or identical body: nothing to decode, diff or write.
+            snapshot = self.data
+        else:
+            build_started = time.perf_counter()
+            if devices is None:
+                # Same body as last time, but devices missing from it are counting down.
+                records = list(self._last_records)
+            else:
+                records = parse_devices(devices)
+                self.soc.apply(records)
+                self._last_records = tuple(records)
+            empty = not records
+            if empty and self.data:
+                # A fleet does not vanish between two polls; more likely a glitch. Its
+                # devices count down in _hold_missing like any other missing device.
+                self._empty_polls += 1
+                if self._empty_polls == 1:
+                    _LOGGER.warning("TRMNL API returned no devices; keeping the last known data")
+            else:
+                self._empty_polls = 0
+            snapshot = FleetSnapshot(self._hold_missing(records), fetched_at=dt_util.utcnow())
+            # Flag the held fleet as stale until its devices are removed.
+            self.stale = empty and bool(snapshot)
+            self._track_changes(snapshot)
+            self.metrics.add(SNAPSHOT_SECONDS, time.perf_counter() - build_started)
+            if self.changed_devices or self.fleet_diff:
+                self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+        # Also after a 304: a device that stopped checking in goes offline.
+        self._evaluate_health(snapshot)
+        if self.statistics is not None:
+            self._import_statistics(dt_util.utcnow())
+        if self.scheduler is not None and not self.push_enabled:
+            # Sleep windows are local times, so hand the scheduler local "now".
+            self.update_interval = self.scheduler.next_interval(snapshot, dt_util.now())
+        else:
+            self.update_interval = self._fixed_interval()
+        self.metrics.add(REFRESH_SECONDS, time.perf_counter() - started)
+        return snapshot
+
+    def _fixed_interval(self) -> timedelta:
+        """Return the delay to the next fixed-interval poll, aligned to the entry's slot."""
+        interval = self.scan_interval
+        if self.push_enabled:
+            interval = max(interval, self.max_poll_interval)
+        if self.request_scheduler is None:
+            return interval
+        return self.request_scheduler.next_poll_delay(self.entry_id, interval)
+
+    async def _async_fetch(self):
+        """Make one fetch attempt of every endpoint (through the shared cache for the first one)."""
+        if self._first_fetch:
+            # Reuse (or join) the fetches the config/options flow just made.
+            cache = async_get_fetch_cache(self.hass)
+            devices = await self.fanout.get_devices(
+                fetch=lambda client, conditional: cache.async_get_devices(client)
+            )
+            self._first_fetch = False
+            return devices
+        return await self.fanout.get_devices(conditional=self.data is not None)
+
+    def _serve_stale(self, reason) -> FleetSnapshot:
+        """Keep publishing the last good snapshot, marked stale, instead of failing."""
+        if self.data is None:
+            raise UpdateFailed(f"No TRMNL data available: {reason}")
+        if not self.stale:
+            _LOGGER.warning("TRMNL API unavailable (%s); keeping the last known data", reason)
+        self.stale = True
+        return self.data
+
+    def _hold_missing(self, records: list) -> list:
+        """Keep the last record of devices missing for fewer than DEVICE_REMOVAL_POLLS polls.
+
+        Removing a device deletes its entities and with them the user's names, areas
+        and disabled flags, so one payload without it is not enough.
+        """
+        if not self.data:
+            self._missing_polls = {}
+            return records
+        present = {device.friendly_id for device in records}
+        missing_polls = {}
+        for friendly_id in self.data.friendly_ids:
+            if friendly_id in present:
+                continue
+            polls = self._missing_polls.get(friendly_id, 0) + 1
+            if polls < DEVICE_REMOVAL_POLLS:
+                missing_polls[friendly_id] = polls
+                records.append(self.data.get(friendly_id))
+        self._missing_polls = missing_polls
+        return records
+
+    def _track_changes(self, snapshot: FleetSnapshot) -> None:
+        """Diff the new snapshot against the previous one, per device."""
+        self.changed_devices = snapshot.changed_since(self.data)
+        self.fleet_diff = snapshot.diff(self.data, self.changed_devices)
+        updated_at = {
+            friendly_id: self.device_updated_at.get(friendly_id)
+            for friendly_id in snapshot.friendly_ids
+        }
+        for friendly_id in self.changed_devices:
+            updated_at[friendly_id] = snapshot.fetched_at
+        self.device_updated_at = updated_at
+        self._observe_batteries(snapshot)
+
+    def _evaluate_health(self, snapshot: FleetSnapshot) -> None:
+        """Re-evaluate the problem flags and fire an event per flag that flipped."""
+        self._fire_problem_events(self.health.evaluate(snapshot, dt_util.utcnow()))
+        self._schedule_deadline()
+
+    def _fire_problem_events(self, transitions) -> None:
+        """Fire EVENT_PROBLEM for each (device, problem, active) transition."""
+        for device, problem, active in transitions:
+            self.hass.bus.async_fire(
+                EVENT_PROBLEM,
+                {
+                    "entry_id": self.entry_id,
+                    "friendly_id": device.friendly_id,
+                    "name": device.name,
+                    "problem": problem,
+                    "active": active,
+                    "battery_percentage": device.battery_percentage,
+                    "rssi": device.rssi,
+                    "last_ping_at": device.last_ping_iso,
+                },
+            )
+
+    def _schedule_deadline(self) -> None:
+        """Arm the single timer for the earliest offline deadline, if it moved."""
+        deadline = self.health.next_deadline
+        if deadline == self._deadline_at:
+            return
+        if self._unsub_deadline is not None:
+            self._unsub_deadline()
+            self._unsub_deadline = None
+        self._deadline_at = deadline
+        if deadline is not None:
+            self._unsub_deadline = async_track_point_in_utc_time(
+                self.hass, self._async_deadline_passed, deadline
+            )
+
+    @callback
+    def _async_deadline_passed(self, now) -> None:
+        """Flag the devices whose deadline passed as offline, without polling."""
+        self._unsub_deadline = None
+        self._deadline_at = None
+        if self.stale:
+            # The API is unreachable, so a missing check-in says nothing about the
+            # device. The next successful refresh re-arms the timer.
+            return
+        transitions = self.health.expire(now)
+        if self.health.changed:
+            self._fire_problem_events(transitions)
+            self.changed_devices = frozenset()
+            self.fleet_diff = FleetDiff()
+            self.async_update_listeners()
+        self._schedule_deadline()
+
+    def _import_statistics(self, now) -> None:
+        """Import the hours that ended a full polling interval ago, in one batch.
+
+        A check-in just before the hour ends only shows up in the next poll, up to
+        one interval later, and an hour handed out no longer takes readings.
+        """
+        interval = self.scan_interval
+        if self.scheduler is not None or self.push_enabled:
+            interval = max(interval, self.max_poll_interval)
+        rows = async_import_statistics(self.hass, self.statistics.pop_completed(now, interval))
+        if rows:
+            self.statistics_rows += rows
+            self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+
+    async def async_shutdown(self) -> None:
+        """Cancel the offline timer, then shut the coordinator down."""
+        if self._unsub_deadline is not None:
+            self._unsub_deadline()
+            self._unsub_deadline = None
+            self._deadline_at = None
+        await super().async_shutdown()
+
+    @callback
+    def async_set_health_thresholds(
+        self, low_battery_threshold: int, weak_signal_threshold: int, offline_after: int
+    ) -> None:
+        """Apply new thresholds to the current snapshot right away."""
+        self.health.set_thresholds(low_battery_threshold, weak_signal_threshold, offline_after)
+        if self.data is None:
+            return
+        self.changed_devices = frozenset()
+        self.fleet_diff = FleetDiff()
+        self._evaluate_health(self.data)
+        self.async_update_listeners()
+
+    def _observe_batteries(self, snapshot: FleetSnapshot) -> None:
+        """Feed the changed records to the battery estimators and hourly statistics (O(1) per device)."""
+        for friendly_id in self.changed_devices:
+            device = snapshot.get(friendly_id)
+            self.battery.observe(device)
+            if self.statistics is not None:
+                self.statistics.observe(device)
+        for friendly_id in self.fleet_diff.removed:
+            self.battery.forget(friendly_id)
+            self.soc.forget(friendly_id)
+            if self.statistics is not None:
+                self.statistics.forget(self.data.get(friendly_id).mac_address)
+
+    @callback
+    def async_ingest(self, raw_devices: list) -> int:
+        """Merge pushed `/api/devices`-shaped records into the snapshot.
+
+        Only the pushed devices are compared, and only entities of devices that
+        changed are written. Devices not known yet are added. Returns the number of
+        devices that changed.
+        """
+        devices = parse_devices(raw_devices)
+        self.soc.apply(devices)
+        self.pushed_devices += len(devices)
+        now = dt_util.utcnow()
+        previous = self.data
+        if previous is None:
+            snapshot = FleetSnapshot(devices, fetched_at=now)
+        else:
+            snapshot = previous.merge(devices, fetched_at=now)
+        changed = frozenset(
+            device.friendly_id
+            for device in devices
+            if previous is None or previous.get(device.friendly_id) != snapshot.get(device.friendly_id)
+        )
+        if not changed:
+            return 0
+        self.pushed_changes += len(changed)
+        self.changed_devices = changed
+        self.fleet_diff = snapshot.diff(previous, changed)
+        updated_at = dict(self.device_updated_at)
+        for friendly_id in changed:
+            updated_at[friendly_id] = now
+        self.device_updated_at = updated_at
+        self._observe_batteries(snapshot)
+        self._evaluate_health(snapshot)
+        self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+        # Publishes to the entities and pushes the fallback poll back by an interval.
+        self.async_set_updated_data(snapshot)
+        return len(changed)
+
+    @callback
+    def async_set_client(self, client: TrmnlApiClient, extra_clients=None) -> None:
+        """Switch to new API clients (e.g. another base URL) without a reload.
+
+        `extra_clients=None` keeps the current additional endpoints.
+        """
+        self.client = client
+        if extra_clients is not None:
+            self.extra_clients = list(extra_clients)
+        self.fanout = self._build_fanout()
+        self._first_fetch = True
+        # A different server starts with a clean failure record.
+        self.breaker = CircuitBreaker()
+
+    @callback
+    def async_set_scan_interval(self, scan_interval: int) -> None:
+        """Change the polling interval and reschedule the next poll from now."""
+        self.scan_interval = timedelta(seconds=scan_interval)
+        if self.scheduler is not None:
+            self.scheduler.min_interval = self.scan_interval
+            self.scheduler.max_interval = max(self.scheduler.max_interval, self.scan_interval)
+        self.update_interval = self._fixed_interval()
+        if self._listeners:
+            self._schedule_refresh()
+
+    @callback
+    def async_set_push(self, enabled: bool) -> None:
+        """Switch between push (slow fallback polling) and normal polling."""
+        self.push_enabled = enabled
+        self.update_interval = self._fixed_interval()
+        if self._listeners:
+            self._schedule_refresh()
+
+    @callback
+    def async_set_adaptive_polling(self, enabled: bool, max_poll_interval: int) -> None:
+        """Enable or disable the adaptive scheduler, keeping learned cadences if enabled."""
+        self.max_poll_interval = timedelta(seconds=max_poll_interval)
+        if not enabled:
+            self.scheduler = None
+            self.update_interval = self._fixed_interval()
+            return
+        max_interval = timedelta(seconds=max_poll_interval)
+        if self.scheduler is None:
+            self.scheduler = AdaptivePollScheduler(self.scan_interval, max_interval)
+        else:
+            self.scheduler.max_interval = max(max_interval, self.scan_interval)
+
+    async def async_restore(self) -> bool:
+        """Publish the persisted snapshot, marked stale, without touching the network.
+
+        Returns False if nothing usable was stored.
+        """
+        try:
+            stored = await self._store.async_load()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning("Ignoring unreadable TRMNL snapshot cache: %s", err)
+            return False
+        if not stored:
+            return False
+        self.battery = FleetBatteryAnalytics.from_dict(stored.get("battery"))
+        self.soc = FleetSocCalibration.from_dict(stored.get("soc"))
+        if self.statistics is not None:
+            self.statistics = HourlyStatistics.from_dict(stored.get("statistics"))
+        if not stored.get("devices"):
+            return False
+        fetched_at = dt_util.parse_datetime(stored.get("fetched_at") or "")
+        records = parse_devices(stored["devices"])
+        self.soc.apply(records)
+        snapshot = FleetSnapshot(records, fetched_at=fetched_at)
+        self.stale = True
+        self.data = snapshot
+        # Baseline only; transitions from here on fire events.
+        self.health.evaluate(snapshot, dt_util.utcnow())
+        self.device_updated_at = dict.fromkeys(snapshot.friendly_ids, fetched_at)
+        return True
+
+    def _data_to_store(self) -> dict:
+        """Serialize the current snapshot for the store."""
+        return {
+            "fetched_at": self.data.fetched_at.isoformat() if self.data.fetched_at else None,
+            "devices": [device.as_dict() for device in self.data],
+            "battery": self.battery.as_dict(),
+            "soc": self.soc.as_dict(),
+            "statistics": self.statistics.as_dict() if self.statistics is not None else None,
+        }
@@ -0,0 +1,158 @@
+"""Decode `/api/devices` bodies into trimmed device dicts, entry by entry for large fleets."""
+import json
+import re
+
+from homeassistant.util.json import json_loads
+
+from .const import ENTRY_DECODE_MIN_BYTES
+
+# The `data` entry fields `TrmnlDevice.from_api` reads; the rest are dropped while decoding.
+DEVICE_FIELDS = (
+    "friendly_id",
+    "mac_address",
+    "name",
+    "battery_voltage",
+    "percent_charged",
+    "rssi",
+    "wifi_strength",
+    "last_ping_at",
+    "hardware_last_ping_at",
+    "sleep_mode_enabled",
+    "sleep_start_time",
+    "sleep_end_time",
+)
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# ijson's C backend, loaded with the first large body (in the executor) rather
+# than on Home Assistant's startup path: None until then, False if unavailable.
+_ijson = None
+
+
+def _trim(entry):
+    if not isinstance(entry, dict):
+        # Left for `parse_devices` to reject with a warning.
+        return entry
+    return {field: entry[field] for field in DEVICE_FIELDS if field in entry}
+
+
+def decode_devices(body: bytes) -> list:
+    """Return the `data` entries of a response body, trimmed to DEVICE_FIELDS.
+
+    Small bodies are decoded in one go (orjson through Home Assistant). Larger ones
+    are decoded one `data` entry at a time and trimmed right away, so the
+    payload's full object tree is never built: with ijson's C backend when it is
+    installed, else with the stdlib scanner (which also holds a decoded copy of
+    the body). This is not streaming: the whole body is read first and the
+    trimmed entries are returned as one list. Raises ValueError if the body is not
+    a JSON object with a `data` list.
+    """
+    if len(body) < ENTRY_DECODE_MIN_BYTES:
+        payload = json_loads(body)
+        if not isinstance(payload, dict):
+            raise ValueError("Response is not a JSON object")
+        data = payload.get("data")
+        if not isinstance(data, list):
+            raise ValueError("'data' is not a list")
+        return [_trim(entry) for entry in data]
+    return list(iter_devices(body))
+
+
+def iter_devices(body: bytes):
+    """Yield the trimmed `data` entries of a response body one at a time."""
+    if ijson_backend() is not None:
+        return _iter_ijson(body)
+    return _iter_stdlib(body)
+
+
+def ijson_backend():
+    """Return ijson's C backend, importing it on first use; None if it is not installed."""
+    global _ijson
+    if _ijson is None:
+        try:
+            import ijson
+            _ijson = ijson.get_backend("yajl2_c")
+        except (ImportError, ValueError):
+            # ijson is optional, and only its C backend beats the stdlib scanner.
+            _ijson = False
+    return _ijson or None
+
+
+def _iter_ijson(body: bytes):
+    from ijson.common import JSONError
+
+    backend = ijson_backend()
+    stripped = body.lstrip()
+    if not stripped.startswith(b"{"):
+        raise ValueError("Response is not a JSON object")
+    try:
+        # `items` yields nothing for a `data` that is missing or not a list, so look
+        # at the first event of `data` (right at the start in API responses).
+        for prefix, event, _ in backend.parse(body):
+            if prefix == "data":
+                if event != "start_array":
+                    raise ValueError("'data' is not a list")
+                break
+        else:
+            raise ValueError("'data' is not a list")
+        for entry in backend.items(body, "data.item", use_float=True):
+            yield _trim(entry)
+    except JSONError as err:
+        raise ValueError(str(err)) from err
+
+
+def _iter_stdlib(body: bytes):
+    """Walk the top-level object with `raw_decode`, one value at a time."""
+    text = body.decode("utf-8")
+    raw_decode = json.JSONDecoder().raw_decode
+    skip = _WHITESPACE.match
+    try:
+        index = skip(text, 0).end()
+        if text[index] != "{":
+            raise ValueError("Response is not a JSON object")
+        index = skip(text, index + 1).end()
+        if text[index] == "}":
+            raise ValueError("'data' is not a list")
+        seen_data = False
+        while True:
+            # A key that is not a string is malformed JSON like any other, so it is
+            # checked at the character level and raises ValueError (which the client
+            # reports as an invalid response), not TypeError.
+            if text[index] != '"':
+                raise ValueError(f"Expected an object key at offset {index}")
+            key, index = raw_decode(text, index)
+            index = skip(text, index).end()
+            if text[index] != ":":
+                raise ValueError(f"Expected ':' at offset {index}")
+            index = skip(text, index + 1).end()
+            if key != "data":
+                # Other top-level members are small; decode and drop them.
+                _, index = raw_decode(text, index)
+            elif text[index] != "[":
+                raise ValueError("'data' is not a list")
+            else:
+                seen_data = True
+                index = skip(text, index + 1).end()
+                if text[index] == "]":
+                    index += 1
+                else:
+                    while True:
+                        entry, index = raw_decode(text, index)
+                        yield _trim(entry)
+                        index = skip(text, index).end()
+                        if text[index] == "]":
+                            index += 1
+                            break
+                        if text[index] != ",":
+                            raise ValueError(f"Expected ',' or ']' at offset {index}")
+                        index = skip(text, index + 1).end()
+            index = skip(text, index).end()
+            if text[index] == "}":
+                if not seen_data:
+                    raise ValueError("'data' is not a list")
+                return
+            if text[index] != ",":
+                raise ValueError(f"Expected ',' or '}}' at offset {index}")
+            index = skip(text, index + 1).end()
+    except IndexError as err:
+        raise ValueError("Truncated JSON") from err
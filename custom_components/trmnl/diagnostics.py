@@ -0,0 +1,42 @@
+"""Diagnostics support for the TRMNL integration."""
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_API_KEY, CONF_PUSH_TOKEN, CONF_WEBHOOK_ID, DOMAIN
+
+TO_REDACT = {CONF_API_KEY, CONF_PUSH_TOKEN, CONF_WEBHOOK_ID, "mac_address"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry_data["coordinator"]
+    scheduler = coordinator.scheduler
+    return {
+        "config": async_redact_data(entry_data["config"], TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval_seconds": coordinator.update_interval.total_seconds()
+            if coordinator.update_interval else None,
+            "stale": coordinator.stale,
+            "breaker_state": coordinator.breaker.state,
+            "consecutive_failures": coordinator.breaker.consecutive_failures,
+            "failed_endpoints": sorted(coordinator.fanout.failed_endpoints),
+            "entity_writes": coordinator.entity_writes,
+            "entity_writes_skipped": coordinator.entity_writes_skipped,
+            "pushed_devices": coordinator.pushed_devices,
+            "pushed_changes": coordinator.pushed_changes,
+            "polls_avoided": scheduler.polls_avoided if scheduler is not None else None,
+            "statistics_rows": coordinator.statistics_rows if coordinator.statistics is not None else None,
+        },
+        "metrics": coordinator.metrics.as_dict(),
+        "battery_curves": coordinator.soc.summary(),
+        "endpoints": [
+            {"api_base_url": client.api_base_url, "stats": client.stats}
+            for client in coordinator.fanout.clients
+        ],
+        "devices": async_redact_data(
+            [device.as_dict() for device in coordinator.data or ()], TO_REDACT
+        ),
+    }
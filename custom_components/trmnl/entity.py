@@ -0,0 +1,190 @@
+"""Shared base entity and device bookkeeping for the TRMNL platforms."""
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import (
+    CoordinatorEntity,
+)
+
+from .const import DOMAIN
+from .profiles import EntityProfiles
+
+
+@callback
+def async_setup_device_entities(
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        coordinator,
+        async_add_entities: AddEntitiesCallback,
+        platform: str,
+        entity_types,
+):
+    """Add each device's entities and follow the fleet diffs.
+
+    `entity_types` are `(key, factory)` pairs; `factory(coordinator, device)`
+    creates the entity with unique ID `<MAC>_<key>`. Only the keys in the
+    device's entity profile are created, and registry entries left from a
+    larger profile are removed.
+    """
+    profiles = EntityProfiles.from_config(hass.data[DOMAIN][entry.entry_id]["config"])
+    entity_registry = er.async_get(hass)
+    # friendly_id -> the entities created for that device
+    device_entities = {}
+
+    @callback
+    def _async_add_devices(devices):
+        entities = []
+        for device in devices:
+            if device.friendly_id in device_entities:
+                continue
+            created = []
+            for key, factory in entity_types:
+                if profiles.includes(device.friendly_id, key):
+                    created.append(factory(coordinator, device))
+                elif entity_id := entity_registry.async_get_entity_id(
+                    platform, DOMAIN, f"{device.mac_address}_{key}"
+                ):
+                    entity_registry.async_remove(entity_id)
+            device_entities[device.friendly_id] = created
+            entities.extend(created)
+        if entities:
+            async_add_entities(entities)
+
+    @callback
+    def _async_reconcile():
+        """Add or retire only the devices in the latest fleet diff.
+
+        Renames are picked up by the entities themselves, as Home Assistant does
+        not promise to call this listener before theirs.
+        """
+        diff = coordinator.fleet_diff
+        if not diff:
+            return
+        if diff.added:
+            _async_add_devices(coordinator.data.get(friendly_id) for friendly_id in diff.added)
+        for friendly_id in diff.removed:
+            _async_remove_device(hass, entry, device_entities.pop(friendly_id, ()))
+
+    # Create entities for each device (the snapshot iterates in API order)
+    _async_add_devices(coordinator.data)
+    entry.async_on_unload(coordinator.async_add_listener(_async_reconcile))
+
+
+@callback
+def _async_remove_device(hass: HomeAssistant, entry: ConfigEntry, entities):
+    """Remove a device that left the account, with its entities."""
+    entity_registry = er.async_get(hass)
+    mac_address = None
+    for entity in entities:
+        mac_address = entity.mac_address
+        if entity.entity_id and entity_registry.async_get(entity.entity_id):
+            entity_registry.async_remove(entity.entity_id)
+    if mac_address is None:
+        return
+    device_registry = dr.async_get(hass)
+    if device_entry := device_registry.async_get_device(identifiers={(DOMAIN, mac_address)}):
+        device_registry.async_update_device(
+            device_entry.id, remove_config_entry_id=entry.entry_id
+        )
+
+
+@callback
+def _async_rename_device(hass: HomeAssistant, device):
+    """Follow a rename made in TRMNL (a name set in Home Assistant still wins)."""
+    device_registry = dr.async_get(hass)
+    device_entry = device_registry.async_get_device(identifiers={(DOMAIN, device.mac_address)})
+    if device_entry is not None and device_entry.name != device.name:
+        device_registry.async_update_device(device_entry.id, name=device.name)
+
+
+class TrmnlDeviceEntity(CoordinatorEntity):
+    """Base class for the entities of one TRMNL device."""
+
+    def __init__(self, coordinator, device):
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self.device = device
+        self._friendly_id = device.friendly_id
+        self._mac_address = device.mac_address
+        self._name = device.name
+        self._last_written_status = None
+
+    @property
+    def mac_address(self):
+        """Return the MAC address of the device this entity belongs to."""
+        return self._mac_address
+
+    @callback
+    def async_update_device_metadata(self, device):
+        """Pick up a new device name, in the entity and the device registry."""
+        self.device = device
+        self._name = device.name
+        _async_rename_device(self.hass, device)
+
+    @property
+    def device_info(self):
+        """Return device information."""
+        return {
+            "identifiers": {(DOMAIN, self._mac_address)},
+            "name": self._name,
+            "manufacturer": "TRMNL",
+            "model": "e-ink display",
+        }
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        # When Home Assistant received this device's current data, so the
+        # attribute only changes when the data does.
+        updated_at = self.coordinator.device_updated_at.get(self._friendly_id)
+        attrs = {
+            "last_updated": updated_at.isoformat() if updated_at else None
+        }
+        if self.coordinator.stale:
+            # Restored from storage; no live fetch has succeeded yet.
+            attrs["stale"] = True
+        return attrs
+
+    @property
+    def available(self):
+        """Keep restored (stale) data available while the first live fetch is outstanding or failing."""
+        return super().available or self.coordinator.stale
+
+    def _status(self):
+        """Entity-level inputs that change the written state besides the device data."""
+        return self.available, self.coordinator.stale
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the status of the initial state write."""
+        await super().async_added_to_hass()
+        self._last_written_status = self._status()
+
+    def _changed_devices(self):
+        """Devices whose data this entity shows changed in the latest refresh."""
+        return self.coordinator.changed_devices
+
+    def _significant_change(self):
+        """Return True if the device's changed data is worth a state write."""
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if this device's data, name, availability or staleness changed."""
+        renamed = self._friendly_id in self.coordinator.fleet_diff.renamed
+        if renamed:
+            self.async_update_device_metadata(self.get_device_data())
+        status = self._status()
+        if status == self._last_written_status and not renamed and (
+            self._friendly_id not in self._changed_devices() or not self._significant_change()
+        ):
+            self.coordinator.entity_writes_skipped += 1
+            return
+        self._last_written_status = status
+        self.coordinator.entity_writes += 1
+        self.async_write_ha_state()
+
+    def get_device_data(self):
+        """Get current device data from coordinator."""
+        return self.coordinator.data.get(self._friendly_id)
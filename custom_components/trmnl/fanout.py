@@ -0,0 +1,123 @@
+"""Fetch one entry's fleet from several TRMNL servers at once."""
+import asyncio
+import logging
+
+from .api import TrmnlApiClient, TrmnlApiError
+from .const import CONF_API_BASE_URL, CONF_API_KEY, CONF_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_endpoints(text: str) -> list[dict]:
+    """Parse one `<base URL> <API key> [timeout seconds]` endpoint per line.
+
+    Blank lines and lines starting with `#` are ignored. Raises ValueError naming
+    the first malformed line.
+    """
+    endpoints = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split()
+        if len(parts) not in (2, 3) or not parts[0].startswith(("http://", "https://")):
+            raise ValueError(f"Expected '<base URL> <API key> [timeout]', got {line!r}")
+        endpoint = {CONF_API_BASE_URL: parts[0].rstrip("/"), CONF_API_KEY: parts[1]}
+        if len(parts) == 3:
+            try:
+                timeout = float(parts[2])
+            except ValueError:
+                timeout = 0
+            if timeout <= 0:
+                raise ValueError(f"Invalid timeout in {line!r}")
+            endpoint[CONF_TIMEOUT] = timeout
+        endpoints.append(endpoint)
+    return endpoints
+
+
+def format_endpoints(endpoints: list[dict]) -> str:
+    """Inverse of `parse_endpoints`, for showing the saved endpoints in a form."""
+    lines = []
+    for endpoint in endpoints:
+        parts = [endpoint[CONF_API_BASE_URL], endpoint[CONF_API_KEY]]
+        if CONF_TIMEOUT in endpoint:
+            parts.append(f"{endpoint[CONF_TIMEOUT]:g}")
+        lines.append(" ".join(parts))
+    return "\n".join(lines)
+
+
+async def _default_fetch(client: TrmnlApiClient, conditional: bool):
+    return await client.get_devices(conditional=conditional)
+
+
+class TrmnlEndpointFanout:
+    """Fetch every endpoint concurrently and merge the results, deduplicated by MAC.
+
+    Each client enforces its own timeout, so a cycle takes as long as the slowest
+    endpoint that answers (or its timeout), never the sum. A failing endpoint does
+    not fail the cycle: its last good device list is kept until it recovers. Only
+    when every endpoint fails is the first error raised. The first endpoint (the
+    entry's own API base URL) wins when two servers report the same MAC address.
+    """
+
+    def __init__(self, clients: list[TrmnlApiClient]):
+        """Initialize the fan-out; `clients[0]` is the primary endpoint."""
+        self.clients = clients
+        self._latest = [None] * len(clients)
+        # Base URLs whose latest fetch failed.
+        self.failed_endpoints = set()
+
+    async def get_devices(self, conditional: bool = False, fetch=_default_fetch):
+        """Return the merged raw device list, or None if no endpoint returned anything new.
+
+        `fetch(client, conditional)` performs one endpoint's request.
+        """
+        results = await asyncio.gather(
+            *(
+                fetch(client, conditional and latest is not None)
+                for client, latest in zip(self.clients, self._latest, strict=True)
+            ),
+            return_exceptions=True,
+        )
+        changed = False
+        errors = []
+        for index, (client, result) in enumerate(zip(self.clients, results, strict=True)):
+            if isinstance(result, BaseException):
+                if not isinstance(result, TrmnlApiError):
+                    raise result
+                errors.append(result)
+                if client.api_base_url not in self.failed_endpoints and len(self.clients) > 1:
+                    _LOGGER.warning(
+                        "TRMNL endpoint %s failed (%s); keeping its last known devices",
+                        client.api_base_url, result,
+                    )
+                self.failed_endpoints.add(client.api_base_url)
+                continue
+            if client.api_base_url in self.failed_endpoints:
+                self.failed_endpoints.discard(client.api_base_url)
+                _LOGGER.info("TRMNL endpoint %s reachable again", client.api_base_url)
+            if result is not None:
+                self._latest[index] = result
+                changed = True
+
+        if len(errors) == len(self.clients):
+            raise errors[0]
+        if not changed:
+            return None
+        if len(self.clients) == 1:
+            return self._latest[0]
+        return self._merge()
+
+    def _merge(self) -> list:
+        devices = []
+        seen_macs = set()
+        for latest in self._latest:
+            for entry in latest or ():
+                mac_address = entry.get("mac_address") if isinstance(entry, dict) else None
+                if mac_address:
+                    mac_address = mac_address.upper()
+                    if mac_address in seen_macs:
+                        continue
+                    seen_macs.add(mac_address)
+                devices.append(entry)
+        return devices
@@ -0,0 +1,179 @@
+"""Fleet-wide problem detection with hysteresis, evaluated once per refresh."""
+import heapq
+from datetime import datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+from .const import BATTERY_HYSTERESIS, OFFLINE_MISSED_CHECKINS, SIGNAL_HYSTERESIS
+from .scheduler import DeviceCadence, in_sleep_window
+
+LOW_BATTERY = "low_battery"
+WEAK_SIGNAL = "weak_signal"
+OFFLINE = "offline"
+PROBLEMS = (LOW_BATTERY, WEAK_SIGNAL, OFFLINE)
+
+_NONE = frozenset()
+
+
+def offline_deadline(device, offline_after: timedelta, cadence: timedelta | None = None):
+    """Return when the device counts as offline if it does not check in again.
+
+    That is `offline_after` after the last check-in, or OFFLINE_MISSED_CHECKINS
+    check-ins of the device's `cadence` if that is longer. A device in sleep mode
+    is not expected to check in during its sleep window, so a deadline falling
+    inside the window moves to `offline_after` after the window ends.
+    """
+    if device.last_ping_at is None:
+        return None
+    if cadence is not None:
+        offline_after = max(offline_after, OFFLINE_MISSED_CHECKINS * cadence)
+    deadline = device.last_ping_at + offline_after
+    start, end = device.sleep_start_time, device.sleep_end_time
+    if not device.sleep_mode_enabled or start is None or end is None:
+        return deadline
+    local = dt_util.as_local(deadline)
+    if not in_sleep_window(local.hour * 60 + local.minute, start, end):
+        return deadline
+    wake = local.replace(hour=end // 60 % 24, minute=end % 60, second=0, microsecond=0)
+    if wake <= local:
+        wake += timedelta(days=1)
+    return dt_util.as_utc(wake) + offline_after
+
+
+class FleetHealth:
+    """Per-device problem flags and fleet aggregates for one config entry.
+
+    `evaluate()` makes one pass over the snapshot. A flag turns on at its
+    threshold and only turns off once the value has recovered past the
+    hysteresis margin, so readings hovering at the threshold do not flap.
+
+    Between refreshes, the offline deadlines of the devices still online sit in
+    a min-heap; `next_deadline` is the earliest and `expire()` flags the devices
+    whose deadline passed, O(log N) each. Entries superseded by a newer deadline
+    are skipped when they reach the top.
+    """
+
+    def __init__(self, low_battery: int, weak_signal: int, offline_after: int):
+        """Initialize with thresholds in percent, dBm and seconds."""
+        self.set_thresholds(low_battery, weak_signal, offline_after)
+        # friendly_id -> frozenset of active problems
+        self.problems = {}
+        # Devices whose flags changed in the latest evaluation.
+        self.changed = frozenset()
+        self.low_battery_count = 0
+        self.weak_signal_count = 0
+        self.offline_count = 0
+        self.min_battery = None
+        self._evaluated = False
+        self._snapshot = None
+        # friendly_id -> check-in cadence tracker
+        self._cadence = {}
+        # friendly_id -> offline deadline, for devices not offline yet
+        self.deadlines = {}
+        self._heap = []
+
+    def set_thresholds(self, low_battery: int, weak_signal: int, offline_after: int) -> None:
+        """Change the thresholds; they apply from the next evaluation."""
+        self.low_battery = low_battery
+        self.weak_signal = weak_signal
+        self.offline_after = timedelta(seconds=offline_after)
+
+    def evaluate(self, snapshot, now: datetime) -> list:
+        """Re-evaluate every device; return the (device, problem, active) transitions.
+
+        The first evaluation only establishes the baseline and returns none.
+        """
+        low_on = self.low_battery
+        low_off = low_on + BATTERY_HYSTERESIS
+        weak_on = self.weak_signal
+        weak_off = weak_on + SIGNAL_HYSTERESIS
+        offline_after = self.offline_after
+        previous_problems = self.problems
+        previous_deadlines = self.deadlines
+        previous_cadence = self._cadence
+        heap = self._heap
+        problems = {}
+        deadlines = {}
+        cadence = {}
+        changed = set()
+        transitions = []
+        low_count = weak_count = offline_count = 0
+        min_battery = None
+        for device in snapshot or ():
+            previous = previous_problems.get(device.friendly_id, _NONE)
+            active = set()
+            percentage = device.battery_percentage
+            if percentage is not None:
+                if min_battery is None or percentage < min_battery:
+                    min_battery = percentage
+                if percentage <= low_on or (LOW_BATTERY in previous and percentage <= low_off):
+                    active.add(LOW_BATTERY)
+                    low_count += 1
+            rssi = device.rssi
+            if rssi is not None and (rssi <= weak_on or (WEAK_SIGNAL in previous and rssi <= weak_off)):
+                active.add(WEAK_SIGNAL)
+                weak_count += 1
+            tracker = previous_cadence.get(device.friendly_id) or DeviceCadence()
+            tracker.observe(device.last_ping_at)
+            cadence[device.friendly_id] = tracker
+            deadline = offline_deadline(device, offline_after, tracker.interval)
+            if deadline is not None and now >= deadline:
+                active.add(OFFLINE)
+                offline_count += 1
+            elif deadline is not None:
+                deadlines[device.friendly_id] = deadline
+                if previous_deadlines.get(device.friendly_id) != deadline:
+                    heapq.heappush(heap, (deadline, device.friendly_id))
+            active = frozenset(active) if active else _NONE
+            problems[device.friendly_id] = active
+            if active != previous:
+                changed.add(device.friendly_id)
+                if self._evaluated:
+                    transitions.extend(
+                        (device, problem, problem in active) for problem in PROBLEMS
+                        if (problem in active) != (problem in previous)
+                    )
+        self.problems = problems
+        self.deadlines = deadlines
+        self._cadence = cadence
+        self._snapshot = snapshot
+        if len(heap) > 2 * len(deadlines) + 16:
+            # Mostly superseded entries: rebuild from the live deadlines.
+            self._heap = [(deadline, friendly_id) for friendly_id, deadline in deadlines.items()]
+            heapq.heapify(self._heap)
+        self.changed = frozenset(changed)
+        self.low_battery_count = low_count
+        self.weak_signal_count = weak_count
+        self.offline_count = offline_count
+        self.min_battery = min_battery
+        self._evaluated = True
+        return transitions
+
+    @property
+    def next_deadline(self):
+        """The earliest offline deadline of a device still online, or None."""
+        heap = self._heap
+        while heap and self.deadlines.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def expire(self, now: datetime) -> list:
+        """Flag the devices whose deadline passed as offline; return the transitions."""
+        heap = self._heap
+        changed = set()
+        transitions = []
+        while heap and heap[0][0] <= now:
+            deadline, friendly_id = heapq.heappop(heap)
+            if self.deadlines.get(friendly_id) != deadline:
+                continue
+            del self.deadlines[friendly_id]
+            self.problems[friendly_id] = self.problems.get(friendly_id, _NONE) | {OFFLINE}
+            self.offline_count += 1
+            changed.add(friendly_id)
+            transitions.append((self._snapshot.get(friendly_id), OFFLINE, True))
+        self.changed = frozenset(changed)
+        return transitions
+
+    def is_active(self, friendly_id: str, problem: str) -> bool:
+        """Return True if `problem` is flagged for the device."""
+        return problem in self.problems.get(friendly_id, _NONE)
@@ -0,0 +1,69 @@
+"""Bounded rolling measurements of the update pipeline, per config entry."""
+from collections import deque
+
+# Samples kept per metric; older samples fall off.
+HISTORY_SIZE = 100
+
+NETWORK_SECONDS = "network_seconds"
+BYTES_RECEIVED = "bytes_received"
+DECODE_SECONDS = "decode_seconds"
+SNAPSHOT_SECONDS = "snapshot_seconds"
+REFRESH_SECONDS = "refresh_seconds"
+
+
+class RollingHistogram:
+    """The last `size` samples of one measurement; O(1) to record."""
+
+    __slots__ = ("count", "samples")
+
+    def __init__(self, size: int = HISTORY_SIZE):
+        self.samples = deque(maxlen=size)
+        # Samples ever recorded, including those that fell off.
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.samples.append(value)
+        self.count += 1
+
+    @property
+    def last(self):
+        return self.samples[-1] if self.samples else None
+
+    def summary(self) -> dict:
+        """Return count, last, min, mean, p50, p95 and max over the kept samples."""
+        if not self.samples:
+            return {"count": self.count}
+        ordered = sorted(self.samples)
+        size = len(ordered)
+        return {
+            "count": self.count,
+            "last": self.samples[-1],
+            "min": ordered[0],
+            "mean": sum(ordered) / size,
+            "p50": ordered[size // 2],
+            "p95": ordered[min(int(size * 0.95), size - 1)],
+            "max": ordered[-1],
+        }
+
+
+class EntryMetrics:
+    """Rolling histograms for one config entry, filled by its clients and coordinator."""
+
+    def __init__(self, size: int = HISTORY_SIZE):
+        """Initialize an empty histogram per metric."""
+        self.histograms = {
+            name: RollingHistogram(size)
+            for name in (NETWORK_SECONDS, BYTES_RECEIVED, DECODE_SECONDS, SNAPSHOT_SECONDS, REFRESH_SECONDS)
+        }
+
+    def add(self, name: str, value: float) -> None:
+        """Record one sample."""
+        self.histograms[name].add(value)
+
+    def last(self, name: str):
+        """Return the latest sample of `name`, or None."""
+        return self.histograms[name].last
+
+    def as_dict(self) -> dict:
+        """Summaries of every metric."""
+        return {name: histogram.summary() for name, histogram in self.histograms.items()}
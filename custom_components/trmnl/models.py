@@ -0,0 +1,287 @@
+"""Data models for the TRMNL integration."""
+import logging
+from datetime import datetime
+from types import MappingProxyType
+
+from homeassistant.util import dt as dt_util
+
+from .soc import DEFAULT_SOC_CURVE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def calculate_battery_percentage(voltage):
+    """Estimate battery percentage from voltage via the LiPo curve (fallback for percent_charged)."""
+    return DEFAULT_SOC_CURVE.percentage(voltage)
+
+
+def _to_float(raw, field, friendly_id):
+    """Convert a numeric payload field, logging and returning None if it is malformed."""
+    if raw is None:
+        return None
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        _LOGGER.warning("Ignoring malformed '%s' value %r for device %s", field, raw, friendly_id)
+        return None
+
+
+def _to_int(raw, field, friendly_id):
+    value = _to_float(raw, field, friendly_id)
+    return None if value is None else round(value)
+
+
+class TrmnlDevice:
+    """One device from `/api/devices`, converted once per poll.
+
+    Only the fields the integration uses are kept. Numbers are already floats/ints, the
+    timestamp is parsed, and the derived battery percentage and WiFi quality are
+    computed here so entity state reads are plain attribute access.
+    """
+
+    __slots__ = (
+        "battery_percentage",
+        "battery_voltage",
+        "friendly_id",
+        "hardware_last_ping_at",
+        "last_ping_at",
+        "last_ping_iso",
+        "mac_address",
+        "name",
+        "percent_charged",
+        "rssi",
+        "sleep_end_time",
+        "sleep_mode_enabled",
+        "sleep_start_time",
+        "wifi_strength",
+    )
+
+    def __init__(
+        self,
+        friendly_id,
+        mac_address,
+        name,
+        battery_voltage=None,
+        percent_charged=None,
+        rssi=None,
+        wifi_strength=None,
+        last_ping_at=None,
+        hardware_last_ping_at=None,
+        sleep_mode_enabled=False,
+        sleep_start_time=None,
+        sleep_end_time=None,
+    ):
+        """Initialize the record and derive the computed fields."""
+        self.friendly_id = friendly_id
+        self.mac_address = mac_address
+        self.name = name
+        self.battery_voltage = battery_voltage
+        self.percent_charged = percent_charged
+        self.rssi = rssi
+        self.last_ping_at = last_ping_at
+        self.last_ping_iso = last_ping_at.isoformat() if last_ping_at else None
+        self.hardware_last_ping_at = hardware_last_ping_at
+        # Sleep window in minutes after local midnight; may wrap past midnight.
+        self.sleep_mode_enabled = sleep_mode_enabled
+        self.sleep_start_time = sleep_start_time
+        self.sleep_end_time = sleep_end_time
+
+        # Prefer the device's own state-of-charge estimate (`percent_charged`)
+        # returned by the TRMNL API. Deriving the percentage from `battery_voltage`
+        # is unreliable: LiPo voltage is highly non-linear with charge, and the
+        # reported voltage swings outside the 3.0-4.2 V window (e.g. it reads
+        # ~4.7 V while charging). Fall back to the LiPo curve only if it is missing;
+        # the coordinator swaps in a calibrated curve once it has one (see soc.py).
+        if percent_charged is not None:
+            self.battery_percentage = round(percent_charged)
+        elif battery_voltage is not None:
+            self.battery_percentage = calculate_battery_percentage(battery_voltage)
+        else:
+            self.battery_percentage = None
+
+        # Older firmware omits `wifi_strength`; approximate it from RSSI
+        # (-100 dBm = 0%, -50 dBm = 100%) so the WiFi Signal sensor still has a value.
+        if wifi_strength is None and rssi is not None:
+            wifi_strength = min(max(2 * (rssi + 100), 0), 100)
+        self.wifi_strength = wifi_strength
+
+    def __eq__(self, other):
+        """Records are equal when every kept field is equal (used to diff polls)."""
+        if not isinstance(other, TrmnlDevice):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    __hash__ = None
+
+    def as_dict(self):
+        """Return the record in `/api/devices` shape, for persisting and restoring."""
+        return {
+            "friendly_id": self.friendly_id,
+            "mac_address": self.mac_address,
+            "name": self.name,
+            "battery_voltage": self.battery_voltage,
+            "percent_charged": self.percent_charged,
+            "rssi": self.rssi,
+            "wifi_strength": self.wifi_strength,
+            "last_ping_at": self.last_ping_iso,
+            "hardware_last_ping_at": self.hardware_last_ping_at,
+            "sleep_mode_enabled": self.sleep_mode_enabled,
+            "sleep_start_time": self.sleep_start_time,
+            "sleep_end_time": self.sleep_end_time,
+        }
+
+    @classmethod
+    def from_api(cls, data):
+        """Build a record from a raw `/api/devices` entry.
+
+        Raises ValueError if the entry lacks the identifiers the entities key on.
+        """
+        try:
+            friendly_id = data["friendly_id"]
+            mac_address = data["mac_address"]
+        except (KeyError, TypeError) as err:
+            raise ValueError(f"Device entry is missing {err}") from err
+        if not friendly_id or not mac_address:
+            raise ValueError("Device entry has an empty friendly_id or mac_address")
+
+        last_ping_at = None
+        last_ping = data.get("last_ping_at")
+        if last_ping:
+            try:
+                # The API sends ISO 8601 with a trailing "Z", which the C parser handles.
+                parsed = datetime.fromisoformat(last_ping)
+            except (TypeError, ValueError):
+                parsed = dt_util.parse_datetime(last_ping) if isinstance(last_ping, str) else None
+            if parsed is None:
+                _LOGGER.warning(
+                    "Failed to parse 'last_ping_at' timestamp '%s' for device %s",
+                    last_ping, friendly_id,
+                )
+            else:
+                last_ping_at = dt_util.as_utc(parsed)
+
+        return cls(
+            friendly_id=friendly_id,
+            mac_address=mac_address,
+            name=data.get("name") or friendly_id,
+            battery_voltage=_to_float(data.get("battery_voltage"), "battery_voltage", friendly_id),
+            percent_charged=_to_float(data.get("percent_charged"), "percent_charged", friendly_id),
+            rssi=_to_int(data.get("rssi"), "rssi", friendly_id),
+            wifi_strength=_to_int(data.get("wifi_strength"), "wifi_strength", friendly_id),
+            last_ping_at=last_ping_at,
+            hardware_last_ping_at=data.get("hardware_last_ping_at"),
+            sleep_mode_enabled=bool(data.get("sleep_mode_enabled")),
+            sleep_start_time=_to_int(data.get("sleep_start_time"), "sleep_start_time", friendly_id),
+            sleep_end_time=_to_int(data.get("sleep_end_time"), "sleep_end_time", friendly_id),
+        )
+
+
+def parse_devices(raw_devices):
+    """Convert the `/api/devices` `data` list into records, skipping malformed entries."""
+    devices = []
+    for raw in raw_devices:
+        try:
+            devices.append(TrmnlDevice.from_api(raw))
+        except ValueError as err:
+            _LOGGER.warning("Skipping malformed TRMNL device entry: %s", err)
+    return devices
+
+
+class FleetDiff:
+    """Devices added, removed or renamed between two consecutive snapshots."""
+
+    __slots__ = ("added", "removed", "renamed")
+
+    def __init__(self, added=frozenset(), removed=frozenset(), renamed=frozenset()):
+        """Initialize the diff from sets of friendly_ids."""
+        self.added = added
+        self.removed = removed
+        self.renamed = renamed
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.renamed)
+
+
+class FleetSnapshot:
+    """Immutable, indexed view of one `/api/devices` response.
+
+    Built once per coordinator refresh so entities resolve their device with a dict
+    lookup instead of scanning the whole device list on every state read.
+    """
+
+    __slots__ = ("by_friendly_id", "by_mac", "devices", "fetched_at", "friendly_ids")
+
+    def __init__(self, devices, fetched_at=None):
+        """Index the devices by `friendly_id` and MAC address, keeping API order."""
+        devices = tuple(devices)
+        by_friendly_id = {}
+        by_mac = {}
+        for device in devices:
+            by_friendly_id[device.friendly_id] = device
+            by_mac[device.mac_address] = device
+        object.__setattr__(self, "devices", devices)
+        object.__setattr__(self, "friendly_ids", tuple(by_friendly_id))
+        object.__setattr__(self, "by_friendly_id", MappingProxyType(by_friendly_id))
+        object.__setattr__(self, "by_mac", MappingProxyType(by_mac))
+        object.__setattr__(self, "fetched_at", fetched_at)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FleetSnapshot is immutable")
+
+    def __iter__(self):
+        """Iterate over the devices in API order."""
+        return iter(self.devices)
+
+    def __len__(self):
+        return len(self.devices)
+
+    def __contains__(self, friendly_id):
+        return friendly_id in self.by_friendly_id
+
+    def get(self, friendly_id, default=None):
+        """Return the device with the given `friendly_id`."""
+        return self.by_friendly_id.get(friendly_id, default)
+
+    def get_by_mac(self, mac_address, default=None):
+        """Return the device with the given MAC address."""
+        return self.by_mac.get(mac_address, default)
+
+    def merge(self, devices, fetched_at=None):
+        """Return a snapshot with `devices` replacing their records here (or appended if new)."""
+        updates = {device.friendly_id: device for device in devices}
+        merged = [updates.pop(device.friendly_id, device) for device in self.devices]
+        merged.extend(updates.values())
+        return FleetSnapshot(merged, fetched_at=fetched_at or self.fetched_at)
+
+    def changed_since(self, previous):
+        """Return the friendly_ids whose record differs from `previous` (or is new)."""
+        if previous is None:
+            return frozenset(self.by_friendly_id)
+        old = previous.by_friendly_id
+        return frozenset(
+            friendly_id
+            for friendly_id, device in self.by_friendly_id.items()
+            if old.get(friendly_id) != device
+        )
+
+    def diff(self, previous, changed):
+        """Return the membership/metadata diff against `previous`.
+
+        `changed` is the result of `changed_since(previous)`; renames can only be
+        among those devices, so only they are inspected.
+        """
+        if previous is None:
+            return FleetDiff(added=frozenset(self.by_friendly_id))
+        old = previous.by_friendly_id
+        new = self.by_friendly_id
+        added = frozenset(friendly_id for friendly_id in changed if friendly_id not in old)
+        removed = frozenset()
+        if len(new) != len(old) + len(added):
+            # Only pay for the full set difference when something actually left.
+            removed = frozenset(old.keys() - new.keys())
+        renamed = frozenset(
+            friendly_id
+            for friendly_id in changed
+            if friendly_id in old and old[friendly_id].name != new[friendly_id].name
+        )
+        return FleetDiff(added, removed, renamed)
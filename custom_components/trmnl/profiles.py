@@ -0,0 +1,67 @@
+"""Entity profiles: which of its entities each device gets."""
+from .const import (
+    CONF_DEVICE_PROFILES,
+    CONF_ENTITY_PROFILE,
+    DEFAULT_ENTITY_PROFILE,
+    PROFILE_FULL,
+    PROFILE_MINIMAL,
+    PROFILE_STANDARD,
+)
+
+# Entity keys (the unique ID after the device's MAC address) per profile; None is all.
+PROFILES = {
+    PROFILE_MINIMAL: frozenset({"battery_percentage"}),
+    PROFILE_STANDARD: frozenset(
+        {"battery_percentage", "rssi", "last_ping", "battery_empty", "low_battery", "offline"}
+    ),
+    PROFILE_FULL: None,
+}
+
+
+def parse_device_profiles(text: str) -> dict:
+    """Parse one `<friendly ID> <profile>` override per line.
+
+    Blank lines and lines starting with `#` are ignored. Raises ValueError naming
+    the first malformed line.
+    """
+    overrides = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split()
+        if len(parts) != 2 or parts[1].lower() not in PROFILES:
+            raise ValueError(f"Expected '<friendly ID> <{'|'.join(PROFILES)}>', got {line!r}")
+        overrides[parts[0].upper()] = parts[1].lower()
+    return overrides
+
+
+def format_device_profiles(overrides: dict) -> str:
+    """Inverse of `parse_device_profiles`, for showing the saved overrides in a form."""
+    return "\n".join(f"{friendly_id} {profile}" for friendly_id, profile in overrides.items())
+
+
+class EntityProfiles:
+    """The entry's default profile plus per-device overrides."""
+
+    def __init__(self, default: str = DEFAULT_ENTITY_PROFILE, overrides: dict | None = None):
+        """Initialize with a profile name and friendly_id -> profile name overrides."""
+        self.default = default
+        self.overrides = overrides or {}
+
+    @classmethod
+    def from_config(cls, config: dict) -> "EntityProfiles":
+        """Read the profiles from the entry's effective configuration."""
+        return cls(
+            config.get(CONF_ENTITY_PROFILE, DEFAULT_ENTITY_PROFILE),
+            config.get(CONF_DEVICE_PROFILES),
+        )
+
+    def profile(self, friendly_id: str) -> str:
+        """Return the profile name that applies to the device."""
+        return self.overrides.get(friendly_id, self.default)
+
+    def includes(self, friendly_id: str, key: str) -> bool:
+        """Return True if the device's profile has the entity `key`."""
+        keys = PROFILES[self.profile(friendly_id)]
+        return keys is None or key in keys
@@ -0,0 +1,56 @@
+"""Webhook receiver for device updates pushed by a (self-hosted) TRMNL server."""
+import hmac
+import logging
+from http import HTTPStatus
+
+from aiohttp import web
+from homeassistant.components import webhook
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.json import json_loads
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _devices_from_payload(payload) -> list | None:
+    """Accept `{"data": [...]}`, `{"data": {...}}`, a list of devices or one device."""
+    if isinstance(payload, dict) and "data" in payload:
+        payload = payload["data"]
+    if isinstance(payload, dict):
+        return [payload]
+    if isinstance(payload, list):
+        return payload
+    return None
+
+
+@callback
+def async_register_push(hass: HomeAssistant, entry_id: str, webhook_id: str, token: str) -> None:
+    """Register the entry's webhook; requests must carry `Authorization: Bearer <token>`."""
+    expected = f"Bearer {token}".encode()
+
+    async def handle_push(hass: HomeAssistant, webhook_id: str, request: web.Request) -> web.Response:
+        if not hmac.compare_digest(request.headers.get("Authorization", "").encode(), expected):
+            _LOGGER.warning("Rejected TRMNL push with a missing or wrong token from %s", request.remote)
+            return web.Response(status=HTTPStatus.UNAUTHORIZED)
+        try:
+            devices = _devices_from_payload(json_loads(await request.read()))
+        except ValueError:
+            devices = None
+        if not devices:
+            return web.Response(status=HTTPStatus.BAD_REQUEST, text="Expected device data")
+        entry_data = hass.data[DOMAIN].get(entry_id)
+        if entry_data is None:
+            return web.Response(status=HTTPStatus.SERVICE_UNAVAILABLE)
+        changed = entry_data["coordinator"].async_ingest(devices)
+        return web.json_response({"received": len(devices), "changed": changed})
+
+    webhook.async_register(
+        hass, DOMAIN, "TRMNL push", webhook_id, handle_push, allowed_methods=["POST"]
+    )
+
+
+@callback
+def async_unregister_push(hass: HomeAssistant, webhook_id: str) -> None:
+    """Remove the entry's webhook."""
+    webhook.async_unregister(hass, webhook_id)
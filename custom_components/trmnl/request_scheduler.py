@@ -0,0 +1,184 @@
+"""Domain-wide coordination of requests to TRMNL servers.
+
+Every config entry polls on its own, so several accounts on the same server would
+otherwise start together at boot and stay in lock-step on the default interval. The
+scheduler spreads the entries' polls over the interval, limits concurrency and
+request rate per server, and gives each server a connection pool of its own.
+"""
+import asyncio
+import math
+import time
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiohttp.hdrs import USER_AGENT
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util.ssl import client_context
+
+from .api import TrmnlApiClient
+from .const import (
+    DATA_REQUEST_SCHEDULER,
+    HOST_MAX_CONCURRENT_REQUESTS,
+    HOST_RATE_LIMIT,
+    HOST_RATE_PERIOD,
+    REQUEST_TIMEOUT,
+    STARTUP_STAGGER,
+)
+
+
+class HostLimiter:
+    """Concurrency cap plus token-bucket rate budget for one server."""
+
+    def __init__(
+        self,
+        max_concurrent: int = HOST_MAX_CONCURRENT_REQUESTS,
+        rate: int = HOST_RATE_LIMIT,
+        period: float = HOST_RATE_PERIOD,
+        clock=time.monotonic,
+    ):
+        """Initialize the limiter with a full bucket."""
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._capacity = rate
+        self._refill_per_second = rate / period
+        self._tokens = float(rate)
+        self._clock = clock
+        self._updated = clock()
+        # Requests that had to wait for a token (the budget was exhausted).
+        self.throttled = 0
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        try:
+            while (wait := self._take_token()) > 0:
+                self.throttled += 1
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+    def _take_token(self) -> float:
+        """Take a token and return 0, or return how long until one is available."""
+        now = self._clock()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._refill_per_second)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self._refill_per_second
+
+
+class TrmnlRequestScheduler:
+    """Poll slots per config entry, and a limiter and session per server."""
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._entries = []
+        self._limiters = {}
+        self._sessions = {}
+
+    @staticmethod
+    def _host_key(base_url: str) -> str:
+        parts = urlsplit(base_url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def limiter(self, base_url: str) -> HostLimiter:
+        """Return the limiter shared by every entry talking to this server."""
+        key = self._host_key(base_url)
+        if key not in self._limiters:
+            self._limiters[key] = HostLimiter()
+        return self._limiters[key]
+
+    def session(self, base_url: str) -> aiohttp.ClientSession:
+        """Return the connection pool shared by every entry talking to this server.
+
+        Each server gets a connector of its own, holding at most as many connections
+        as its limiter lets requests run at once, so they stay warm between polls
+        instead of competing with the rest of Home Assistant's pool.
+        """
+        key = self._host_key(base_url)
+        if key not in self._sessions:
+            if not self._sessions:
+                self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self._async_close_sessions)
+            # Kept across entry unloads: the other entries on this server still use it.
+            self._sessions[key] = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=HOST_MAX_CONCURRENT_REQUESTS, ssl=client_context()
+                ),
+                headers={USER_AGENT: SERVER_SOFTWARE},
+            )
+        return self._sessions[key]
+
+    async def _async_close_sessions(self, _event: Event) -> None:
+        """Close the servers' connection pools when Home Assistant shuts down."""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        await asyncio.gather(*(session.close() for session in sessions))
+
+    @callback
+    def async_register(self, entry_id: str) -> None:
+        """Give an entry a poll slot; slots are re-spread whenever entries change."""
+        if entry_id not in self._entries:
+            self._entries.append(entry_id)
+
+    @callback
+    def async_unregister(self, entry_id: str) -> None:
+        """Release the entry's poll slot."""
+        if entry_id in self._entries:
+            self._entries.remove(entry_id)
+
+    def startup_delay(self, entry_id: str) -> float:
+        """Seconds an entry should wait before its first background refresh."""
+        if entry_id not in self._entries:
+            return 0.0
+        return self._entries.index(entry_id) * STARTUP_STAGGER
+
+    def next_poll_delay(self, entry_id: str, interval: timedelta, now: float | None = None) -> timedelta:
+        """Return the delay until the entry's next poll slot.
+
+        Entry i of n polls at offset i/n of its interval (on the wall clock, so slots
+        do not drift), and the delay stays within half an interval of `interval` so
+        a re-spread never makes an entry poll much more or less often.
+        """
+        if entry_id not in self._entries:
+            return interval
+        seconds = interval.total_seconds()
+        offset = seconds * self._entries.index(entry_id) / len(self._entries)
+        now = time.time() if now is None else now
+        next_slot = math.ceil((now - offset) / seconds) * seconds + offset
+        delay = next_slot - now
+        if delay < seconds / 2:
+            delay += seconds
+        elif delay > seconds * 1.5:
+            delay -= seconds
+        return timedelta(seconds=delay)
+
+
+@callback
+def async_get_request_scheduler(hass: HomeAssistant) -> TrmnlRequestScheduler:
+    """Return the integration-wide request scheduler, creating it on first use."""
+    if DATA_REQUEST_SCHEDULER not in hass.data:
+        hass.data[DATA_REQUEST_SCHEDULER] = TrmnlRequestScheduler(hass)
+    return hass.data[DATA_REQUEST_SCHEDULER]
+
+
+@callback
+def async_create_client(
+    hass: HomeAssistant, api_key: str, base_url: str, timeout: float = REQUEST_TIMEOUT
+) -> TrmnlApiClient:
+    """Create an API client on the server's shared session and limiter."""
+    scheduler = async_get_request_scheduler(hass)
+    return TrmnlApiClient(
+        scheduler.session(base_url),
+        api_key,
+        base_url,
+        timeout=timeout,
+        limiter=scheduler.limiter(base_url),
+    )
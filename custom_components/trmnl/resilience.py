@@ -0,0 +1,128 @@
+"""Retry and circuit-breaker helpers for fetching from the TRMNL API."""
+import asyncio
+import logging
+import random
+import time
+
+from .api import TrmnlApiConnectionError, TrmnlApiRateLimitError
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_RESET_TIMEOUT,
+    BREAKER_RESET_TIMEOUT,
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def decorrelated_jitter(previous: float, base: float = RETRY_BASE_DELAY, cap: float = RETRY_MAX_DELAY) -> float:
+    """Return the next backoff delay ("decorrelated jitter": uniform in [base, 3 * previous])."""
+    return min(cap, random.uniform(base, max(base, previous * 3)))
+
+
+async def fetch_with_retry(fetch, attempts: int = RETRY_ATTEMPTS, sleep=asyncio.sleep):
+    """Await `fetch()` up to `attempts` times, backing off between transient failures.
+
+    Only connection-level failures (timeouts, 5xx, 429) are retried; authentication
+    and payload errors are raised at once. A Retry-After longer than the backoff cap
+    is not waited out here: the error is raised so the circuit breaker can hold off
+    for that long instead.
+    """
+    delay = RETRY_BASE_DELAY
+    for attempt in range(1, attempts + 1):
+        try:
+            return await fetch()
+        except TrmnlApiConnectionError as err:
+            if attempt == attempts:
+                raise
+            delay = decorrelated_jitter(delay)
+            if isinstance(err, TrmnlApiRateLimitError) and err.retry_after is not None:
+                if err.retry_after > RETRY_MAX_DELAY:
+                    raise
+                delay = max(delay, err.retry_after)
+            _LOGGER.debug("TRMNL fetch attempt %s failed (%s); retrying in %.1f s", attempt, err, delay)
+            await sleep(delay)
+    raise AssertionError("unreachable")
+
+
+class CircuitBreaker:
+    """Stop calling a failing API and probe it again after a cool-down.
+
+    closed: requests flow; consecutive failures are counted.
+    open: requests are refused until the cool-down ends (doubling on every failed probe).
+    half-open: exactly one probe request is allowed; success closes the breaker.
+
+    A Retry-After only holds requests off for that long; it opens the breaker no
+    sooner than any other failure does.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+        max_reset_timeout: float = BREAKER_MAX_RESET_TIMEOUT,
+        clock=time.monotonic,
+    ):
+        """Initialize the breaker in the closed state."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._clock = clock
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._cooldown = reset_timeout
+        self._open_until = 0.0
+        # Set from a Retry-After; no request before this, whatever the state.
+        self._retry_at = 0.0
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be made now (moving open -> half-open when due)."""
+        if self._clock() < self._retry_at:
+            return False
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and self._clock() >= self._open_until:
+            self.state = self.HALF_OPEN
+            return True
+        # Open and cooling down, or half-open with the probe already in flight.
+        return False
+
+    @property
+    def holding_off(self) -> bool:
+        """True while a Retry-After from the server has not passed yet."""
+        return self._clock() < self._retry_at
+
+    @property
+    def probing(self) -> bool:
+        """True while the single half-open probe is outstanding."""
+        return self.state == self.HALF_OPEN
+
+    def record_success(self) -> None:
+        """Close the breaker and reset the failure count."""
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._cooldown = self.reset_timeout
+
+    def record_failure(self, retry_after: float | None = None) -> None:
+        """Count a transport or server failure; trip (or re-open after a failed probe) when due.
+
+        `retry_after` (seconds) holds requests off for that long either way.
+        """
+        self.consecutive_failures += 1
+        if retry_after:
+            self._retry_at = self._clock() + retry_after
+        if self.state == self.HALF_OPEN:
+            self._cooldown = min(self._cooldown * 2, self.max_reset_timeout)
+            self._open(retry_after)
+        elif self.consecutive_failures >= self.failure_threshold:
+            self._open(retry_after)
+
+    def _open(self, retry_after: float | None) -> None:
+        self.state = self.OPEN
+        self._open_until = self._clock() + max(self._cooldown, retry_after or 0)
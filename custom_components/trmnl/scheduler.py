@@ -0,0 +1,109 @@
+"""Adaptive polling schedule for the TRMNL coordinator."""
+from collections import deque
+from datetime import datetime, timedelta
+
+# Deltas kept per device; the median of these is the device's refresh cadence.
+PING_HISTORY = 5
+# Poll this long after a predicted check-in, so the API has already recorded it.
+POLL_GRACE = timedelta(seconds=30)
+MINUTES_PER_DAY = 24 * 60
+
+
+def in_sleep_window(minute_of_day, start, end):
+    """Return True if `minute_of_day` falls in the [start, end) window (may wrap midnight)."""
+    if start == end:
+        return False
+    if start < end:
+        return start <= minute_of_day < end
+    return minute_of_day >= start or minute_of_day < end
+
+
+class DeviceCadence:
+    """Recent check-in deltas for one device (bounded, O(1) per update)."""
+
+    __slots__ = ("deltas", "last_ping")
+
+    def __init__(self):
+        self.last_ping = None
+        self.deltas = deque(maxlen=PING_HISTORY)
+
+    def observe(self, last_ping):
+        if last_ping is None or last_ping == self.last_ping:
+            return
+        if self.last_ping is not None and last_ping > self.last_ping:
+            self.deltas.append(last_ping - self.last_ping)
+        self.last_ping = last_ping
+
+    @property
+    def interval(self):
+        """Median delta between check-ins, or None until two deltas were seen."""
+        if len(self.deltas) < 2:
+            return None
+        return sorted(self.deltas)[len(self.deltas) // 2]
+
+
+class AdaptivePollScheduler:
+    """Choose the delay until the next poll from the fleet's expected check-ins.
+
+    Devices only report on their own refresh cadence, so polling between two
+    check-ins returns the same data. The scheduler learns each device's cadence from
+    its `last_ping_at` history, predicts the next check-in (moved to the end of the
+    device's sleep window when it would fall inside it), and polls just after the
+    earliest one. The delay never drops below `min_interval` (the configured scan
+    interval) or exceeds `max_interval` (the freshness bound).
+    """
+
+    def __init__(self, min_interval: timedelta, max_interval: timedelta):
+        """Initialize the scheduler."""
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self._cadence = {}
+        # Fixed-interval polls that the chosen delays made unnecessary.
+        self.polls_avoided = 0.0
+
+    def next_interval(self, devices, now: datetime) -> timedelta:
+        """Observe the latest snapshot and return the delay until the next poll.
+
+        `now` must be timezone-aware and in the zone the sleep windows refer to.
+        """
+        cadence = {}
+        earliest = None
+        for device in devices:
+            tracker = self._cadence.get(device.friendly_id) or DeviceCadence()
+            tracker.observe(device.last_ping_at)
+            cadence[device.friendly_id] = tracker
+            checkin = self._next_checkin(device, tracker, now)
+            if checkin is None:
+                # Unknown cadence: fall back to the fixed interval for this poll.
+                earliest = now
+                continue
+            if earliest is None or checkin < earliest:
+                earliest = checkin
+        # Forget devices that left the account.
+        self._cadence = cadence
+
+        if earliest is None:
+            interval = self.max_interval
+        else:
+            interval = earliest + POLL_GRACE - now
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        self.polls_avoided += interval / self.min_interval - 1
+        return interval
+
+    def _next_checkin(self, device, tracker, now):
+        interval = tracker.interval
+        if interval is None or tracker.last_ping is None:
+            return None
+        checkin = tracker.last_ping + interval
+        if checkin <= now:
+            # Overdue or already happened since the last poll: skip ahead to the next
+            # slot after now, keeping the device's phase.
+            missed = (now - checkin) // interval + 1
+            checkin += missed * interval
+        if device.sleep_mode_enabled and device.sleep_start_time is not None and device.sleep_end_time is not None:
+            local = checkin.astimezone(now.tzinfo)
+            minute = local.hour * 60 + local.minute
+            if in_sleep_window(minute, device.sleep_start_time, device.sleep_end_time):
+                minutes_to_wake = (device.sleep_end_time - minute) % MINUTES_PER_DAY
+                checkin = local.replace(second=0, microsecond=0) + timedelta(minutes=minutes_to_wake)
+        return checkin
@@ -4,91 +4,70 @@ import logging
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
 )
-from homeassistant.util import dt as dt_util
 
-from .const import (
-    DOMAIN,
-    MIN_VOLTAGE,
-    MAX_VOLTAGE,
-    LIPO_SOC_CURVE,
+from .const import DOMAIN, CONF_DIAGNOSTIC_SENSORS, DEFAULT_DIAGNOSTIC_SENSORS
+from .entity import TrmnlDeviceEntity, async_setup_device_entities
+from .metrics import (
+    BYTES_RECEIVED,
+    DECODE_SECONDS,
+    NETWORK_SECONDS,
+    REFRESH_SECONDS,
+    SNAPSHOT_SECONDS,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
-def calculate_battery_percentage(voltage):
-    """Estimate battery percentage from voltage via the LiPo curve (fallback for percent_charged)."""
-    if voltage <= MIN_VOLTAGE:
-        return 0
-    if voltage >= MAX_VOLTAGE:
-        return 100
-
-    for (low_v, low_pct), (high_v, high_pct) in zip(LIPO_SOC_CURVE, LIPO_SOC_CURVE[1:]):
-        if low_v <= voltage <= high_v:
-            ratio = (voltage - low_v) / (high_v - low_v)
-            return round(low_pct + ratio * (high_pct - low_pct))
-
-    return 0 if voltage < LIPO_SOC_CURVE[0][0] else 100
-
 async def async_setup_entry(
         hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ):
     """Set up TRMNL sensor based on a config entry."""
     coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    async_setup_device_entities(hass, entry, coordinator, async_add_entities, "sensor", DEVICE_SENSORS)
+    async_add_entities(TrmnlFleetSensor(coordinator, entry, description) for description in FLEET_SENSORS)
+    if hass.data[DOMAIN][entry.entry_id]["config"].get(CONF_DIAGNOSTIC_SENSORS, DEFAULT_DIAGNOSTIC_SENSORS):
+        async_add_entities(
+            TrmnlHubSensor(coordinator, entry, description) for description in HUB_SENSORS
+        )
 
-    # Create sensors for each device
-    entities = []
-    for device in coordinator.data:
-        entities.append(TrmnlBatterySensor(coordinator, device))
-        entities.append(TrmnlBatteryPercentageSensor(coordinator, device))
-        entities.append(TrmnlRssiSensor(coordinator, device))
-        entities.append(TrmnlWifiStrengthSensor(coordinator, device))
-        entities.append(TrmnlLastPingSensor(coordinator, device))
 
-    async_add_entities(entities)
-
-class TrmnlBaseSensor(CoordinatorEntity, SensorEntity):
+class TrmnlBaseSensor(TrmnlDeviceEntity, SensorEntity):
     """Base class for TRMNL sensors."""
 
+    # Smallest change of the state worth a write in statistics mode; None writes every change.
+    _deadband = None
+
     def __init__(self, coordinator, device):
         """Initialize the sensor."""
-        super().__init__(coordinator)
-        self.device = device
-        self._friendly_id = device["friendly_id"]
-        self._mac_address = device["mac_address"]
-        self._name = device["name"]
+        super().__init__(coordinator, device)
+        self._written_value = None
 
-    @property
-    def device_info(self):
-        """Return device information."""
-        return {
-            "identifiers": {(DOMAIN, self._mac_address)},
-            "name": self._name,
-            "manufacturer": "TRMNL",
-            "model": "e-ink display",
-        }
+    async def async_added_to_hass(self) -> None:
+        """Remember the value of the initial state write."""
+        await super().async_added_to_hass()
+        self._written_value = self.state
 
-    @property
-    def extra_state_attributes(self):
-        """Return the state attributes."""
-        # Simply use the current time as the last_updated attribute
-        return {
-            "last_updated": dt_util.utcnow().isoformat()
-        }
+    def _significant_change(self):
+        """In statistics mode, skip writes until the value moved by the deadband."""
+        if self._deadband is None or self.coordinator.statistics is None:
+            return True
+        value = self.state
+        if value is not None and self._written_value is not None and abs(value - self._written_value) < self._deadband:
+            return False
+        self._written_value = value
+        return True
 
-    def get_device_data(self):
-        """Get current device data from coordinator."""
-        for device in self.coordinator.data:
-            if device["friendly_id"] == self._friendly_id:
-                return device
-        return None
 
 class TrmnlBatterySensor(TrmnlBaseSensor):
     """Representation of a TRMNL battery voltage sensor."""
 
+    _deadband = 0.05
+
     @property
     def unique_id(self):
         """Return a unique ID to use for this entity."""
@@ -104,7 +83,7 @@ class TrmnlBatterySensor(TrmnlBaseSensor):
         """Return the state of the sensor."""
         device_data = self.get_device_data()
         if device_data:
-            return float(device_data["battery_voltage"])
+            return device_data.battery_voltage
         return None
 
     @property
@@ -120,6 +99,10 @@ class TrmnlBatterySensor(TrmnlBaseSensor):
     @property
     def state_class(self):
         """Return the state class of the sensor."""
+        # In statistics mode only moves past the deadband are written, which would skew
+        # the recorder's statistics of them.
+        if self.coordinator.statistics is not None:
+            return None
         return SensorStateClass.MEASUREMENT
 
     @property
@@ -131,6 +114,8 @@ class TrmnlBatterySensor(TrmnlBaseSensor):
 class TrmnlBatteryPercentageSensor(TrmnlBaseSensor):
     """Representation of a TRMNL battery percentage sensor."""
 
+    _deadband = 5
+
     @property
     def unique_id(self):
         """Return a unique ID to use for this entity."""
@@ -145,19 +130,10 @@ class TrmnlBatteryPercentageSensor(TrmnlBaseSensor):
     def state(self):
         """Return the state of the sensor."""
         device_data = self.get_device_data()
-        if not device_data:
-            return None
-        # Prefer the device's own state-of-charge estimate (`percent_charged`)
-        # returned by the TRMNL API. Deriving the percentage from `battery_voltage`
-        # via a linear map is unreliable: LiPo voltage is highly non-linear with
-        # charge, and the reported voltage swings outside the 3.0-4.2 V window the
-        # linear map assumes (e.g. it reads ~4.7 V while charging), which clamps
-        # the result to 100% the moment the device is plugged in.
-        percent_charged = device_data.get("percent_charged")
-        if percent_charged is not None:
-            return round(float(percent_charged))
-        # Fall back to the voltage-based estimate if the API omits percent_charged.
-        return calculate_battery_percentage(float(device_data["battery_voltage"]))
+        if device_data:
+            # Derived once per poll: `percent_charged` if reported, else the LiPo curve.
+            return device_data.battery_percentage
+        return None
 
     @property
     def unit_of_measurement(self):
@@ -172,6 +148,9 @@ class TrmnlBatteryPercentageSensor(TrmnlBaseSensor):
     @property
     def state_class(self):
         """Return the state class of the sensor."""
+        # In statistics mode the integration imports the hourly statistics itself.
+        if self.coordinator.statistics is not None:
+            return None
         return SensorStateClass.MEASUREMENT
 
     @property
@@ -183,6 +162,8 @@ class TrmnlBatteryPercentageSensor(TrmnlBaseSensor):
 class TrmnlRssiSensor(TrmnlBaseSensor):
     """Representation of a TRMNL RSSI sensor."""
 
+    _deadband = 5
+
     @property
     def unique_id(self):
         """Return a unique ID to use for this entity."""
@@ -198,7 +179,7 @@ class TrmnlRssiSensor(TrmnlBaseSensor):
         """Return the state of the sensor."""
         device_data = self.get_device_data()
         if device_data:
-            return device_data["rssi"]
+            return device_data.rssi
         return None
 
     @property
@@ -214,6 +195,9 @@ class TrmnlRssiSensor(TrmnlBaseSensor):
     @property
     def state_class(self):
         """Return the state class of the sensor."""
+        # In statistics mode the integration imports the hourly statistics itself.
+        if self.coordinator.statistics is not None:
+            return None
         return SensorStateClass.MEASUREMENT
 
     @property
@@ -225,6 +209,8 @@ class TrmnlRssiSensor(TrmnlBaseSensor):
 class TrmnlWifiStrengthSensor(TrmnlBaseSensor):
     """Representation of the TRMNL WiFi signal quality (0-100%)."""
 
+    _deadband = 10
+
     @property
     def unique_id(self):
         """Return a unique ID to use for this entity."""
@@ -240,7 +226,7 @@ class TrmnlWifiStrengthSensor(TrmnlBaseSensor):
         """Return the state of the sensor."""
         device_data = self.get_device_data()
         if device_data:
-            return device_data.get("wifi_strength")
+            return device_data.wifi_strength
         return None
 
     @property
@@ -251,6 +237,10 @@ class TrmnlWifiStrengthSensor(TrmnlBaseSensor):
     @property
     def state_class(self):
         """Return the state class of the sensor."""
+        # In statistics mode only moves past the deadband are written, which would skew
+        # the recorder's statistics of them.
+        if self.coordinator.statistics is not None:
+            return None
         return SensorStateClass.MEASUREMENT
 
     @property
@@ -276,19 +266,10 @@ class TrmnlLastPingSensor(TrmnlBaseSensor):
     def state(self):
         """Return the state of the sensor."""
         device_data = self.get_device_data()
-        if not device_data:
-            return None
-        last_ping = device_data.get("last_ping_at")
-        if not last_ping:
-            return None
-        parsed = dt_util.parse_datetime(last_ping)
-        if parsed is None:
-            _LOGGER.warning(
-                "Failed to parse 'last_ping_at' timestamp '%s' for device %s",
-                last_ping, self._friendly_id,
-            )
-            return None
-        return dt_util.as_utc(parsed).isoformat()
+        if device_data:
+            # Parsed, converted to UTC and formatted once per poll in TrmnlDevice.
+            return device_data.last_ping_iso
+        return None
 
     @property
     def extra_state_attributes(self):
@@ -296,7 +277,7 @@ class TrmnlLastPingSensor(TrmnlBaseSensor):
         attrs = super().extra_state_attributes
         device_data = self.get_device_data()
         if device_data:
-            attrs["hardware_last_ping_at"] = device_data.get("hardware_last_ping_at")
+            attrs["hardware_last_ping_at"] = device_data.hardware_last_ping_at
         return attrs
 
     @property
@@ -308,3 +289,206 @@ class TrmnlLastPingSensor(TrmnlBaseSensor):
     def icon(self):
         """Return the icon of the sensor."""
         return "mdi:access-point-check"
+
+
+class TrmnlBatteryDrainRateSensor(TrmnlBaseSensor):
+    """Battery drain over the current discharge segment, fitted from the check-in history."""
+
+    @property
+    def unique_id(self):
+        """Return a unique ID to use for this entity."""
+        return f"{self._mac_address}_battery_drain_rate"
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return f"{self._name} Battery Drain Rate"
+
+    @property
+    def state(self):
+        """Return the state of the sensor."""
+        estimator = self.coordinator.battery.get(self._friendly_id)
+        if estimator:
+            return estimator.drain_rate
+        return None
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes, including the estimator's charging flag."""
+        attrs = super().extra_state_attributes
+        estimator = self.coordinator.battery.get(self._friendly_id)
+        if estimator:
+            attrs["charging"] = estimator.charging
+            attrs["samples"] = len(estimator.samples)
+        return attrs
+
+    @property
+    def unit_of_measurement(self):
+        """Return the unit of measurement."""
+        return "%/d"
+
+    @property
+    def state_class(self):
+        """Return the state class of the sensor."""
+        return SensorStateClass.MEASUREMENT
+
+    @property
+    def icon(self):
+        """Return the icon of the sensor."""
+        return "mdi:battery-arrow-down"
+
+
+class TrmnlBatteryEmptySensor(TrmnlBaseSensor):
+    """When the battery is expected to run flat at the fitted drain rate."""
+
+    @property
+    def unique_id(self):
+        """Return a unique ID to use for this entity."""
+        return f"{self._mac_address}_battery_empty"
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return f"{self._name} Battery Empty"
+
+    @property
+    def state(self):
+        """Return the state of the sensor."""
+        estimator = self.coordinator.battery.get(self._friendly_id)
+        if estimator:
+            empty_at = estimator.empty_at
+            return empty_at.isoformat() if empty_at else None
+        return None
+
+    @property
+    def device_class(self):
+        """Return the device class of the sensor."""
+        return "timestamp"
+
+    @property
+    def icon(self):
+        """Return the icon of the sensor."""
+        return "mdi:battery-clock"
+
+
+# (key, entity class) of each device's sensors; the key is the unique ID after the MAC
+# address and what entity profiles select by.
+DEVICE_SENSORS = (
+    ("battery", TrmnlBatterySensor),
+    ("battery_percentage", TrmnlBatteryPercentageSensor),
+    ("rssi", TrmnlRssiSensor),
+    ("wifi_strength", TrmnlWifiStrengthSensor),
+    ("last_ping", TrmnlLastPingSensor),
+    ("battery_drain_rate", TrmnlBatteryDrainRateSensor),
+    ("battery_empty", TrmnlBatteryEmptySensor),
+)
+
+
+def _milliseconds(metric):
+    def value(coordinator):
+        seconds = coordinator.metrics.last(metric)
+        return round(seconds * 1000, 2) if seconds is not None else None
+    return value
+
+
+# (key, name, unit, state class, icon, value function) of the account hub's diagnostic sensors
+HUB_SENSORS = (
+    ("poll_latency", "Poll Latency", "ms", SensorStateClass.MEASUREMENT, "mdi:timer-outline",
+     _milliseconds(NETWORK_SECONDS)),
+    ("payload_size", "Payload Size", "B", SensorStateClass.MEASUREMENT, "mdi:download",
+     lambda coordinator: coordinator.metrics.last(BYTES_RECEIVED)),
+    ("decode_time", "Decode Time", "ms", SensorStateClass.MEASUREMENT, "mdi:code-json",
+     _milliseconds(DECODE_SECONDS)),
+    ("snapshot_time", "Snapshot Build Time", "ms", SensorStateClass.MEASUREMENT, "mdi:timer-cog-outline",
+     _milliseconds(SNAPSHOT_SECONDS)),
+    ("refresh_time", "Refresh Duration", "ms", SensorStateClass.MEASUREMENT, "mdi:timer-sync-outline",
+     _milliseconds(REFRESH_SECONDS)),
+    ("entity_writes", "Entity Writes", None, SensorStateClass.TOTAL_INCREASING, "mdi:pencil",
+     lambda coordinator: coordinator.entity_writes),
+    ("entity_writes_skipped", "Entity Writes Skipped", None, SensorStateClass.TOTAL_INCREASING, "mdi:pencil-off",
+     lambda coordinator: coordinator.entity_writes_skipped),
+    ("consecutive_failures", "Consecutive Failures", None, SensorStateClass.MEASUREMENT, "mdi:alert-circle-outline",
+     lambda coordinator: coordinator.breaker.consecutive_failures),
+)
+
+
+# (key, name, unit, state class, icon, value function) of the account hub's fleet health sensors
+FLEET_SENSORS = (
+    ("low_battery_count", "Devices Low Battery", None, SensorStateClass.MEASUREMENT, "mdi:battery-alert",
+     lambda coordinator: coordinator.health.low_battery_count),
+    ("weak_signal_count", "Devices Weak Signal", None, SensorStateClass.MEASUREMENT, "mdi:wifi-alert",
+     lambda coordinator: coordinator.health.weak_signal_count),
+    ("offline_count", "Devices Offline", None, SensorStateClass.MEASUREMENT, "mdi:lan-disconnect",
+     lambda coordinator: coordinator.health.offline_count),
+    ("min_battery", "Lowest Battery", "%", SensorStateClass.MEASUREMENT, "mdi:battery-low",
+     lambda coordinator: coordinator.health.min_battery),
+)
+
+
+class TrmnlHubSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor on the per-account hub device, fed by the entry's metrics."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator, entry, description):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._entry = entry
+        self._key, self._label, self._unit, self._state_class, self._icon, self._value = description
+
+    @property
+    def unique_id(self):
+        """Return a unique ID to use for this entity."""
+        return f"{self._entry.entry_id}_{self._key}"
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return f"{self._entry.title} {self._label}"
+
+    @property
+    def device_info(self):
+        """Return the hub device representing the account."""
+        return {
+            "identifiers": {(DOMAIN, self._entry.entry_id)},
+            "name": self._entry.title,
+            "manufacturer": "TRMNL",
+            "model": "Account",
+            "entry_type": DeviceEntryType.SERVICE,
+        }
+
+    @property
+    def available(self):
+        """The metrics stay meaningful while the API is failing."""
+        return True
+
+    @property
+    def state(self):
+        """Return the state of the sensor."""
+        return self._value(self.coordinator)
+
+    @property
+    def unit_of_measurement(self):
+        """Return the unit of measurement."""
+        return self._unit
+
+    @property
+    def state_class(self):
+        """Return the state class of the sensor."""
+        return self._state_class
+
+    @property
+    def icon(self):
+        """Return the icon of the sensor."""
+        return self._icon
+
+
+class TrmnlFleetSensor(TrmnlHubSensor):
+    """Fleet health aggregate on the account hub device, from the per-refresh evaluation."""
+
+    _attr_entity_category = None
+
+    @property
+    def available(self):
+        """Available while the fleet data is, including restored (stale) data."""
+        return self.coordinator.last_update_success or self.coordinator.stale
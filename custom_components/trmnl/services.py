@@ -0,0 +1,105 @@
+"""Services of the TRMNL integration."""
+import logging
+from datetime import timedelta
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .statistics import (
+    BATTERY,
+    RSSI,
+    async_import,
+    async_recorded_statistics,
+    traffic_statistics,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_BACKFILL_STATISTICS = "backfill_statistics"
+ATTR_DAYS = "days"
+ATTR_TRAFFIC_LOG = "traffic_log"
+
+BACKFILL_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DAYS, default=10): vol.All(vol.Coerce(int), vol.Range(min=1, max=365)),
+        vol.Optional(ATTR_TRAFFIC_LOG): cv.string,
+    }
+)
+
+# Sensor unique ID key -> statistics metric, for reading recorded history
+_RECORDED_SENSORS = (("battery_percentage", BATTERY), ("rssi", RSSI))
+
+
+@callback
+def async_register_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    async def backfill_statistics(call: ServiceCall) -> None:
+        now = dt_util.utcnow()
+        if ATTR_TRAFFIC_LOG in call.data:
+            path = call.data[ATTR_TRAFFIC_LOG]
+            if not hass.config.is_allowed_path(path):
+                raise HomeAssistantError(f"Reading {path} is not allowed (see allowlist_external_dirs)")
+            try:
+                statistics = await hass.async_add_executor_job(traffic_statistics, path)
+            except (OSError, ValueError) as err:
+                raise HomeAssistantError(f"Cannot read traffic log {path}: {err}") from err
+            # Leave the hours statistics mode counted live alone, as in the history backfill.
+            end = _backfill_end(now, _coordinators(hass))
+            rows = async_import(hass, statistics.pop_completed(end))
+            _LOGGER.info("Imported %d hourly TRMNL statistics from %s", rows, path)
+            return
+        if "recorder" not in hass.config.components:
+            raise HomeAssistantError("Backfilling from history needs the recorder")
+        rows = 0
+        for coordinator in _coordinators(hass):
+            rows += await _async_backfill_entry(hass, coordinator, now, call.data[ATTR_DAYS])
+        _LOGGER.info("Imported %d hourly TRMNL statistics from recorded history", rows)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_BACKFILL_STATISTICS, backfill_statistics, schema=BACKFILL_SCHEMA
+    )
+
+
+def _coordinators(hass: HomeAssistant) -> list:
+    """Return the coordinators of the loaded entries."""
+    return [entry_data["coordinator"] for entry_data in hass.data.get(DOMAIN, {}).values()]
+
+
+def _backfill_end(now, coordinators):
+    """Return the first hour statistics mode counted live in any of the coordinators, or `now`."""
+    end = now
+    for coordinator in coordinators:
+        if coordinator.statistics is not None and coordinator.statistics.first_hour is not None:
+            end = min(end, coordinator.statistics.first_hour)
+    return end
+
+
+async def _async_backfill_entry(hass: HomeAssistant, coordinator, now, days: int) -> int:
+    """Import the recorded history of one entry's battery and RSSI sensors.
+
+    Stops at the first hour statistics mode counted live, so those hours are not
+    replaced with the sparser history it leaves behind.
+    """
+    if coordinator.data is None:
+        return 0
+    entity_registry = er.async_get(hass)
+    entity_ids = {}
+    for device in coordinator.data:
+        for key, metric in _RECORDED_SENSORS:
+            if entity_id := entity_registry.async_get_entity_id(
+                "sensor", DOMAIN, f"{device.mac_address}_{key}"
+            ):
+                entity_ids[entity_id] = (device.mac_address, metric)
+    if not entity_ids:
+        return 0
+    end = _backfill_end(now, (coordinator,))
+    statistics = await async_recorded_statistics(
+        hass, coordinator.data, entity_ids, now - timedelta(days=days), end
+    )
+    return async_import(hass, statistics.pop_completed(end))
@@ -0,0 +1,222 @@
+"""Battery voltage to state-of-charge curves, built-in and calibrated from the fleet."""
+from bisect import bisect_right
+from itertools import pairwise
+
+from .const import (
+    BATTERY_CHARGING_VOLTAGE,
+    LIPO_SOC_CURVE,
+    MIN_VOLTAGE,
+    SOC_BIN_WEIGHT,
+    SOC_BIN_WIDTH,
+    SOC_MIN_BIN_SAMPLES,
+    SOC_MIN_BINS,
+)
+
+
+class SocCurve:
+    """Piecewise-linear (voltage, percent) curve with binary-search lookup.
+
+    The segment slopes are precomputed, so a lookup is one bisect and one
+    multiply-add. Voltages outside the curve clamp to its end points.
+    """
+
+    __slots__ = ("percents", "slopes", "voltages")
+
+    def __init__(self, points):
+        """Build the lookup table from (voltage, percent) points in voltage order."""
+        self.voltages = [float(voltage) for voltage, _ in points]
+        self.percents = [float(percent) for _, percent in points]
+        if len(self.voltages) < 2 or any(low >= high for low, high in pairwise(self.voltages)):
+            raise ValueError("A SoC curve needs at least two points in increasing voltage order")
+        self.slopes = [
+            (high_pct - low_pct) / (high_v - low_v)
+            for (low_v, high_v), (low_pct, high_pct) in zip(
+                pairwise(self.voltages), pairwise(self.percents), strict=True
+            )
+        ]
+
+    def percentage(self, voltage: float) -> int:
+        """Return the whole percentage for `voltage`."""
+        index = bisect_right(self.voltages, voltage)
+        if index == 0:
+            return round(self.percents[0])
+        if index == len(self.voltages):
+            return round(self.percents[-1])
+        index -= 1
+        return round(self.percents[index] + (voltage - self.voltages[index]) * self.slopes[index])
+
+    def percentages(self, voltages) -> list:
+        """Return `percentage()` of each voltage (one pass for a whole fleet)."""
+        percentage = self.percentage
+        return [percentage(voltage) for voltage in voltages]
+
+
+DEFAULT_SOC_CURVE = SocCurve(LIPO_SOC_CURVE)
+
+
+class SocCalibration:
+    """Observed `percent_charged` per voltage bin, for one device or a whole fleet.
+
+    Each bin keeps a running mean whose weight is capped at SOC_BIN_WEIGHT
+    samples, so the curve follows an ageing battery; adding a sample is O(1)
+    and memory is bounded by the number of bins. The curve is rebuilt only
+    when asked for after new samples.
+    """
+
+    __slots__ = ("_curve", "_dirty", "bins", "last_ping")
+
+    def __init__(self):
+        # bin index (voltage / SOC_BIN_WIDTH) -> [samples, mean percent]
+        self.bins = {}
+        self.last_ping = None
+        self._curve = None
+        self._dirty = False
+
+    def add(self, voltage: float, percent: float) -> None:
+        """Record one (voltage, percent_charged) pair."""
+        if not MIN_VOLTAGE <= voltage < BATTERY_CHARGING_VOLTAGE:
+            # Charging or disconnecting readings say nothing about the curve.
+            return
+        index = round(voltage / SOC_BIN_WIDTH)
+        entry = self.bins.get(index)
+        if entry is None:
+            self.bins[index] = [1, float(percent)]
+        else:
+            entry[0] += 1
+            entry[1] += (percent - entry[1]) / min(entry[0], SOC_BIN_WEIGHT)
+        self._dirty = True
+
+    @property
+    def curve(self):
+        """The calibrated `SocCurve`, or None until enough of the range is covered."""
+        if self._dirty:
+            self._curve = self._build()
+            self._dirty = False
+        return self._curve
+
+    def _build(self):
+        usable = sorted(
+            (index * SOC_BIN_WIDTH, mean)
+            for index, (samples, mean) in self.bins.items()
+            if samples >= SOC_MIN_BIN_SAMPLES
+        )
+        if len(usable) < SOC_MIN_BINS:
+            return None
+        # Pool adjacent violators: percentages must not fall as voltage rises.
+        blocks = []  # [sum of means, bins, first voltage, last voltage]
+        for voltage, mean in usable:
+            blocks.append([mean, 1, voltage, voltage])
+            while len(blocks) > 1 and blocks[-2][0] / blocks[-2][1] > blocks[-1][0] / blocks[-1][1]:
+                total, count, _, last = blocks.pop()
+                blocks[-1][0] += total
+                blocks[-1][1] += count
+                blocks[-1][3] = last
+        points = []
+        for total, count, first, last in blocks:
+            points.append((first, total / count))
+            if last != first:
+                points.append((last, total / count))
+        # Outside the observed range, run to the built-in curve's end points.
+        if points[0][0] > DEFAULT_SOC_CURVE.voltages[0]:
+            points.insert(0, (DEFAULT_SOC_CURVE.voltages[0], min(DEFAULT_SOC_CURVE.percents[0], points[0][1])))
+        if points[-1][0] < DEFAULT_SOC_CURVE.voltages[-1]:
+            points.append((DEFAULT_SOC_CURVE.voltages[-1], max(DEFAULT_SOC_CURVE.percents[-1], points[-1][1])))
+        return SocCurve(points)
+
+    def as_dict(self) -> dict:
+        """Serialize for the store."""
+        return {
+            "last_ping": self.last_ping,
+            "bins": [[index, samples, round(mean, 3)] for index, (samples, mean) in self.bins.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Restore from `as_dict()` output."""
+        calibration = cls()
+        calibration.last_ping = data.get("last_ping")
+        for index, samples, mean in data.get("bins", ()):
+            calibration.bins[int(index)] = [int(samples), float(mean)]
+        calibration._dirty = bool(calibration.bins)
+        return calibration
+
+
+class FleetSocCalibration:
+    """Per-device and fleet-wide curves, calibrated from devices that report both values.
+
+    Devices that report `percent_charged` feed their own calibration and the
+    fleet's. Devices that report only a voltage get their percentage from
+    their own calibrated curve (if they reported `percent_charged` before),
+    else the fleet's, else the built-in LiPo curve.
+    """
+
+    def __init__(self):
+        """Initialize with no observations."""
+        self.devices = {}
+        self.fleet = SocCalibration()
+
+    def apply(self, devices) -> None:
+        """Learn from, or set the battery percentage of, each freshly parsed record."""
+        fallback = []
+        for device in devices:
+            voltage = device.battery_voltage
+            if voltage is None:
+                continue
+            calibration = self.devices.get(device.friendly_id)
+            if device.percent_charged is not None:
+                if calibration is None:
+                    calibration = self.devices[device.friendly_id] = SocCalibration()
+                # Count each check-in once, however often it is polled.
+                ping = device.last_ping_iso
+                if ping is None or ping != calibration.last_ping:
+                    calibration.last_ping = ping
+                    calibration.add(voltage, device.percent_charged)
+                    self.fleet.add(voltage, device.percent_charged)
+            elif calibration is not None and calibration.curve is not None:
+                device.battery_percentage = calibration.curve.percentage(voltage)
+            else:
+                fallback.append(device)
+        curve = self.fleet.curve if fallback else None
+        if curve is not None:
+            # Records already carry the built-in curve's percentage otherwise.
+            for device, percentage in zip(
+                fallback, curve.percentages([device.battery_voltage for device in fallback]), strict=True
+            ):
+                device.battery_percentage = percentage
+
+    def forget(self, friendly_id: str) -> None:
+        """Drop a removed device's own calibration (its samples stay in the fleet's)."""
+        self.devices.pop(friendly_id, None)
+
+    def summary(self) -> dict:
+        """Which curves are in use, for diagnostics."""
+        return {
+            "fleet_calibrated": self.fleet.curve is not None,
+            "fleet_bins": len(self.fleet.bins),
+            "calibrated_devices": sum(
+                1 for calibration in self.devices.values() if calibration.curve is not None
+            ),
+        }
+
+    def as_dict(self) -> dict:
+        """Serialize for the store."""
+        return {
+            "fleet": self.fleet.as_dict(),
+            "devices": {
+                friendly_id: calibration.as_dict() for friendly_id, calibration in self.devices.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Restore from `as_dict()` output, starting over if it is unreadable."""
+        calibrations = cls()
+        if not data:
+            return calibrations
+        try:
+            calibrations.fleet = SocCalibration.from_dict(data.get("fleet") or {})
+            for friendly_id, calibration in (data.get("devices") or {}).items():
+                calibrations.devices[friendly_id] = SocCalibration.from_dict(calibration)
+        except (TypeError, ValueError, AttributeError):
+            return cls()
+        return calibrations
@@ -0,0 +1,236 @@
+"""Hourly long-term statistics of each device's battery and signal, imported in bulk."""
+import logging
+from datetime import datetime, timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+from homeassistant.util.json import json_loads
+
+from .const import DOMAIN
+from .models import parse_devices
+
+_LOGGER = logging.getLogger(__name__)
+
+BATTERY = "battery"
+RSSI = "rssi"
+# metric -> (name suffix, unit) of the external statistics
+METRICS = {
+    BATTERY: ("Battery", "%"),
+    RSSI: ("WiFi Signal Strength", "dBm"),
+}
+
+
+def statistic_id(mac_address: str, metric: str) -> str:
+    """Return the external statistic ID of a device's metric, e.g. `trmnl:aa_bb_..._battery`."""
+    return f"{DOMAIN}:{slugify(mac_address)}_{metric}"
+
+
+def _hour_start(at: datetime) -> datetime:
+    return dt_util.as_utc(at).replace(minute=0, second=0, microsecond=0)
+
+
+class HourlyStatistics:
+    """Min, mean and max per device, metric and UTC hour, O(1) per reading.
+
+    Readings are bucketed by the hour of the device's check-in, and a check-in is
+    counted once however often it is observed. `pop_completed()` hands out every
+    hour that has ended; readings for an hour that was already handed out are
+    dropped, as importing it again would replace the stored row with a partial one.
+    """
+
+    def __init__(self):
+        """Initialize an empty aggregator."""
+        # hour start -> (mac_address, metric) -> [min, max, total, count]
+        self._hours = {}
+        # mac_address -> device name, for the statistics' names
+        self._names = {}
+        # mac_address -> last check-in counted
+        self._last_ping = {}
+        # Hours before this were handed out already.
+        self.completed_until = None
+        # The earliest hour counted; hours before it are left to a backfill.
+        self.first_hour = None
+
+    def observe(self, device) -> None:
+        """Count the device's current readings, unless this check-in was counted before."""
+        at = device.last_ping_at
+        if at is None or self._last_ping.get(device.mac_address) == at:
+            return
+        self._last_ping[device.mac_address] = at
+        self._names[device.mac_address] = device.name
+        self.add(device.mac_address, BATTERY, at, device.battery_percentage)
+        self.add(device.mac_address, RSSI, at, device.rssi)
+
+    def add(self, mac_address: str, metric: str, at: datetime, value) -> None:
+        """Count one reading taken at `at`."""
+        if value is None:
+            return
+        hour = _hour_start(at)
+        if self.completed_until is not None and hour < self.completed_until:
+            return
+        if self.first_hour is None or hour < self.first_hour:
+            self.first_hour = hour
+        buckets = self._hours.setdefault(hour, {})
+        bucket = buckets.get((mac_address, metric))
+        if bucket is None:
+            buckets[(mac_address, metric)] = [value, value, value, 1]
+            return
+        if value < bucket[0]:
+            bucket[0] = value
+        if value > bucket[1]:
+            bucket[1] = value
+        bucket[2] += value
+        bucket[3] += 1
+
+    def set_name(self, mac_address: str, name: str) -> None:
+        """Name the device's statistics (observe() does this from the device record)."""
+        self._names[mac_address] = name
+
+    def forget(self, mac_address: str) -> None:
+        """Drop a removed device's last check-in; its readings so far are still imported."""
+        self._last_ping.pop(mac_address, None)
+
+    def pop_completed(self, now: datetime, delay: timedelta = timedelta(0)) -> dict:
+        """Remove the hours that ended at least `delay` before `now`.
+
+        Returns `statistic ID -> (name, unit, [StatisticData, ...])`, hours in order.
+        """
+        current = _hour_start(now - delay)
+        result = {}
+        for hour in sorted(hour for hour in self._hours if hour < current):
+            for (mac_address, metric), (low, high, total, count) in self._hours.pop(hour).items():
+                key = statistic_id(mac_address, metric)
+                if key not in result:
+                    suffix, unit = METRICS[metric]
+                    name = f"{self._names.get(mac_address, mac_address)} {suffix}"
+                    result[key] = (name, unit, [])
+                result[key][2].append({"start": hour, "min": low, "max": high, "mean": total / count})
+        if self.completed_until is None or current > self.completed_until:
+            self.completed_until = current
+        return result
+
+    def as_dict(self) -> dict:
+        """Serialize the open hours for the store."""
+        return {
+            "hours": [
+                [hour.isoformat(), mac_address, metric, *bucket]
+                for hour, buckets in self._hours.items()
+                for (mac_address, metric), bucket in buckets.items()
+            ],
+            "names": self._names,
+            "completed_until": self.completed_until.isoformat() if self.completed_until else None,
+            "first_hour": self.first_hour.isoformat() if self.first_hour else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data) -> "HourlyStatistics":
+        """Restore from `as_dict()` output; anything unreadable starts empty."""
+        statistics = cls()
+        if not isinstance(data, dict):
+            return statistics
+        try:
+            for hour, mac_address, metric, low, high, total, count in data.get("hours", ()):
+                if metric in METRICS:
+                    statistics._hours.setdefault(dt_util.parse_datetime(hour), {})[(mac_address, metric)] = [
+                        low, high, total, count
+                    ]
+            statistics._names = dict(data.get("names") or {})
+            if data.get("completed_until"):
+                statistics.completed_until = dt_util.parse_datetime(data["completed_until"])
+            if data.get("first_hour"):
+                statistics.first_hour = dt_util.parse_datetime(data["first_hour"])
+        except (TypeError, ValueError):
+            return cls()
+        return statistics
+
+
+def async_import(hass: HomeAssistant, statistics: dict) -> int:
+    """Queue `pop_completed()` output with the recorder, one import per statistic.
+
+    Returns the number of hourly rows queued; none without the recorder.
+    """
+    if not statistics:
+        return 0
+    if "recorder" not in hass.config.components:
+        _LOGGER.debug("Recorder not loaded; dropping %d TRMNL statistics", len(statistics))
+        return 0
+    # The recorder pulls in SQLAlchemy; only import it once there is something to write.
+    from homeassistant.components.recorder.statistics import (
+        async_add_external_statistics,
+    )
+
+    rows = 0
+    for key, (name, unit, data) in statistics.items():
+        async_add_external_statistics(hass, _metadata(key, name, unit), data)
+        rows += len(data)
+    return rows
+
+
+def _metadata(key: str, name: str, unit: str) -> dict:
+    metadata = {
+        "has_mean": True,
+        "has_sum": False,
+        "name": name,
+        "source": DOMAIN,
+        "statistic_id": key,
+        "unit_of_measurement": unit,
+    }
+    try:
+        from homeassistant.components.recorder.models import StatisticMeanType
+    except ImportError:
+        # Older Home Assistant: `has_mean` alone describes the statistic.
+        return metadata
+    metadata["mean_type"] = StatisticMeanType.ARITHMETIC
+    return metadata
+
+
+async def async_recorded_statistics(hass: HomeAssistant, devices, entity_ids: dict, start: datetime, end: datetime) -> HourlyStatistics:
+    """Aggregate the recorded history of the given sensors into hourly statistics.
+
+    `entity_ids` maps each sensor's entity ID to its `(mac_address, metric)`.
+    """
+    from homeassistant.components.recorder import get_instance
+    from homeassistant.components.recorder.history import get_significant_states
+
+    history = await get_instance(hass).async_add_executor_job(
+        lambda: get_significant_states(
+            hass,
+            start,
+            end,
+            list(entity_ids),
+            include_start_time_state=False,
+            significant_changes_only=False,
+            no_attributes=True,
+        )
+    )
+    statistics = HourlyStatistics()
+    for device in devices:
+        statistics.set_name(device.mac_address, device.name)
+    for entity_id, states in history.items():
+        mac_address, metric = entity_ids[entity_id]
+        for state in states:
+            try:
+                value = float(state.state)
+            except (TypeError, ValueError):
+                continue
+            statistics.add(mac_address, metric, state.last_updated, value)
+    return statistics
+
+
+def traffic_statistics(path: str) -> HourlyStatistics:
+    """Aggregate the device records in a traffic log (see `traffic.py`); blocking I/O."""
+    # Only a backfill reads traffic logs; keep gzip and friends off the startup path.
+    from .traffic import read_traffic
+
+    statistics = HourlyStatistics()
+    for entry in read_traffic(path):
+        if entry.get("status") != 200 or not entry.get("body"):
+            continue
+        try:
+            payload = json_loads(entry["body"])
+        except ValueError:
+            continue
+        for device in parse_devices(payload.get("data", []) if isinstance(payload, dict) else []):
+            statistics.observe(device)
+    return statistics
@@ -0,0 +1,88 @@
+"""Compact on-disk log of raw `/api/devices` traffic.
+
+One JSON object per line (gzip-compressed when the path ends in `.gz`):
+
+    {"t": 1750701600.123, "elapsed": 0.081, "status": 200,
+     "headers": {"ETag": "...", ...}, "body": "{\"data\": [...]}"}
+
+`t` is the wall-clock time the response arrived and `elapsed` the request's
+duration. A body identical to the previous one is stored as `"same": true`
+instead, a 304 has no body, and a request that never got a response is stored
+as `{"t": ..., "elapsed": ..., "error": "..."}`.
+"""
+import gzip
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Response headers worth keeping for a faithful replay.
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After")
+
+
+class TrafficRecorder:
+    """Append every response a `TrmnlApiClient` receives to a traffic log.
+
+    Writes happen on a dedicated thread, in order, so recording never blocks the
+    event loop. The thread keeps the log open until `close()`, so a `.gz` log is
+    one gzip stream rather than one member per response.
+    """
+
+    def __init__(self, path: str):
+        """Initialize the recorder; the log is created on the first write."""
+        self.path = path
+        self.records = 0
+        self._last_body_hash = None
+        # Only touched from the writer thread.
+        self._log = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trmnl_traffic")
+
+    def record(self, started: float, status: int | None, headers=None, body: bytes | None = None, error: str | None = None) -> None:
+        """Log one response (or failed request) that began at monotonic time `started`."""
+        entry = {"t": round(time.time(), 3), "elapsed": round(time.monotonic() - started, 4)}
+        if error is not None:
+            entry["error"] = error
+        else:
+            entry["status"] = status
+            entry["headers"] = {name: headers[name] for name in RECORDED_HEADERS if name in headers}
+        if body is not None:
+            body_hash = hashlib.blake2b(body, digest_size=16).digest()
+            if body_hash == self._last_body_hash:
+                entry["same"] = True
+            else:
+                entry["body"] = body.decode("utf-8", errors="replace")
+                self._last_body_hash = body_hash
+        self.records += 1
+        self._executor.submit(self._write, json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def _write(self, line: str) -> None:
+        if self._log is None:
+            opener = gzip.open if self.path.endswith(".gz") else open
+            self._log = opener(self.path, "at", encoding="utf-8")
+        self._log.write(line)
+
+    def _close_log(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def close(self) -> None:
+        """Wait for pending writes to finish and close the log."""
+        self._executor.submit(self._close_log)
+        self._executor.shutdown(wait=True)
+
+
+def read_traffic(path: str):
+    """Yield the entries of a traffic log, with `"same"` bodies filled in."""
+    opener = gzip.open if path.endswith(".gz") else open
+    body = None
+    with opener(path, "rt", encoding="utf-8") as log:
+        for line in log:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if "body" in entry:
+                body = entry["body"]
+            elif entry.pop("same", False):
+                entry["body"] = body
+            yield entry